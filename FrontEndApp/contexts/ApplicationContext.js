@@ -1,4 +1,4 @@
-import { createContext, useCallback, useContext, useEffect, useState } from 'react';
+import { createContext, useCallback, useContext, useEffect, useRef, useState } from 'react';
 import {
     acceptApplication as acceptApplicationApi,
     fetchApplications as fetchApplicationsApi,
@@ -13,6 +13,9 @@ export const ApplicationContext = createContext({
     loading: false,
     error: null,
     fetchApplications: () => { },
+    fetchMoreApplications: () => { },
+    hasMoreApplications: false,
+    loadingMore: false,
     submitApplication: () => { },
     getApplicationDetails: () => { },
     clearApplicationError: () => { }
@@ -23,39 +26,43 @@ export const ApplicationProvider = ({ children }) => {
     const [applications, setApplications] = useState([]);
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState(null);
+    // Trang tiếp theo (URL `next` của API) và bộ lọc của lần tải gần nhất, dùng khi cuộn tới cuối / tải lại
+    const [nextPage, setNextPage] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
+    const lastFilters = useRef(undefined);
     const { role, accessToken } = useContext(AuthContext);
     const { isAuthenticated, loading: authLoading } = useContext(AuthContext);
 
-    const fetchApplications = useCallback(async () => {
+    const formatApplication = (app) => ({
+        id: app.id,
+        status: app.status || 'pending',
+        appliedDate: new Date(app.created_date),
+        lastUpdated: new Date(app.updated_date || app.created_date),
+        feedback: app.feedback,
+        job: app.job,
+        job_title: app.job_title,
+        applicant_detail: app.applicant_detail,
+        // Chỉ có ở danh sách của ứng viên; nhà tuyển dụng nhận dạng rút gọn (job, job_title)
+        job_detail: app.job_detail,
+        cv: app.cv,
+    });
+
+    const fetchApplications = useCallback(async (filters) => {
         if (authLoading || !isAuthenticated || !accessToken) {
             // Không fetch khi chưa xác thực xong hoặc chưa có token
             return [];
         }
+        lastFilters.current = filters;
         setLoading(true);
         setError(null);
         try {
-            // Chọn endpoint theo role
-            const data = await fetchApplicationsApi(role, accessToken);
-            const formattedApplications = (data.results || data).map(app => {
-                // Log để kiểm tra cấu trúc dữ liệu
-                console.log('Application data structure:', JSON.stringify(app, null, 2));
-
-                return {
-                    id: app.id,
-                    status: app.status || 'pending',
-                    appliedDate: new Date(app.created_date),
-                    lastUpdated: new Date(app.updated_date || app.created_date),
-                    feedback: app.feedback,
-                    job: app.job,
-                    // Thêm đầy đủ các trường detail để màn hình recruiter dùng trực tiếp
-                    applicant_detail: app.applicant_detail,
-                    job_detail: app.job_detail,
-                    cv: app.cv,
-                }
-            });
+            // Chọn endpoint theo role; nhà tuyển dụng nhận trang đầu, các trang sau tải qua fetchMoreApplications
+            const data = await fetchApplicationsApi(role, accessToken, filters);
+            const formattedApplications = (data.results || data).map(formatApplication);
 
             console.log('Fetched applications:', formattedApplications.length);
             setApplications(formattedApplications);
+            setNextPage(data.next || null);
             return formattedApplications;
         } catch (error) {
             console.error('Error fetching applications:', error);
@@ -66,6 +73,21 @@ export const ApplicationProvider = ({ children }) => {
         }
     }, [accessToken, role, authLoading, isAuthenticated]);
 
+    const fetchMoreApplications = useCallback(async () => {
+        if (!nextPage || loading || loadingMore || !accessToken) return;
+        setLoadingMore(true);
+        try {
+            const data = await fetchApplicationsApi(role, accessToken, undefined, nextPage);
+            setApplications(prev => [...prev, ...data.results.map(formatApplication)]);
+            setNextPage(data.next || null);
+        } catch (error) {
+            console.error('Error fetching more applications:', error);
+            setError(error.response?.data?.detail || 'Lỗi khi tải thêm đơn ứng tuyển');
+        } finally {
+            setLoadingMore(false);
+        }
+    }, [nextPage, loading, loadingMore, accessToken, role]);
+
     const submitApplication = async (jobId, resumeFile) => {
         setLoading(true);
         setError(null);
@@ -102,7 +124,7 @@ export const ApplicationProvider = ({ children }) => {
         try {
             if (!accessToken) throw new Error('Không có token xác thực');
             await acceptApplicationApi(applicationId, accessToken);
-            await fetchApplications();
+            await fetchApplications(lastFilters.current);
             return { success: true };
         } catch (error) {
             setError(error.response?.data?.detail || 'Lỗi khi chấp nhận đơn ứng tuyển');
@@ -119,7 +141,7 @@ export const ApplicationProvider = ({ children }) => {
         try {
             if (!accessToken) throw new Error('Không có token xác thực');
             await rejectApplicationApi(applicationId, accessToken);
-            await fetchApplications();
+            await fetchApplications(lastFilters.current);
             return { success: true };
         } catch (error) {
             setError(error.response?.data?.detail || 'Lỗi khi từ chối đơn ứng tuyển');
@@ -166,6 +188,9 @@ export const ApplicationProvider = ({ children }) => {
                 loading,
                 error,
                 fetchApplications,
+                fetchMoreApplications,
+                hasMoreApplications: !!nextPage,
+                loadingMore,
                 submitApplication,
                 getApplicationDetails,
                 clearApplicationError,
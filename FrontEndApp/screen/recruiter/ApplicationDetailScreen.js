@@ -5,6 +5,7 @@ import { Avatar, Button, Card, Chip, Divider, Snackbar, Text, Title } from "reac
 import { ReviewCard } from '../../components/ui/ReviewCard';
 import { ApplicationContext } from '../../contexts/ApplicationContext';
 import { ReviewContext } from '../../contexts/ReviewContext';
+import { fetchJobById } from '../../services/jobService';
 
 const ApplicationDetailScreen = ({ route }) => {
     const { application } = route.params;
@@ -16,9 +17,18 @@ const ApplicationDetailScreen = ({ route }) => {
     const [error, setError] = useState(null);
     const [localLoading, setLocalLoading] = useState(false);
     const [appReviews, setAppReviews] = useState([]);
+    // Danh sách của nhà tuyển dụng chỉ có job + job_title: tải chi tiết công việc khi mở đơn
+    const [jobDetail, setJobDetail] = useState(application?.job_detail || null);
+
+    useEffect(() => {
+        if (jobDetail || !application?.job) return;
+        fetchJobById(application.job)
+            .then(setJobDetail)
+            .catch(e => console.error('Error fetching job detail:', e));
+    }, [application?.job]);
 
     if (!application) return <Text>Không tìm thấy dữ liệu ứng viên</Text>;
-    const { applicant_detail, job_detail, status, cv } = application;
+    const { applicant_detail, status, cv } = application;
 
     useEffect(() => {
         if (status === 'pending') {
@@ -87,11 +97,11 @@ const ApplicationDetailScreen = ({ route }) => {
                     <Text style={styles.infoText}>Email: <Text style={styles.infoValue}>{applicant_detail.email}</Text></Text>
                     <Divider style={styles.divider} />
                     <Title style={styles.sectionTitle}>Thông tin công việc</Title>
-                    <Text style={styles.infoText}>Vị trí: <Text style={styles.infoValue}>{job_detail.title}</Text></Text>
-                    <Text style={styles.infoText}>Chuyên ngành: <Text style={styles.infoValue}>{job_detail.specialized}</Text></Text>
-                    <Text style={styles.infoText}>Lương: <Text style={styles.infoValue}>{parseFloat(job_detail.salary).toLocaleString('vi-VN')} VNĐ</Text></Text>
-                    <Text style={styles.infoText}>Địa điểm: <Text style={styles.infoValue}>{job_detail.location}</Text></Text>
-                    <Text style={styles.infoText}>Mô tả: <Text style={styles.infoValue}>{job_detail.description}</Text></Text>
+                    <Text style={styles.infoText}>Vị trí: <Text style={styles.infoValue}>{jobDetail?.title || application.job_title}</Text></Text>
+                    <Text style={styles.infoText}>Chuyên ngành: <Text style={styles.infoValue}>{jobDetail?.specialized}</Text></Text>
+                    <Text style={styles.infoText}>Lương: <Text style={styles.infoValue}>{jobDetail?.salary ? parseFloat(jobDetail.salary).toLocaleString('vi-VN') + ' VNĐ' : ''}</Text></Text>
+                    <Text style={styles.infoText}>Địa điểm: <Text style={styles.infoValue}>{jobDetail?.location}</Text></Text>
+                    <Text style={styles.infoText}>Mô tả: <Text style={styles.infoValue}>{jobDetail?.description}</Text></Text>
                     <Divider style={styles.divider} />
                     <Title style={styles.sectionTitle}>Trạng thái đơn ứng tuyển</Title>
                     <Chip style={[
@@ -8,7 +8,7 @@ import { AuthContext } from "../../contexts/AuthContext"
 const ApplicationListScreen = ({ route, navigation }) => {
     const { jobId } = route.params || {};
     const { user, accessToken } = useContext(AuthContext);
-    const { applications, fetchApplications, loading, acceptApplication, rejectApplication } = useContext(ApplicationContext);
+    const { applications, fetchApplications, fetchMoreApplications, loadingMore, loading, acceptApplication, rejectApplication } = useContext(ApplicationContext);
     const [filteredCandidates, setFilteredCandidates] = useState([])
     const [searchQuery, setSearchQuery] = useState("")
     const [statusFilter, setStatusFilter] = useState("all")
@@ -17,20 +17,26 @@ const ApplicationListScreen = ({ route, navigation }) => {
     const [expandedCardId, setExpandedCardId] = useState(null)
     const [candidateReviews, setCandidateReviews] = useState([]);
 
+    // Bộ lọc job/trạng thái gửi lên server để phân trang đúng trên tập đã lọc
+    const listFilters = () => ({
+        ...(jobId ? { job: jobId } : {}),
+        ...(statusFilter !== "all" ? { status: statusFilter } : {}),
+    });
+
     // Fetch applications from API (for recruiter)
     useEffect(() => {
-        fetchApplications();
-    }, [fetchApplications]);
+        fetchApplications(listFilters());
+    }, [fetchApplications, jobId, statusFilter]);
 
     // Filter lại mỗi khi applications thay đổi
     useEffect(() => {
         filterCandidates(searchQuery, statusFilter);
     }, [applications, searchQuery, statusFilter, jobId]);
 
-    // Reload khi scroll lên đầu danh sách
+    // Reload khi scroll lên đầu danh sách; trang tiếp theo được tải khi cuộn gần cuối (onEndReached)
     const handleScroll = (event) => {
         if (event.nativeEvent.contentOffset.y <= 0 && !loading) {
-            fetchApplications();
+            fetchApplications(listFilters());
         }
     };
 
@@ -57,7 +63,7 @@ const ApplicationListScreen = ({ route, navigation }) => {
     const filterCandidates = (query, status) => {
         let filtered = applications;
         if (jobId) {
-            filtered = filtered.filter(app => String(app.job_detail?.id || app.job) === String(jobId));
+            filtered = filtered.filter(app => String(app.job) === String(jobId));
         }
         if (query) {
             filtered = filtered.filter((candidate) => candidate.applicant_detail?.username?.toLowerCase().includes(query.toLowerCase()));
@@ -97,8 +103,8 @@ const ApplicationListScreen = ({ route, navigation }) => {
             candidateId: candidate.applicant_detail.id,
             candidateName: candidate.applicant_detail.username,
             candidateAvatar: candidate.applicant_detail.avatar,
-            jobId: candidate.job_detail.id,
-            jobTitle: candidate.job_detail.title
+            jobId: candidate.job,
+            jobTitle: candidate.job_title
         })
     }
 
@@ -123,9 +129,9 @@ const ApplicationListScreen = ({ route, navigation }) => {
     // Thêm hàm chuyển sang CreateReviewScreen cho recruiter
     const handleNavigateToCreateReview = (application) => {
         navigation.navigate('CreateReview', {
-            jobId: application.job_detail?.id,
-            jobTitle: application.job_detail?.title,
-            companyId: application.job_detail?.recruiter?.company?.id,
+            jobId: application.job,
+            jobTitle: application.job_title,
+            companyId: user?.company?.id,
             applicationId: application.id,
             candidateId: application.applicant_detail?.id,
         });
@@ -145,7 +151,7 @@ const ApplicationListScreen = ({ route, navigation }) => {
                             <View style={styles.candidateDetails}>
                                 <Text style={styles.candidateName}>{item.applicant_detail?.first_name} {item.applicant_detail?.last_name}</Text>
                                 <Text style={styles.candidateJob} numberOfLines={2}>
-                                    {item.job_detail?.title}
+                                    {item.job_title}
                                 </Text>
                                 <Chip
                                     style={[styles.statusChip, { backgroundColor: getStatusColor(item.status) + "15" }]}
@@ -169,20 +175,6 @@ const ApplicationListScreen = ({ route, navigation }) => {
                         <MaterialCommunityIcons name="email" size={20} color="#666" />
                         <Text style={styles.infoText}>Email: {item.applicant_detail?.email}</Text>
                     </View>
-                    <View style={styles.infoRow}>
-                        <MaterialCommunityIcons name="briefcase" size={20} color="#666" />
-                        <Text style={styles.infoText}>{item.job_detail?.specialized}</Text>
-                    </View>
-                    <View style={styles.infoRow}>
-                        <MaterialCommunityIcons name="map-marker" size={20} color="#666" />
-                        <Text style={styles.infoText}>{item.job_detail?.location}</Text>
-                    </View>
-                    <View style={styles.infoRow}>
-                        <MaterialCommunityIcons name="currency-usd" size={20} color="#666" />
-                        <Text style={styles.infoText}>
-                            {item.job_detail?.salary ? parseFloat(item.job_detail.salary).toLocaleString('vi-VN') + ' VNĐ' : ''}
-                        </Text>
-                    </View>
                 </View>
 
                 <View style={styles.actionButtons}>
@@ -286,6 +278,9 @@ const ApplicationListScreen = ({ route, navigation }) => {
                     showsVerticalScrollIndicator={false}
                     onScroll={handleScroll}
                     scrollEventThrottle={16}
+                    onEndReached={fetchMoreApplications}
+                    onEndReachedThreshold={0.5}
+                    ListFooterComponent={loadingMore ? <ActivityIndicator style={{ marginVertical: 16 }} color="#1E88E5" /> : null}
                 />
             )}
 
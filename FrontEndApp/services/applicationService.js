@@ -2,13 +2,27 @@
 import axios from 'axios';
 import { API_ENDPOINTS } from '../apiConfig';
 
-export const fetchApplications = async (role, accessToken) => {
-    const endpoint = role === 'recruiter'
-        ? API_ENDPOINTS.APPLICATIONS_LIST_FOR_RECRUITER
-        : API_ENDPOINTS.APPLICATIONS_LIST;
-    const response = await axios.get(endpoint, {
-        headers: { 'Authorization': `Bearer ${accessToken}` }
-    });
+export const RECRUITER_APPLICATIONS_PAGE_SIZE = 20;
+
+export const fetchApplications = async (role, accessToken, filters = {}, pageUrl = null) => {
+    const headers = { 'Authorization': `Bearer ${accessToken}` };
+    if (role !== 'recruiter') {
+        // Màn hình đơn ứng tuyển của ứng viên cần thông tin nhà tuyển dụng/công ty đầy đủ
+        const response = await axios.get(API_ENDPOINTS.APPLICATIONS_LIST, {
+            params: { expand: 'job_detail', ...filters },
+            headers
+        });
+        return response.data;
+    }
+
+    // Danh sách của nhà tuyển dụng được phân trang (lọc được theo job, status, created_after/created_before)
+    // và trả về dạng rút gọn (job, job_title): mỗi lần chỉ lấy một trang, trang sau đọc theo `next` (pageUrl)
+    const response = pageUrl
+        ? await axios.get(pageUrl, { headers })
+        : await axios.get(API_ENDPOINTS.APPLICATIONS_LIST_FOR_RECRUITER, {
+            params: { page_size: RECRUITER_APPLICATIONS_PAGE_SIZE, ...filters },
+            headers
+        });
     return response.data;
 };
 
@@ -3,6 +3,7 @@ import { API_ENDPOINTS } from '../apiConfig';
 
 export const fetchFollowedCompanies = async (accessToken) => {
     const response = await axios.get(API_ENDPOINTS.FOLLOW_LIST, {
+        params: { expand: 'recruiter' },
         headers: {
             'Authorization': `Bearer ${accessToken}`,
             'Content-Type': 'application/json',
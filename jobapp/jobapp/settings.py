@@ -51,6 +51,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'jobs.middleware.CompressionMiddleware',  # Đặt đầu tiên để nén response cuối cùng
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,7 +65,11 @@ MIDDLEWARE = [
 CORS_ALLOW_ALL_ORIGINS = True
 
 REST_FRAMEWORK = {
-    'DEFAULT_AUTHENTICATION_CLASSES': ('oauth2_provider.contrib.rest_framework.OAuth2Authentication',)
+    'DEFAULT_AUTHENTICATION_CLASSES': ('oauth2_provider.contrib.rest_framework.OAuth2Authentication',),
+    'DEFAULT_RENDERER_CLASSES': (
+        'jobs.renderers.ORJSONRenderer',  # Đổi về 'rest_framework.renderers.JSONRenderer' để tắt orjson
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 OAUTH2_PROVIDER = { 'OAUTH2_BACKEND_CLASS': 'oauth2_provider.oauth2_backends.JSONOAuthLibCore', 'ALLOW_PUBLIC_CLIENTS': True }
@@ -201,6 +206,47 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = os.getenv("EMAIL_SEND")
 
+# Cache: Redis khi có REDIS_URL (production), mặc định locmem (dev/test)
+REDIS_URL = os.getenv("REDIS_URL")
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Cache danh sách tin tuyển dụng (jobs/cache.py)
+JOBPOST_LIST_CACHE_ALIAS = 'default'
+JOBPOST_LIST_CACHE_TIMEOUT = 300  # giây
+JOBPOST_LIST_ETAGS = None  # ETag/304 cho danh sách: None = chỉ bật khi cache dùng chung (REDIS_URL)
+RECRUITER_SUMMARY_CACHE_TIMEOUT = 3600  # giây, bị xóa ngay khi đơn ứng tuyển/tin thay đổi
+
+# Hàng đợi email báo tin mới cho follower (jobs/notifications.py), gửi bằng: python manage.py send_notifications --loop
+NOTIFICATION_BATCH_SIZE = 100
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_RETRY_BASE_SECONDS = 60  # thử lại sau 1, 2, 4, 8... phút
+
+# Xác minh ảnh công ty ngoài request (jobs/verify_image.py)
+IMAGE_VERIFICATION_BACKEND = 'jobs.verify_image.GoogleVisionBackend'  # 'jobs.verify_image.LocalStubBackend' cho dev/test
+IMAGE_VERIFICATION_IN_PROCESS = False  # True: web worker tự mở luồng nền sau upload (dev); production chạy verify_company_images --loop
+IMAGE_VERIFICATION_BATCH_SIZE = 16
+IMAGE_VERIFICATION_DOWNLOAD_TIMEOUT = 10  # giây
+IMAGE_UPLOAD_WORKERS = 4  # số ảnh công ty tải lên Cloudinary song song trong một request
+IMAGE_UPLOAD_MAX_DIMENSION = 1600  # px, ảnh upload (avatar, ảnh công ty) được thu nhỏ trước khi lưu
+IMAGE_UPLOAD_FORMAT = 'WEBP'
+IMAGE_UPLOAD_QUALITY = 80
+
+# Nạp chỉ mục gợi ý tìm kiếm (jobs/suggest.py) khi server WSGI/ASGI khởi động (không chạy với các lệnh manage.py)
+SUGGEST_WARM_ON_STARTUP = True
+
+# Nén response JSON (jobs/middleware.py): brotli nếu client hỗ trợ và có thư viện, không thì gzip
+RESPONSE_COMPRESSION_MIN_SIZE = 1024  # byte
+RESPONSE_COMPRESSION_CONTENT_TYPES = ['application/json']
+RESPONSE_COMPRESSION_GZIP_LEVEL = 6
+RESPONSE_COMPRESSION_BROTLI_QUALITY = 5
+
 # import firebase_admin
 # from firebase_admin import credentials
 #
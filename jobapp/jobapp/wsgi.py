@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'jobapp.settings')
 
 application = get_wsgi_application()
+
+# Nạp sẵn chỉ mục gợi ý tìm kiếm ở luồng nền khi server khởi động (SUGGEST_WARM_ON_STARTUP)
+from jobs.suggest import warm_on_startup  # noqa: E402
+
+warm_on_startup()
@@ -1,11 +1,14 @@
 from django.contrib import admin
-from jobs.models import User, Company, CompanyImage, JobPost, Application, Follow, Review, VerificationDocument
+from jobs.models import User, Company, CompanyImage, JobPost, Application, Follow, Review, VerificationDocument, \
+    NotificationOutbox, ImageFingerprint
 from django.db.models import Count
 from django.template.response import TemplateResponse
 from django.urls import path
 from django.utils import timezone
 from datetime import timedelta, datetime
 from django.utils.html import mark_safe
+from jobs.cache import listing_cache_stats
+from jobs.image_hash import similar_fingerprints
 
 class MyAdminSite(admin.AdminSite):
     site_header = 'Jops App'
@@ -72,6 +75,7 @@ class MyAdminSite(admin.AdminSite):
             'candidate_data': candidate_data,
             'start_date': start_date.strftime('%Y-%m-%d'),
             'end_date': end_date.strftime('%Y-%m-%d'),
+            'listing_cache': listing_cache_stats(),
         }
 
         return TemplateResponse(request, 'admin/stats_view.html', context)
@@ -109,11 +113,26 @@ class CompanyAdmin(admin.ModelAdmin):
     inlines = [CompanyImageInlineAdmin, ]
 
 class CompanyImageAdmin(admin.ModelAdmin):
-    list_display = ['id', 'company', 'image', 'created_date', 'updated_date']
-    list_filter = ['company']
+    list_display = ['id', 'company', 'image', 'verification_status', 'verified_at', 'created_date', 'updated_date']
+    list_filter = ['verification_status', 'company']
     search_fields = ['company__name']
     ordering = ['-created_date']
-    readonly_fields = ['image_display']
+    readonly_fields = ['image_display', 'fingerprint', 'similar_companies', 'verification_reason',
+                       'verification_labels', 'verification_attempts', 'verified_at']
+    actions = ['reverify']
+
+    @admin.display(description='Công ty dùng ảnh trùng/gần trùng')
+    def similar_companies(self, obj):
+        return companies_using(obj.fingerprint, exclude_company_id=obj.company_id)
+
+    @admin.action(description='Xác minh lại ảnh đã chọn')
+    def reverify(self, request, queryset):
+        # Đưa về pending; lệnh verify_company_images (hoặc luồng nền) sẽ xử lý lại.
+        # Xóa cả kết quả lưu trên fingerprint, nếu không ảnh sẽ lấy lại đúng kết quả cũ
+        ImageFingerprint.objects.filter(images__in=queryset).update(
+            verification_status='pending', verified_at=None)
+        count = queryset.update(verification_status='pending', verification_attempts=0)
+        self.message_user(request, f'Đã đưa {count} ảnh vào hàng đợi xác minh.')
 
     def image_display(self, obj):
         if obj.image:
@@ -123,6 +142,7 @@ class JobPostAdmin(admin.ModelAdmin):
     list_display = ['id', 'title', 'specialized', 'salary', 'working_hours', 'location', 'recruiter', 'created_date', 'updated_date']
     list_filter = ['specialized', 'location', 'recruiter']
     search_fields = ['title', 'description', 'specialized', 'location', 'recruiter__username', 'recruiter__email']
+    readonly_fields = JobPost.COUNTER_FIELDS
     ordering = ['-created_date']
 
 class ApplicationAdmin(admin.ModelAdmin):
@@ -149,6 +169,44 @@ class VerificationDocumentAdmin(admin.ModelAdmin):
     search_fields = ['user__username']
     ordering = ['-created_date']
 
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ['id', 'job', 'status', 'sent_count', 'attempts', 'next_attempt_at', 'last_error', 'created_date']
+    list_filter = ['status']
+    search_fields = ['job__title']
+    ordering = ['-created_date']
+
+def companies_using(fingerprint, exclude_company_id=None):
+    # Tên các công ty có ảnh cùng fingerprint hoặc fingerprint gần trùng (tra theo các dải hash có index)
+    if fingerprint is None:
+        return '-'
+    fingerprint_ids = [fingerprint.pk] + [similar.pk for similar in similar_fingerprints(fingerprint)]
+    companies = (Company.objects.filter(images__fingerprint__in=fingerprint_ids)
+                 .exclude(id=exclude_company_id).distinct().order_by('name').values_list('name', flat=True))
+    return ', '.join(companies) or '-'
+
+class ImageFingerprintAdmin(admin.ModelAdmin):
+    # Sắp theo số công ty dùng cùng ảnh: ảnh mạng/ảnh stock bị dùng lại hiện lên đầu
+    list_display = ['id', 'content_hash', 'phash', 'verification_status', 'company_count', 'verified_at',
+                    'created_date']
+    list_filter = ['verification_status']
+    search_fields = ['content_hash', 'phash', 'images__company__name']
+    readonly_fields = ['content_hash', 'phash', 'similar_companies', 'verification_reason', 'verification_labels',
+                       'verified_at']
+    exclude = ['phash_band_0', 'phash_band_1', 'phash_band_2', 'phash_band_3']
+
+    def get_queryset(self, request):
+        return (super().get_queryset(request)
+                .annotate(company_count=Count('images__company', distinct=True))
+                .order_by('-company_count', '-id'))
+
+    @admin.display(description='Số công ty', ordering='company_count')
+    def company_count(self, obj):
+        return obj.company_count
+
+    @admin.display(description='Công ty dùng ảnh trùng/gần trùng')
+    def similar_companies(self, obj):
+        return companies_using(obj)
+
 admin_site = MyAdminSite(name='admin')
 
 admin_site.register(User, UserAdmin)
@@ -158,4 +216,6 @@ admin_site.register(JobPost, JobPostAdmin)
 admin_site.register(Application, ApplicationAdmin)
 admin_site.register(Review, ReviewAdmin)
 admin_site.register(Follow,FollowAdmin)
-admin_site.register(VerificationDocument)
\ No newline at end of file
+admin_site.register(VerificationDocument)
+admin_site.register(NotificationOutbox, NotificationOutboxAdmin)
+admin_site.register(ImageFingerprint, ImageFingerprintAdmin)
\ No newline at end of file
@@ -6,4 +6,4 @@ class JobsConfig(AppConfig):
     name = 'jobs'
 
     def ready(self):
-        import jobs.signals
\ No newline at end of file
+        import jobs.signals
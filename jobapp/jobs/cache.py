@@ -0,0 +1,119 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+VERSION_KEY = 'jobposts:list:version'
+HITS_KEY = 'jobposts:list:hits'
+MISSES_KEY = 'jobposts:list:misses'
+CHANGED_AT_KEY = 'jobposts:list:changed_at'
+SUMMARY_KEY = 'jobposts:summary:{}'
+# Cache riêng từng tiến trình: phiên bản danh sách không đồng bộ giữa các worker
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def get_cache():
+    return caches[getattr(settings, 'JOBPOST_LIST_CACHE_ALIAS', 'default')]
+
+
+def _incr(cache, key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Khóa chưa tồn tại (hoặc đã bị đẩy ra khỏi cache)
+        cache.add(key, 0, None)
+        return cache.incr(key)
+
+
+def get_listing_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Khởi tạo bằng thời điểm hiện tại để không trùng phiên bản cũ nếu khóa bị mất
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def listing_version_is_shared():
+    """
+    Phiên bản danh sách chỉ dùng làm ETag khi mọi worker đọc cùng một cache (Redis...). Với LocMemCache,
+    worker không xử lý lần ghi giữ phiên bản cũ và sẽ trả 304 kèm dữ liệu cũ mãi mãi.
+    JOBPOST_LIST_ETAGS=True/False ghi đè việc tự nhận biết (None).
+    """
+    enabled = getattr(settings, 'JOBPOST_LIST_ETAGS', None)
+    if enabled is not None:
+        return enabled
+    return not isinstance(get_cache(), PROCESS_LOCAL_CACHES)
+
+
+def get_listing_changed_at():
+    # Thời điểm (epoch giây) dữ liệu danh sách thay đổi lần cuối, dùng cho Last-Modified
+    cache = get_cache()
+    changed_at = cache.get(CHANGED_AT_KEY)
+    if changed_at is None:
+        cache.add(CHANGED_AT_KEY, int(time.time()), None)
+        changed_at = cache.get(CHANGED_AT_KEY)
+    return changed_at
+
+
+def invalidate_listing_cache():
+    # Tăng phiên bản: mọi khóa cũ trở nên không dùng được và tự hết hạn
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+    cache.set(CHANGED_AT_KEY, int(time.time()), None)
+
+
+def request_digest(request):
+    # Chuẩn hóa query params: sắp xếp, bỏ giá trị rỗng; host nằm trong khóa vì link next là URL tuyệt đối
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values if value != ''
+    )
+    raw = f'{request.build_absolute_uri(request.path)}?{params!r}'
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def listing_cache_key(request):
+    return f'jobposts:list:v{get_listing_version()}:{request_digest(request)}'
+
+
+def get_cached_listing(key):
+    cache = get_cache()
+    data = cache.get(key)
+    _incr(cache, MISSES_KEY if data is None else HITS_KEY)
+    return data
+
+
+def set_cached_listing(key, data):
+    get_cache().set(key, data, getattr(settings, 'JOBPOST_LIST_CACHE_TIMEOUT', 300))
+
+
+def listing_cache_stats():
+    cache = get_cache()
+    return {
+        'version': cache.get(VERSION_KEY),
+        'hits': cache.get(HITS_KEY, 0),
+        'misses': cache.get(MISSES_KEY, 0),
+    }
+
+
+# --- Tổng hợp đơn ứng tuyển theo từng tin của nhà tuyển dụng ---
+
+def get_recruiter_summary(recruiter_id):
+    return get_cache().get(SUMMARY_KEY.format(recruiter_id))
+
+
+def set_recruiter_summary(recruiter_id, data):
+    get_cache().set(SUMMARY_KEY.format(recruiter_id), data, getattr(settings, 'RECRUITER_SUMMARY_CACHE_TIMEOUT', 3600))
+
+
+def invalidate_recruiter_summary(*recruiter_ids):
+    get_cache().delete_many([SUMMARY_KEY.format(recruiter_id) for recruiter_id in recruiter_ids])
@@ -0,0 +1,60 @@
+"""
+Validator cho GET có điều kiện (If-None-Match / If-Modified-Since), tính trước khi serializer chạy.
+Danh sách dùng phiên bản cache danh sách (tăng mỗi khi JobPost/Application/Company/CompanyImage thay đổi,
+xem signals.invalidate_job_post_listing) nên không tốn truy vấn nào; chi tiết tin đọc thêm một dòng theo PK.
+Chỉ bật khi cache dùng chung giữa các worker (cache.listing_version_is_shared), nếu không trả về (None, None).
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_listing_changed_at, get_listing_version, listing_version_is_shared, request_digest
+from .counters import COUNTER_FIELDS
+from .models import JobPost
+
+# Các cột ảnh hưởng tới nội dung trang chi tiết tin ngoài phiên bản danh sách
+JOB_POST_DETAIL_STAMP = ('updated_date', *COUNTER_FIELDS, 'recruiter__username', 'recruiter__first_name',
+                         'recruiter__last_name', 'recruiter__email', 'recruiter__avatar')
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.sha1(repr(parts).encode('utf-8')).hexdigest())
+
+
+def stamp_value(value):
+    # CloudinaryResource không có repr ổn định -> dùng public_id + version
+    if hasattr(value, 'public_id'):
+        return f'{value.public_id}@{value.version}'
+    return value
+
+
+def listing_validators(request):
+    if not listing_version_is_shared():
+        return None, None
+    return make_etag(get_listing_version(), request_digest(request)), get_listing_changed_at()
+
+
+def job_post_detail_validators(request, pk):
+    if not listing_version_is_shared() or not str(pk).isdigit():
+        return None, None
+    row = JobPost.objects.filter(pk=pk, active=True).values_list(*JOB_POST_DETAIL_STAMP).first()
+    if row is None:
+        return None, None  # để view trả 404 như bình thường
+    etag = make_etag(get_listing_version(), request_digest(request), *map(stamp_value, row))
+    return etag, None
+
+
+def not_modified(request, etag, last_modified=None):
+    # Trả về 304 nếu client đã có bản hiện tại, ngược lại None
+    if etag is None:
+        return None
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified=None):
+    if etag is not None and response.status_code == 200:
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    return response
@@ -0,0 +1,129 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F, Max, Q
+from rest_framework import serializers
+
+from .models import JobPost, Application
+
+# Cột đếm trên JobPost tương ứng với từng trạng thái đơn ứng tuyển
+STATUS_COUNTER_FIELDS = {
+    'pending': 'pending_count',
+    'accepted': 'accepted_count',
+    'rejected': 'rejected_count',
+}
+COUNTER_FIELDS = JobPost.COUNTER_FIELDS
+
+# Các trường của Application cần biết giá trị cũ để cập nhật bộ đếm
+APPLICATION_TRACKED_FIELDS = ('job_id', 'status', 'active')
+
+
+def application_state(application):
+    return {field: getattr(application, field) for field in APPLICATION_TRACKED_FIELDS}
+
+
+def counter_keys(state):
+    # Các cặp (job_id, cột đếm) mà một đơn ứng tuyển đóng góp; đơn không hoạt động không được đếm
+    if not state or not state['active']:
+        return []
+    keys = [(state['job_id'], 'application_count')]
+    if state['status'] in STATUS_COUNTER_FIELDS:
+        keys.append((state['job_id'], STATUS_COUNTER_FIELDS[state['status']]))
+    return keys
+
+
+def apply_counter_deltas(deltas):
+    by_job = defaultdict(dict)
+    for (job_id, field), delta in deltas.items():
+        if delta:
+            by_job[job_id][field] = F(field) + delta
+    for job_id, updates in by_job.items():
+        # queryset.update: một câu UPDATE nguyên tử, không kích hoạt signals của JobPost
+        JobPost.objects.filter(pk=job_id).update(**updates)
+
+
+def update_application_counters(previous, current):
+    bulk_update_application_counters([(previous, current)])
+
+
+def bulk_update_application_counters(changes):
+    # changes: các cặp (trạng thái cũ, trạng thái mới); gộp lại thành một UPDATE cho mỗi tin
+    deltas = Counter()
+    for previous, current in changes:
+        for key in counter_keys(previous):
+            deltas[key] -= 1
+        for key in counter_keys(current):
+            deltas[key] += 1
+    apply_counter_deltas(deltas)
+
+
+def recruiter_job_summary(recruiter):
+    """
+    Số đơn theo trạng thái (đọc từ bộ đếm) và thời điểm nộp đơn gần nhất cho từng tin đang hoạt động
+    của nhà tuyển dụng, trong một truy vấn GROUP BY.
+    """
+    to_datetime = serializers.DateTimeField().to_representation
+    rows = (JobPost.objects.filter(recruiter=recruiter, active=True)
+            .annotate(latest_application_date=Max('applications__created_date', filter=Q(applications__active=True)))
+            .values('id', 'title', *COUNTER_FIELDS, 'latest_application_date')
+            .order_by('-created_date'))
+
+    jobs, totals, latest = [], dict.fromkeys(COUNTER_FIELDS, 0), None
+    for row in rows:
+        for field in COUNTER_FIELDS:
+            totals[field] += row[field]
+        if row['latest_application_date'] and (latest is None or row['latest_application_date'] > latest):
+            latest = row['latest_application_date']
+        row['latest_application_date'] = to_datetime(row['latest_application_date'])
+        jobs.append(row)
+    totals['latest_application_date'] = to_datetime(latest)
+    return {'jobs': jobs, 'totals': totals}
+
+
+def count_applications(rows):
+    # rows: (job_id, status) của các đơn đang hoạt động -> {job_id: {cột đếm: giá trị}}
+    counts = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    for job_id, status in rows:
+        counts[job_id]['application_count'] += 1
+        if status in STATUS_COUNTER_FIELDS:
+            counts[job_id][STATUS_COUNTER_FIELDS[status]] += 1
+    return counts
+
+
+def drifted_jobs(counts, job_ids, batch_size):
+    zero = dict.fromkeys(COUNTER_FIELDS, 0)
+    jobs = JobPost.objects.only('id', *COUNTER_FIELDS).order_by('id')
+    if job_ids is not None:
+        jobs = jobs.filter(id__in=job_ids)
+    drifted = []
+    for job in jobs.iterator(chunk_size=batch_size):
+        expected = counts.get(job.id, zero)
+        if any(getattr(job, field) != value for field, value in expected.items()):
+            for field, value in expected.items():
+                setattr(job, field, value)
+            drifted.append(job)
+    return drifted
+
+
+def reconcile_application_counters(batch_size=500):
+    """
+    Tính lại bộ đếm từ bảng Application và chỉ ghi những tin bị lệch.
+    Lượt đầu đọc không khóa để tìm tin nghi lệch; sau đó từng lô tin bị khóa (select_for_update) rồi đếm lại
+    trong cùng transaction, nên các lần cộng/trừ F() đồng thời không bị ghi đè bởi giá trị đếm cũ.
+    Trả về số tin đã được sửa.
+    """
+    rows = Application.objects.filter(active=True).values_list('job_id', 'status').order_by()
+    counts = count_applications(rows.iterator(chunk_size=2000))
+    suspects = [job.id for job in drifted_jobs(counts, None, batch_size)]
+
+    repaired = 0
+    for start in range(0, len(suspects), batch_size):
+        job_ids = suspects[start:start + batch_size]
+        with transaction.atomic():
+            # Khóa theo thứ tự id để không deadlock với lần đối soát khác
+            list(JobPost.objects.select_for_update().filter(id__in=job_ids).order_by('id').values_list('id'))
+            rows = Application.objects.filter(active=True, job_id__in=job_ids).values_list('job_id', 'status')
+            drifted = drifted_jobs(count_applications(rows.order_by()), job_ids, batch_size)
+            JobPost.objects.bulk_update(drifted, COUNTER_FIELDS, batch_size=batch_size)
+        repaired += len(drifted)
+    return repaired
@@ -0,0 +1,128 @@
+from collections import Counter
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+
+from .models import JobPost, JobFacetCount
+
+# Các khoảng lương (VNĐ) cố định để đếm facet; None = không giới hạn.
+# Mỗi khoảng trả kèm min/max để client điền vào salary__gte/salary__lte
+SALARY_BUCKETS = [
+    (None, Decimal('3000000')),
+    (Decimal('3000000'), Decimal('5000000')),
+    (Decimal('5000000'), Decimal('10000000')),
+    (Decimal('10000000'), Decimal('20000000')),
+    (Decimal('20000000'), None),
+]
+
+FACET_LIMIT = 50
+
+
+def salary_bucket_key(low, high):
+    return f"{int(low) if low is not None else ''}-{int(high) if high is not None else ''}"
+
+
+def salary_bucket(salary):
+    for low, high in SALARY_BUCKETS:
+        if (low is None or salary >= low) and (high is None or salary < high):
+            return salary_bucket_key(low, high)
+    return None
+
+
+def facet_keys(state):
+    # Các cặp (facet, value) mà một tin tuyển dụng đóng góp; tin không hoạt động không được đếm
+    if not state or not state['active']:
+        return []
+    keys = [('specialized', state['specialized']), ('location', state['location'])]
+    if state['salary'] is not None and (bucket := salary_bucket(Decimal(state['salary']))):
+        keys.append(('salary', bucket))
+    return keys
+
+
+def apply_deltas(deltas):
+    for (facet, value), delta in deltas.items():
+        if not delta or not value:
+            continue
+        # Không để số đếm âm (ví dụ trừ một tin chưa từng được cộng vào bảng)
+        count = Greatest(F('count') + delta, 0)
+        updated = JobFacetCount.objects.filter(facet=facet, value=value).update(count=count)
+        if not updated and delta > 0:
+            try:
+                with transaction.atomic():
+                    JobFacetCount.objects.create(facet=facet, value=value, count=delta)
+            except IntegrityError:
+                # Tiến trình khác vừa tạo dòng này
+                JobFacetCount.objects.filter(facet=facet, value=value).update(count=count)
+
+
+def update_facet_counts(previous, current):
+    deltas = Counter()
+    for key in facet_keys(previous):
+        deltas[key] -= 1
+    for key in facet_keys(current):
+        deltas[key] += 1
+    apply_deltas(deltas)
+
+
+def rebuild_facet_counts():
+    counts = Counter()
+    states = JobPost.objects.filter(active=True).values('active', 'specialized', 'location', 'salary')
+    for state in states.iterator(chunk_size=1000):
+        counts.update(facet_keys(state))
+
+    with transaction.atomic():
+        JobFacetCount.objects.all().delete()
+        JobFacetCount.objects.bulk_create([
+            JobFacetCount(facet=facet, value=value, count=count)
+            for (facet, value), count in counts.items() if value
+        ])
+    return len(counts)
+
+
+def format_salary_buckets(counts):
+    return [
+        {'value': salary_bucket_key(low, high),
+         'min': int(low) if low is not None else None,
+         'max': int(high) if high is not None else None,
+         'count': counts.get(salary_bucket_key(low, high), 0)}
+        for low, high in SALARY_BUCKETS
+    ]
+
+
+def stored_facets():
+    # Đọc từ bảng đếm đã tính sẵn (không lọc)
+    result = {}
+    for facet in ('specialized', 'location'):
+        rows = (JobFacetCount.objects.filter(facet=facet, count__gt=0)
+                .order_by('-count', 'value')[:FACET_LIMIT])
+        result[facet] = [{'value': row.value, 'count': row.count} for row in rows]
+
+    salary_counts = dict(JobFacetCount.objects.filter(facet='salary', count__gt=0).values_list('value', 'count'))
+    result['salary'] = format_salary_buckets(salary_counts)
+    return result
+
+
+def filtered_facets(queryset):
+    # Khi có bộ lọc: GROUP BY trên tập đã lọc (đã thu hẹp bởi index)
+    queryset = queryset.order_by()
+    result = {}
+    for facet in ('specialized', 'location'):
+        rows = (queryset.values(facet).annotate(count=Count('id'))
+                .order_by('-count', facet)[:FACET_LIMIT])
+        result[facet] = [{'value': row[facet], 'count': row['count']} for row in rows]
+
+    aggregates = {}
+    for i, (low, high) in enumerate(SALARY_BUCKETS):
+        condition = Q()
+        if low is not None:
+            condition &= Q(salary__gte=low)
+        if high is not None:
+            condition &= Q(salary__lt=high)
+        aggregates[f'bucket_{i}'] = Count('id', filter=condition)
+    row = queryset.aggregate(**aggregates)
+    result['salary'] = format_salary_buckets({
+        salary_bucket_key(low, high): row[f'bucket_{i}'] for i, (low, high) in enumerate(SALARY_BUCKETS)
+    })
+    return result
@@ -0,0 +1,167 @@
+"""
+Đường đọc nhanh cho các danh sách lớn: dựng JSON trực tiếp từ các dòng .values() bằng
+các hàm ánh xạ dựng sẵn, thay vì khởi tạo serializer và gọi to_representation cho từng bản ghi.
+Kết quả phải giống hệt dạng mặc định của serializer tương ứng (xem FastReadTests).
+"""
+from operator import itemgetter
+
+from django.db.models import OuterRef, Subquery
+from rest_framework import serializers
+
+from .images import image_url
+from .models import Company, CompanyImage
+
+# Dùng lại field của DRF cho các kiểu cần định dạng để giữ nguyên cách hiển thị
+_salary = serializers.DecimalField(max_digits=10, decimal_places=2).to_representation
+_datetime = serializers.DateTimeField().to_representation
+
+
+def cloudinary_url(value):
+    return image_url(value) if value else value
+
+
+def column(name, convert=None):
+    get = itemgetter(name)
+    if convert is None:
+        return get
+    return lambda row: convert(get(row))
+
+
+def compile_mapper(**fields):
+    # fields: khóa đầu ra -> hàm nhận một dòng; thứ tự khóa giữ như serializer
+    items = tuple(fields.items())
+    return lambda row: {key: get(row) for key, get in items}
+
+
+def prefixed(prefix, **fields):
+    return {key: column(f'{prefix}{name}', convert) for key, (name, convert) in fields.items()}
+
+
+def avatar(size):
+    return lambda value: image_url(value, size)
+
+
+def user_fields(prefix='', size='full'):
+    # UserSerializer: id, username, first_name, last_name, email, role, avatar
+    return prefixed(
+        prefix, id=('id', None), username=('username', None), first_name=('first_name', None),
+        last_name=('last_name', None), email=('email', None), role=('role', None), avatar=('avatar', avatar(size)),
+    )
+
+
+def candidate_fields(prefix='', size='full'):
+    # CandidateSerializer: id, first_name, last_name, username, email, avatar
+    return prefixed(
+        prefix, id=('id', None), first_name=('first_name', None), last_name=('last_name', None),
+        username=('username', None), email=('email', None), avatar=('avatar', avatar(size)),
+    )
+
+
+def user_columns(prefix=''):
+    return [f'{prefix}{name}' for name in ('id', 'username', 'first_name', 'last_name', 'email', 'role', 'avatar')]
+
+
+def company_summaries(recruiter_ids, size='full'):
+    # {recruiter_id: {id, name, logo}} trong một truy vấn; logo = ảnh đầu tiên giống company_summary
+    logo = CompanyImage.objects.filter(company=OuterRef('pk')).order_by('-id').values('image')[:1]
+    rows = (Company.objects.filter(user_id__in=set(recruiter_ids)).annotate(logo=Subquery(logo))
+            .values_list('user_id', 'id', 'name', 'logo'))
+    return {user_id: {'id': company_id, 'name': name, 'logo': image_url(logo, size)}
+            for user_id, company_id, name, logo in rows}
+
+
+# --- Tin tuyển dụng (dạng rút gọn của JobPostSerializer) ---
+
+# Chỉ các cột của bảng JobPost: COUNT(*) và truy vấn trang không cần JOIN
+JOB_POST_COUNTERS = ('application_count', 'pending_count', 'accepted_count', 'rejected_count')
+JOB_POST_COLUMNS = ['id', 'title', 'specialized', 'salary', 'working_hours', 'location', 'created_date',
+                    'recruiter_id', *JOB_POST_COUNTERS]
+
+
+def job_post_values(queryset):
+    # Giữ các annotation (search_rank, distance_km...) để phân trang cursor vẫn dùng được
+    return queryset.prefetch_related(None).values(*JOB_POST_COLUMNS, *queryset.query.annotations)
+
+
+def job_post_mapper(companies, prefix=''):
+    recruiter_id = itemgetter(f'{prefix}recruiter_id')
+    return compile_mapper(
+        id=column(f'{prefix}id'), title=column(f'{prefix}title'), specialized=column(f'{prefix}specialized'),
+        salary=column(f'{prefix}salary', _salary), working_hours=column(f'{prefix}working_hours'),
+        location=column(f'{prefix}location'), company=lambda row: companies.get(recruiter_id(row)),
+        **{name: column(f'{prefix}{name}') for name in JOB_POST_COUNTERS},
+    )
+
+
+def job_post_rows(rows, size='full'):
+    rows = list(rows)
+    to_json = job_post_mapper(company_summaries((row['recruiter_id'] for row in rows), size))
+    return [to_json(row) for row in rows]
+
+
+# --- Đơn ứng tuyển cho nhà tuyển dụng (dạng rút gọn của ApplicationSerializer) ---
+
+APPLICATION_COLUMNS = [
+    'id', 'job_id', 'job__title', 'cv', 'status', 'created_date', 'updated_date',
+    *(f'applicant__{name}' for name in ('id', 'first_name', 'last_name', 'username', 'email', 'avatar')),
+]
+
+
+def application_values(queryset):
+    return queryset.prefetch_related(None).values(*APPLICATION_COLUMNS)
+
+
+def application_rows(rows, size='full'):
+    to_json = compile_mapper(
+        id=column('id'), applicant_detail=compile_mapper(**candidate_fields('applicant__', size)),
+        job=column('job_id'), job_title=column('job__title'), cv=column('cv', cloudinary_url), status=column('status'),
+        created_date=column('created_date', _datetime), updated_date=column('updated_date', _datetime),
+    )
+    return [to_json(row) for row in rows]
+
+
+# --- Danh sách đánh giá ---
+
+REVIEW_COLUMNS = ['id', 'rating', 'comment', 'created_date', *user_columns('reviewer__')]
+
+
+def review_values(queryset, reviewed_prefix=None):
+    columns = REVIEW_COLUMNS + (user_columns(reviewed_prefix) if reviewed_prefix else [])
+    return queryset.values(*columns)
+
+
+def recruiter_json(recruiter, size='full'):
+    # RecruiterSerializer (chỉ các trường đọc) cho một nhà tuyển dụng
+    company = getattr(recruiter, 'company', None)
+    data = {
+        'id': recruiter.id, 'first_name': recruiter.first_name, 'last_name': recruiter.last_name,
+        'username': recruiter.username, 'email': recruiter.email, 'avatar': image_url(recruiter.avatar, size),
+        'company': None,
+    }
+    if company is not None:
+        data['company'] = {
+            'id': company.id, 'name': company.name, 'tax_code': company.tax_code,
+            'description': company.description, 'location': company.location,
+            'is_verified': company.is_verified, 'images': [image_url(img.image, size) for img in company.images.all()],
+        }
+    return data
+
+
+def company_review_rows(rows, recruiter, size='full'):
+    # CandidateReviewRecruiterSerializer: reviewed_user là cùng một nhà tuyển dụng cho cả danh sách
+    reviewed_user = recruiter_json(recruiter, size)
+    to_json = compile_mapper(
+        id=column('id'), reviewer=compile_mapper(**user_fields('reviewer__', size)), reviewed_user=lambda row: reviewed_user,
+        rating=column('rating'), comment=column('comment'), created_date=column('created_date', _datetime),
+    )
+    return [to_json(row) for row in rows]
+
+
+def candidate_review_rows(rows, size='full'):
+    # RecruiterReviewCandidateSerializer
+    to_json = compile_mapper(
+        id=column('id'), reviewer=compile_mapper(**user_fields('reviewer__', size)),
+        reviewed_user=compile_mapper(**user_fields('reviewed_user__', size)),
+        rating=column('rating'), comment=column('comment'), created_date=column('created_date', _datetime),
+    )
+    return [to_json(row) for row in rows]
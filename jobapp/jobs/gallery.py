@@ -0,0 +1,49 @@
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .image_hash import fingerprint_for, read_upload
+from .images import upload_images
+from .models import Company, CompanyImage
+
+MIN_COMPANY_IMAGES = 3  # số ảnh môi trường làm việc tối thiểu của một công ty
+
+
+def sync_company_images(company, uploads, keep_ids=(), min_images=MIN_COMPANY_IMAGES):
+    """
+    Cập nhật bộ ảnh công ty theo phần thay đổi: giữ ảnh có id trong keep_ids và ảnh trùng nội dung
+    (content_hash) với file gửi lên, chỉ tải lên những file mới và xóa những ảnh không còn trong bộ ảnh.
+    Ảnh được giữ không phải tải lên hay xác minh lại. Trả về (số ảnh thêm, số ảnh xóa).
+    Ném ValidationError (trước khi tải lên hay xóa gì) nếu keep_ids có ảnh không thuộc công ty hoặc
+    bộ ảnh cuối cùng, sau khi gộp ảnh trùng, có ít hơn min_images ảnh.
+    """
+    with transaction.atomic():
+        # Khóa dòng công ty: hai lần sửa bộ ảnh cùng lúc không tính phần thay đổi trên dữ liệu cũ
+        Company.objects.select_for_update().filter(pk=company.pk).first()
+        # Fingerprint tạo trong cùng transaction: ảnh bị từ chối hoặc tải lên lỗi không để lại fingerprint mồ côi
+        fingerprints = [fingerprint_for(read_upload(upload)) for upload in uploads]
+        existing = list(company.images.order_by('id').values_list('id', 'fingerprint_id'))
+        by_fingerprint = {}
+        for image_id, fingerprint_id in existing:
+            by_fingerprint.setdefault(fingerprint_id, image_id)
+
+        keep = set(keep_ids)
+        if unknown := keep - {image_id for image_id, _ in existing}:
+            raise ValidationError({"keep": f"Ảnh không thuộc công ty: {sorted(unknown)}."})
+        new_uploads, new_fingerprints = [], []
+        for upload, fingerprint in zip(uploads, fingerprints):
+            if fingerprint.pk in by_fingerprint:
+                keep.add(by_fingerprint[fingerprint.pk])
+            elif fingerprint not in new_fingerprints:  # Cùng một file gửi hai lần chỉ lưu một ảnh
+                new_uploads.append(upload)
+                new_fingerprints.append(fingerprint)
+        if len(keep) + len(new_uploads) < min_images:
+            raise ValidationError({"images": f"Công ty phải có ít nhất {min_images} ảnh môi trường làm việc "
+                                             f"(ảnh trùng nhau chỉ tính một lần)."})
+
+        resources = upload_images(CompanyImage._meta.get_field('image'), new_uploads)
+        removed = [image_id for image_id, _ in existing if image_id not in keep]
+        if removed:
+            CompanyImage.objects.filter(id__in=removed).delete()
+        for resource, fingerprint in zip(resources, new_fingerprints):
+            CompanyImage.objects.create(company=company, image=resource, fingerprint=fingerprint)
+    return len(resources), len(removed)
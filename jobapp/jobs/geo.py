@@ -0,0 +1,127 @@
+import json
+import math
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.db.models import FloatField, Q
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+from .search import tokenize
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'vn_gazetteer.json'
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+GEO_CELL_SIZE = 0.25  # độ (~28km), kích thước ô lưới dùng để lọc thô
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 500
+MAX_CELLS = 400  # bán kính quá lớn thì chỉ lọc theo khung lat/lng
+
+_DISTRICT_NUMBER_RE = re.compile(r'^Quận (\d+)$')
+
+
+def _normalize(text):
+    return ' '.join(tokenize(text))
+
+
+def _district_aliases(name):
+    aliases = {_normalize(name)}
+    if (match := _DISTRICT_NUMBER_RE.match(name)):
+        number = match.group(1)
+        aliases.update({f'q {number}', f'q{number}', f'district {number}'})
+    return aliases
+
+
+@lru_cache(maxsize=1)
+def load_gazetteer():
+    # Trả về danh sách (alias, tên tỉnh, lat, lng, là quận/huyện?) sắp theo alias dài trước
+    with open(GAZETTEER_PATH, encoding='utf-8') as f:
+        data = json.load(f)
+
+    entries = []
+    for province in data['provinces']:
+        aliases = {_normalize(province['name'])} | {_normalize(a) for a in province['aliases']}
+        for alias in aliases:
+            entries.append((alias, province['name'], province['lat'], province['lng'], False))
+    for district in data['districts']:
+        for alias in _district_aliases(district['name']):
+            entries.append((alias, district['province'], district['lat'], district['lng'], True))
+
+    entries.sort(key=lambda entry: len(entry[0]), reverse=True)
+    return [
+        (re.compile(rf'(?<![a-z0-9]){re.escape(alias)}(?![a-z0-9])'), province, lat, lng, is_district)
+        for alias, province, lat, lng, is_district in entries
+    ]
+
+
+def geocode(location):
+    """
+    Tra tọa độ gần đúng cho chuỗi địa điểm bằng gazetteer đóng gói sẵn (không gọi mạng).
+    Ưu tiên quận/huyện thuộc tỉnh được nhắc tới, sau đó tới tỉnh/thành phố.
+    """
+    text = _normalize(location)
+    if not text:
+        return None
+
+    provinces, districts = [], []
+    for pattern, province, lat, lng, is_district in load_gazetteer():
+        if pattern.search(text):
+            (districts if is_district else provinces).append((province, lat, lng))
+
+    matched_provinces = {province for province, _, _ in provinces}
+    for province, lat, lng in districts:
+        if not matched_provinces or province in matched_provinces:
+            return lat, lng
+    if provinces:
+        return provinces[0][1], provinces[0][2]
+    return None
+
+
+def geo_cell(lat, lng):
+    return f'{math.floor(lat / GEO_CELL_SIZE)}:{math.floor(lng / GEO_CELL_SIZE)}'
+
+
+def update_job_post_location(job):
+    coordinates = geocode(job.location)
+    if coordinates:
+        job.latitude, job.longitude = coordinates
+        job.geo_cell = geo_cell(*coordinates)
+    else:
+        job.latitude = job.longitude = job.geo_cell = None
+
+
+def bounding_box(lat, lng, radius_km):
+    lat_delta = radius_km / KM_PER_DEGREE
+    lng_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return lat - lat_delta, lat + lat_delta, lng - lng_delta, lng + lng_delta
+
+
+def cells_in_box(min_lat, max_lat, min_lng, max_lng):
+    lat_range = range(math.floor(min_lat / GEO_CELL_SIZE), math.floor(max_lat / GEO_CELL_SIZE) + 1)
+    lng_range = range(math.floor(min_lng / GEO_CELL_SIZE), math.floor(max_lng / GEO_CELL_SIZE) + 1)
+    if len(lat_range) * len(lng_range) > MAX_CELLS:
+        return None
+    return [f'{i}:{j}' for i in lat_range for j in lng_range]
+
+
+def haversine_km(lat, lng):
+    # Biểu thức khoảng cách (km) từ (lat, lng) tới tọa độ của tin tuyển dụng
+    lat_rad, lng_rad = math.radians(lat), math.radians(lng)
+    a = (
+        Power(Sin((Radians('latitude') - lat_rad) / 2), 2)
+        + math.cos(lat_rad) * Cos(Radians('latitude')) * Power(Sin((Radians('longitude') - lng_rad) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a), output_field=FloatField())
+
+
+def filter_near(queryset, lat, lng, radius_km):
+    # Lọc thô theo ô lưới (có index) rồi mới tính khoảng cách chính xác
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    cells = cells_in_box(min_lat, max_lat, min_lng, max_lng)
+    if cells is not None:
+        queryset = queryset.filter(geo_cell__in=cells)
+    queryset = queryset.filter(
+        Q(latitude__range=(min_lat, max_lat)) & Q(longitude__range=(min_lng, max_lng))
+    )
+    return queryset.annotate(distance_km=haversine_km(lat, lng)).filter(distance_km__lte=radius_km)
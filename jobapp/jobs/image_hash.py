@@ -0,0 +1,99 @@
+"""
+Mã băm ảnh tính cục bộ bằng Pillow: sha256 cho ảnh trùng hệt, dHash 64 bit cho ảnh gần trùng
+(đổi kích thước, nén lại). Dùng để lấy lại kết quả xác minh đã có và tìm ảnh bị dùng lại giữa các công ty.
+"""
+import hashlib
+from io import BytesIO
+
+from django.db.models import Q
+from PIL import Image, UnidentifiedImageError
+
+from .models import ImageFingerprint
+
+HASH_SIZE = 8  # dHash 8x8 = 64 bit
+BAND_COUNT = 4
+BAND_BITS = 64 // BAND_COUNT
+# Chia 64 bit thành 4 dải: hai hash lệch <= 3 bit thì ít nhất một dải trùng hoàn toàn,
+# nên tra theo index của từng dải là không bỏ sót ảnh trong ngưỡng này
+MAX_DISTANCE = BAND_COUNT - 1
+BAND_FIELDS = [f'phash_band_{index}' for index in range(BAND_COUNT)]
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def difference_hash(data):
+    # So sánh độ sáng các điểm ảnh liền kề trên ảnh xám 9x8; None nếu không đọc được ảnh
+    try:
+        with Image.open(BytesIO(data)) as image:
+            pixels = list(image.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS).getdata())
+    except (UnidentifiedImageError, OSError, ValueError):
+        return None
+    value = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            offset = row * (HASH_SIZE + 1) + col
+            value = (value << 1) | (pixels[offset] > pixels[offset + 1])
+    return value
+
+
+def hash_bands(phash):
+    mask = (1 << BAND_BITS) - 1
+    return [(phash >> (BAND_BITS * index)) & mask for index in range(BAND_COUNT)]
+
+
+def hamming_distance(a, b):
+    return (a ^ b).bit_count()
+
+
+def read_upload(upload):
+    # Đọc nội dung file upload rồi tua lại để Cloudinary vẫn đọc được từ đầu
+    upload.seek(0)
+    data = upload.read()
+    upload.seek(0)
+    return data
+
+
+def fingerprint_for(data):
+    digest = content_hash(data)
+    fingerprint = ImageFingerprint.objects.filter(content_hash=digest).first()
+    if fingerprint is not None:
+        return fingerprint
+
+    phash = difference_hash(data)
+    values = {'content_hash': digest}
+    if phash is not None:
+        values.update(phash=f'{phash:016x}', **dict(zip(BAND_FIELDS, hash_bands(phash))))
+    fingerprint, _ = ImageFingerprint.objects.get_or_create(content_hash=digest, defaults=values)
+    return fingerprint
+
+
+def similar_fingerprints(fingerprint, max_distance=MAX_DISTANCE, queryset=None):
+    """
+    Các fingerprint khác có dHash cách fingerprint này <= max_distance bit, gần nhất trước.
+    Lọc ứng viên bằng các dải có index rồi tính khoảng cách Hamming chính xác.
+    """
+    if not fingerprint.phash:
+        return []
+    phash = int(fingerprint.phash, 16)
+    bands = Q()
+    for field, value in zip(BAND_FIELDS, hash_bands(phash)):
+        bands |= Q(**{field: value})
+    queryset = ImageFingerprint.objects.all() if queryset is None else queryset
+    candidates = queryset.filter(bands).exclude(pk=fingerprint.pk)
+
+    matches = []
+    for candidate in candidates:
+        distance = hamming_distance(phash, int(candidate.phash, 16))
+        if distance <= max_distance:
+            matches.append((distance, candidate.pk, candidate))
+    return [candidate for _, _, candidate in sorted(matches, key=lambda match: match[:2])]
+
+
+def cached_verdict(fingerprint):
+    # Fingerprint đã có kết quả thì dùng luôn; nếu không, lấy kết quả của ảnh gần trùng gần nhất
+    if fingerprint.verified_at is not None:
+        return fingerprint
+    verified = ImageFingerprint.objects.filter(verified_at__isnull=False)
+    return next(iter(similar_fingerprints(fingerprint, queryset=verified)), None)
@@ -0,0 +1,102 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+from cloudinary import CloudinaryResource, uploader, utils
+from django.conf import settings
+from django.core.files.uploadedfile import InMemoryUploadedFile
+from PIL import Image, ImageOps, features
+
+# Các cỡ ảnh client có thể yêu cầu (?image_size=); 'full' là ảnh gốc không biến đổi
+IMAGE_VARIANTS = {
+    'thumb': (('width', 150), ('height', 150), ('crop', 'fill'), ('quality', 'auto'), ('fetch_format', 'auto')),
+    'medium': (('width', 800), ('crop', 'limit'), ('quality', 'auto'), ('fetch_format', 'auto')),
+    'full': (),
+}
+LIST_IMAGE_SIZE = 'thumb'  # cỡ mặc định cho các danh sách
+URL_CACHE_SIZE = 20000
+UPLOAD_WORKERS = 4  # số ảnh tải lên Cloudinary cùng lúc, ghi đè bằng IMAGE_UPLOAD_WORKERS
+# Tiền xử lý ảnh upload, ghi đè bằng IMAGE_UPLOAD_* trong settings.py
+UPLOAD_MAX_DIMENSION = 1600  # px, cạnh dài nhất
+UPLOAD_FORMAT = 'WEBP'  # dùng JPEG nếu Pillow không hỗ trợ WEBP
+UPLOAD_QUALITY = 80
+UPLOAD_CONTENT_TYPES = {'WEBP': 'image/webp', 'JPEG': 'image/jpeg', 'PNG': 'image/png'}
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def build_url(public_id, version, format, type, resource_type, variant):
+    # URL chỉ phụ thuộc các tham số này và cấu hình Cloudinary (cố định trong tiến trình) nên cache được
+    options = dict(IMAGE_VARIANTS[variant])
+    return utils.cloudinary_url(public_id, format=format, version=version, type=type,
+                                resource_type=resource_type, **options)[0]
+
+
+def image_url(value, variant='full'):
+    """
+    URL của một giá trị CloudinaryField theo cỡ ảnh, dùng cache LRU thay vì dựng lại mỗi lần gọi .url.
+    Trả về chuỗi rỗng nếu không có ảnh; tài nguyên không phải ảnh (CV PDF...) luôn lấy bản gốc.
+    """
+    if not value:
+        return ''
+    if not isinstance(value, CloudinaryResource) or value.url_options:
+        return value.url
+    resource_type = value.resource_type or 'image'
+    if resource_type != 'image':
+        variant = 'full'
+    return build_url(value.public_id, value.version, value.format, value.type, resource_type, variant)
+
+
+def upload_images(field, files):
+    """
+    Tải nhiều file lên Cloudinary song song (tối đa IMAGE_UPLOAD_WORKERS luồng) với cùng tùy chọn
+    CloudinaryField.pre_save dùng; trả về CloudinaryResource theo thứ tự file.
+    Gán kết quả vào model thay cho file để pre_save không tải lên lần nữa.
+    """
+    if not files:
+        return []
+    options = {'type': field.type, 'resource_type': field.resource_type, **field.options}
+
+    def upload(file):
+        file.seek(0)
+        return uploader.upload_resource(file, **options)
+
+    workers = min(getattr(settings, 'IMAGE_UPLOAD_WORKERS', UPLOAD_WORKERS), len(files))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(upload, files))
+
+
+def upload_format():
+    image_format = getattr(settings, 'IMAGE_UPLOAD_FORMAT', UPLOAD_FORMAT).upper()
+    if image_format == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return image_format
+
+
+def preprocess_image(upload):
+    """
+    Thu nhỏ ảnh upload (cạnh dài tối đa IMAGE_UPLOAD_MAX_DIMENSION), bỏ EXIF (GPS, thông tin máy) và nén lại
+    theo IMAGE_UPLOAD_FORMAT. File mới dùng cho cả lưu trữ (Cloudinary) lẫn fingerprint/xác minh.
+    Pillow đọc dần từ file tạm của request; với JPEG, draft() giải mã thẳng ở tỉ lệ nhỏ thay vì cả ảnh gốc.
+    """
+    max_dimension = getattr(settings, 'IMAGE_UPLOAD_MAX_DIMENSION', UPLOAD_MAX_DIMENSION)
+    image_format = upload_format()
+    upload.seek(0)
+    with Image.open(upload) as original:
+        original.draft('RGB', (max_dimension, max_dimension))
+        image = ImageOps.exif_transpose(original)  # Xoay theo EXIF trước khi bỏ EXIF
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+    if image_format == 'JPEG' or not has_alpha:
+        image = image.convert('RGB')
+    elif image.mode != 'RGBA':
+        image = image.convert('RGBA')
+
+    # Không truyền exif=... khi lưu nên ảnh mới không còn metadata
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, quality=getattr(settings, 'IMAGE_UPLOAD_QUALITY', UPLOAD_QUALITY))
+    name = f'{os.path.splitext(os.path.basename(upload.name or "image"))[0]}.{image_format.lower()}'
+    return InMemoryUploadedFile(buffer, getattr(upload, 'field_name', None), name,
+                                UPLOAD_CONTENT_TYPES.get(image_format, 'application/octet-stream'),
+                                buffer.getbuffer().nbytes, None)
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from jobs.fast_read import application_rows, application_values, candidate_review_rows, company_review_rows, \
+    job_post_rows, job_post_values, review_values
+from jobs.models import User, JobPost, Application, Review
+from jobs.serializers import JobPostSerializer, ApplicationSerializer, CandidateReviewRecruiterSerializer, \
+    RecruiterReviewCandidateSerializer
+
+
+class Command(BaseCommand):
+    help = 'So sánh thời gian dựng JSON giữa serializer và đường đọc .values() trên dữ liệu hiện có'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--limit', type=int, default=100)
+
+    def measure(self, build, iterations):
+        render = JSONRenderer().render
+        body = render(build())
+        started = time.perf_counter()
+        for _ in range(iterations):
+            render(build())
+        return (time.perf_counter() - started) * 1000 / iterations, body
+
+    def handle(self, *args, **options):
+        iterations, limit = options['iterations'], options['limit']
+        jobs = JobPostSerializer.setup_eager_loading(JobPost.objects.filter(active=True), compact=True)[:limit]
+        applications = Application.objects.filter(active=True)[:limit]
+        cases = [
+            ('jobposts list',
+             lambda: JobPostSerializer(jobs, many=True, compact=True).data,
+             lambda: job_post_rows(job_post_values(jobs))),
+            ('applications/recruiter',
+             lambda: ApplicationSerializer(
+                 ApplicationSerializer.setup_eager_loading(applications, compact=True), many=True, compact=True).data,
+             lambda: application_rows(application_values(applications))),
+        ]
+
+        recruiter = User.objects.filter(role='recruiter', received_reviews__isnull=False).first()
+        if recruiter:
+            company_reviews = Review.objects.filter(reviewed_user=recruiter, active=True)[:limit]
+            cases.append(('company reviews',
+                          lambda: CandidateReviewRecruiterSerializer(company_reviews, many=True).data,
+                          lambda: company_review_rows(review_values(company_reviews), recruiter)))
+        candidate = User.objects.filter(role='candidate', received_reviews__isnull=False).first()
+        if candidate:
+            candidate_reviews = Review.objects.filter(reviewed_user=candidate)[:limit]
+            cases.append(('candidate reviews',
+                          lambda: RecruiterReviewCandidateSerializer(candidate_reviews, many=True).data,
+                          lambda: candidate_review_rows(review_values(candidate_reviews, 'reviewed_user__'))))
+
+        for name, serializer_path, fast_path in cases:
+            serializer_ms, serializer_body = self.measure(serializer_path, iterations)
+            fast_ms, fast_body = self.measure(fast_path, iterations)
+            same = 'giống nhau' if serializer_body == fast_body else 'KHÁC NHAU'
+            self.stdout.write(
+                f'{name}: serializer {serializer_ms:.2f} ms, values {fast_ms:.2f} ms '
+                f'(x{serializer_ms / fast_ms if fast_ms else 0:.1f}), JSON {same}'
+            )
+        self.stdout.write(self.style.SUCCESS('Đã chạy xong benchmark.'))
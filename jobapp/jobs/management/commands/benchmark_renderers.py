@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from jobs.fast_read import job_post_rows, job_post_values
+from jobs.middleware import brotli, compress
+from jobs.models import JobPost
+from jobs.renderers import ORJSONRenderer
+from jobs.serializers import JobPostSerializer
+
+
+class Command(BaseCommand):
+    help = 'So sánh thời gian render JSON (json/orjson) và kích thước nén gzip/brotli của danh sách tin tuyển dụng'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--page-sizes', type=int, nargs='+', default=[10, 100])
+
+    def measure(self, func, iterations):
+        result = func()
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - started) * 1000 / iterations, result
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        json_render, orjson_render = JSONRenderer().render, ORJSONRenderer().render
+        encodings = ['gzip'] + (['br'] if brotli is not None else [])
+
+        for page_size in options['page_sizes']:
+            jobs = JobPost.objects.filter(active=True)[:page_size]
+            eager = JobPostSerializer.setup_eager_loading(jobs)
+            payloads = [
+                # Cùng dạng response của JobPostViewSet.list (có phân trang)
+                ('compact', job_post_rows(job_post_values(jobs))),
+                ('expand=recruiter', JobPostSerializer(eager, many=True, compact=True, expand=['recruiter']).data),
+            ]
+            for name, results in payloads:
+                data = {'count': len(results), 'next': None, 'previous': None, 'results': results}
+                json_ms, body = self.measure(lambda: json_render(data), iterations)
+                orjson_ms, orjson_body = self.measure(lambda: orjson_render(data), iterations)
+                same = 'giống nhau' if body == orjson_body else 'KHÁC NHAU'
+                self.stdout.write(
+                    f'{len(results)} tin, {name}: json {json_ms:.3f} ms, orjson {orjson_ms:.3f} ms '
+                    f'(x{json_ms / orjson_ms if orjson_ms else 0:.1f}), byte {same}, {len(body)} B'
+                )
+                for encoding in encodings:
+                    compress_ms, compressed = self.measure(lambda: compress(body, encoding), iterations)
+                    self.stdout.write(
+                        f'    {encoding}: {len(compressed)} B ({len(compressed) * 100 / len(body):.0f}%), '
+                        f'{compress_ms:.3f} ms'
+                    )
+        self.stdout.write(self.style.SUCCESS('Đã chạy xong benchmark.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from jobs.facets import rebuild_facet_counts
+
+
+class Command(BaseCommand):
+    help = 'Tính lại bảng đếm bộ lọc (facet) từ các tin tuyển dụng đang hoạt động'
+
+    def handle(self, *args, **options):
+        count = rebuild_facet_counts()
+        self.stdout.write(self.style.SUCCESS(f'Đã cập nhật {count} giá trị bộ lọc.'))
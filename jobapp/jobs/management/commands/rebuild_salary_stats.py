@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from jobs.salary_stats import rebuild_salary_stats
+
+
+class Command(BaseCommand):
+    help = 'Tính lại bảng thống kê lương theo ngành nghề và địa điểm'
+
+    def handle(self, *args, **options):
+        count = rebuild_salary_stats()
+        self.stdout.write(self.style.SUCCESS(f'Đã cập nhật {count} dòng thống kê lương.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs.counters import reconcile_application_counters
+
+
+class Command(BaseCommand):
+    help = 'Đối soát và sửa các cột đếm đơn ứng tuyển trên JobPost'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        count = reconcile_application_counters(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Đã sửa bộ đếm của {count} tin tuyển dụng.'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from jobs.recommend import BATCH_SIZE, TOP_N, refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Tính lại danh sách tin tuyển dụng gợi ý (top-N) cho từng ứng viên'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-n', type=int, default=TOP_N)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        count = refresh_recommendations(top_n=options['top_n'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Đã cập nhật gợi ý cho {count} ứng viên.'))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.notifications import send_pending_notifications
+
+
+class Command(BaseCommand):
+    help = 'Gửi email báo tin tuyển dụng mới cho follower từ hàng đợi outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=50, help='Số bản ghi outbox xử lý mỗi lượt')
+        parser.add_argument('--loop', action='store_true', help='Chạy liên tục như một worker')
+        parser.add_argument('--interval', type=float, default=10, help='Số giây nghỉ khi hàng đợi trống')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = send_pending_notifications(limit=options['limit'])
+            if stats:
+                summary = ', '.join(f'{status}: {count}' for status, count in sorted(stats.items()))
+                self.stdout.write(self.style.SUCCESS(f'Đã xử lý {sum(stats.values())} thông báo ({summary}).'))
+            if not options['loop']:
+                if not stats:
+                    self.stdout.write(self.style.SUCCESS('Không có thông báo nào cần gửi.'))
+                return
+            if not stats:
+                time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.verify_image import verify_pending_images
+
+
+class Command(BaseCommand):
+    help = 'Xác minh ảnh công ty đang chờ (ảnh thật/ảnh mạng) theo lô qua backend Vision đã cấu hình'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Số ảnh mỗi lần gọi backend (tối đa 16)')
+        parser.add_argument('--limit', type=int, default=None, help='Số ảnh tối đa mỗi lượt')
+        parser.add_argument('--loop', action='store_true', help='Chạy liên tục như một worker')
+        parser.add_argument('--interval', type=float, default=30, help='Số giây nghỉ khi không còn ảnh chờ')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = verify_pending_images(batch_size=options['batch_size'], limit=options['limit'])
+            if stats:
+                summary = ', '.join(f'{status}: {count}' for status, count in sorted(stats.items()))
+                self.stdout.write(self.style.SUCCESS(f'Đã xử lý {sum(stats.values())} ảnh ({summary}).'))
+            if not options['loop']:
+                if not stats:
+                    self.stdout.write(self.style.SUCCESS('Không có ảnh nào cần xác minh.'))
+                return
+            if not stats:
+                time.sleep(options['interval'])
@@ -0,0 +1,89 @@
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli là tùy chọn: thiếu thì chỉ nén gzip
+    brotli = None
+
+# Giá trị mặc định, ghi đè trong settings.py
+COMPRESSION_MIN_SIZE = 1024  # byte, nhỏ hơn thì nén không đáng
+COMPRESSION_CONTENT_TYPES = ('application/json',)
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+
+def accepted_encodings(header):
+    # "gzip;q=0.5, br" -> {'gzip': 0.5, 'br': 1.0}
+    encodings = {}
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def choose_encoding(header):
+    encodings = accepted_encodings(header)
+    wildcard = encodings.get('*', 0.0)
+    if brotli is not None and encodings.get('br', wildcard) > 0:
+        return 'br'
+    if encodings.get('gzip', wildcard) > 0:
+        return 'gzip'
+    return None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        quality = getattr(settings, 'RESPONSE_COMPRESSION_BROTLI_QUALITY', COMPRESSION_BROTLI_QUALITY)
+        return brotli.compress(content, mode=brotli.MODE_TEXT, quality=quality)
+    level = getattr(settings, 'RESPONSE_COMPRESSION_GZIP_LEVEL', COMPRESSION_GZIP_LEVEL)
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+class CompressionMiddleware:
+    # Nén gzip/brotli các response JSON lớn theo Accept-Encoding của client.
+    # Khác GZipMiddleware của Django: chỉ nén các content type cấu hình, có ngưỡng kích thước
+    # và mức nén đọc từ settings, ưu tiên brotli khi có thư viện.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in getattr(settings, 'RESPONSE_COMPRESSION_CONTENT_TYPES', COMPRESSION_CONTENT_TYPES):
+            return response
+        if len(response.content) < getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', COMPRESSION_MIN_SIZE):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+
+        # ETag mạnh -> yếu vì nội dung đã đổi theo encoding (RFC 9110 8.8.1), vẫn khớp If-None-Match
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,66 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:01
+
+import re
+import unicodedata
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Chép logic tách token của jobs/search.py tại thời điểm tạo migration (migration không import code đang chạy)
+SEARCH_FIELD_WEIGHTS = {
+    'title': 5,
+    'specialized': 3,
+    'location': 2,
+    'description': 1,
+}
+MAX_TOKEN_LENGTH = 64
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    text = (text or '').replace('đ', 'd').replace('Đ', 'D')
+    text = unicodedata.normalize('NFD', text)
+    text = ''.join(ch for ch in text if unicodedata.category(ch) != 'Mn').lower()
+    return [token[:MAX_TOKEN_LENGTH] for token in _TOKEN_RE.findall(text)]
+
+
+def populate_search_tokens(apps, schema_editor):
+    JobPost = apps.get_model('jobs', 'JobPost')
+    JobPostSearchToken = apps.get_model('jobs', 'JobPostSearchToken')
+    tokens = []
+    for job in JobPost.objects.only('id', *SEARCH_FIELD_WEIGHTS).iterator(chunk_size=500):
+        weights = Counter()
+        for field, weight in SEARCH_FIELD_WEIGHTS.items():
+            for token in set(tokenize(getattr(job, field))):
+                weights[token] += weight
+        tokens.extend(JobPostSearchToken(job_id=job.id, token=token, weight=weight)
+                      for token, weight in weights.items())
+        if len(tokens) >= 500:
+            JobPostSearchToken.objects.bulk_create(tokens)
+            tokens = []
+    JobPostSearchToken.objects.bulk_create(tokens)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobPostSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='jobs.jobpost')),
+            ],
+            options={
+                'unique_together': {('token', 'job')},
+            },
+        ),
+        migrations.RunPython(populate_search_tokens, migrations.RunPython.noop),
+    ]
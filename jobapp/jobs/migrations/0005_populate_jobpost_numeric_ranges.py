@@ -0,0 +1,69 @@
+import re
+
+from django.db import migrations
+
+# Chép nguyên logic của jobs/utils.py tại thời điểm tạo migration: migration không import code đang chạy,
+# để sau này sửa jobs/utils.py không làm thay đổi (hoặc làm hỏng) kết quả migrate trên DB mới
+_NUMBER_RE = re.compile(r'\d+(?:[.,]\d+)?')
+_PER_DAY_RE = re.compile(r'ngày|ngay|/\s*d\b|day', re.IGNORECASE)
+_PER_WEEK_RE = re.compile(r'tuần|tuan|week|/\s*w\b', re.IGNORECASE)
+_CLOCK_TIME = r'(?<!\d)(\d{1,2})\s*(h|giờ|gio|:)\s*(\d{2})?'
+_CLOCK_RANGE_RE = re.compile(rf'{_CLOCK_TIME}\s*(?:-|–|~|đến|den|to)\s*{_CLOCK_TIME}', re.IGNORECASE)
+
+DAYS_PER_WEEK = 5
+MAX_HOURS_PER_WEEK = 168
+
+
+def clock_times(match):
+    start_hour, start_sep, start_minute, end_hour, end_sep, end_minute = match.groups()
+    explicit = ':' in (start_sep, end_sep) or bool(start_minute or end_minute)
+    return int(start_hour) + int(start_minute or 0) / 60, int(end_hour) + int(end_minute or 0) / 60, explicit
+
+
+def parse_working_hours(value):
+    clock = _CLOCK_RANGE_RE.search(value or '')
+    if clock and not _PER_WEEK_RE.search(value):
+        start, end, explicit = clock_times(clock)
+        if explicit or end <= 24:
+            if not start < end <= 24:
+                return None, None
+            hours = min(round((end - start) * DAYS_PER_WEEK), MAX_HOURS_PER_WEEK)
+            return hours, hours
+
+    numbers = [float(n.replace(',', '.')) for n in _NUMBER_RE.findall(value or '')][:2]
+    if not numbers:
+        return None, None
+
+    if _PER_DAY_RE.search(value):
+        numbers = [n * DAYS_PER_WEEK for n in numbers]
+
+    low, high = min(numbers), max(numbers)
+    return min(round(low), MAX_HOURS_PER_WEEK), min(round(high), MAX_HOURS_PER_WEEK)
+
+
+def normalize_job_post(job):
+    job.hours_min, job.hours_max = parse_working_hours(job.working_hours)
+    job.salary_min = job.salary_max = job.salary
+
+
+def populate_numeric_ranges(apps, schema_editor):
+    JobPost = apps.get_model('jobs', 'JobPost')
+    batch = []
+    for job in JobPost.objects.only('id', 'working_hours', 'salary').iterator(chunk_size=500):
+        normalize_job_post(job)
+        batch.append(job)
+        if len(batch) >= 500:
+            JobPost.objects.bulk_update(batch, ['hours_min', 'hours_max', 'salary_min', 'salary_max'])
+            batch = []
+    JobPost.objects.bulk_update(batch, ['hours_min', 'hours_max', 'salary_min', 'salary_max'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_jobpost_numeric_ranges'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_numeric_ranges, migrations.RunPython.noop),
+    ]
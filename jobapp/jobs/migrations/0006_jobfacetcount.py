@@ -0,0 +1,60 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:05
+
+from collections import Counter
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# Chép logic của jobs/facets.py tại thời điểm tạo migration (migration không import code đang chạy)
+SALARY_BUCKETS = [
+    (None, Decimal('3000000')),
+    (Decimal('3000000'), Decimal('5000000')),
+    (Decimal('5000000'), Decimal('10000000')),
+    (Decimal('10000000'), Decimal('20000000')),
+    (Decimal('20000000'), None),
+]
+
+
+def salary_bucket(salary):
+    for low, high in SALARY_BUCKETS:
+        if (low is None or salary >= low) and (high is None or salary < high):
+            return f"{int(low) if low is not None else ''}-{int(high) if high is not None else ''}"
+    return None
+
+
+def populate_facet_counts(apps, schema_editor):
+    JobPost = apps.get_model('jobs', 'JobPost')
+    JobFacetCount = apps.get_model('jobs', 'JobFacetCount')
+    counts = Counter()
+    rows = JobPost.objects.filter(active=True).values_list('specialized', 'location', 'salary').order_by()
+    for specialized, location, salary in rows.iterator(chunk_size=1000):
+        counts.update([('specialized', specialized), ('location', location)])
+        if salary is not None and (bucket := salary_bucket(Decimal(salary))):
+            counts[('salary', bucket)] += 1
+    JobFacetCount.objects.bulk_create([
+        JobFacetCount(facet=facet, value=value, count=count)
+        for (facet, value), count in counts.items() if value
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_populate_jobpost_numeric_ranges'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('specialized', 'Ngành nghề'), ('location', 'Địa điểm'), ('salary', 'Khoảng lương')], max_length=20)),
+                ('value', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('facet', 'value')},
+            },
+        ),
+        migrations.RunPython(populate_facet_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_jobfacetcount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobpost',
+            name='geo_cell',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=models.Index(fields=['geo_cell', 'active'], name='jobpost_geo_cell_idx'),
+        ),
+    ]
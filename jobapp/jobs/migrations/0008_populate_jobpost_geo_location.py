@@ -0,0 +1,103 @@
+import json
+import math
+import re
+import unicodedata
+from pathlib import Path
+
+from django.db import migrations
+
+# Chép logic geocode của jobs/geo.py (và tokenize của jobs/search.py) tại thời điểm tạo migration,
+# để sau này sửa các module đó không làm thay đổi kết quả migrate trên DB mới
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / 'data' / 'vn_gazetteer.json'
+GEO_CELL_SIZE = 0.25
+MAX_TOKEN_LENGTH = 64
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_DISTRICT_NUMBER_RE = re.compile(r'^Quận (\d+)$')
+
+
+def _normalize(text):
+    text = (text or '').replace('đ', 'd').replace('Đ', 'D')
+    text = unicodedata.normalize('NFD', text)
+    text = ''.join(ch for ch in text if unicodedata.category(ch) != 'Mn').lower()
+    return ' '.join(token[:MAX_TOKEN_LENGTH] for token in _TOKEN_RE.findall(text))
+
+
+def _district_aliases(name):
+    aliases = {_normalize(name)}
+    if (match := _DISTRICT_NUMBER_RE.match(name)):
+        number = match.group(1)
+        aliases.update({f'q {number}', f'q{number}', f'district {number}'})
+    return aliases
+
+
+def load_gazetteer():
+    with open(GAZETTEER_PATH, encoding='utf-8') as f:
+        data = json.load(f)
+
+    entries = []
+    for province in data['provinces']:
+        aliases = {_normalize(province['name'])} | {_normalize(a) for a in province['aliases']}
+        for alias in aliases:
+            entries.append((alias, province['name'], province['lat'], province['lng'], False))
+    for district in data['districts']:
+        for alias in _district_aliases(district['name']):
+            entries.append((alias, district['province'], district['lat'], district['lng'], True))
+
+    entries.sort(key=lambda entry: len(entry[0]), reverse=True)
+    return [
+        (re.compile(rf'(?<![a-z0-9]){re.escape(alias)}(?![a-z0-9])'), province, lat, lng, is_district)
+        for alias, province, lat, lng, is_district in entries
+    ]
+
+
+def geocode(gazetteer, location):
+    text = _normalize(location)
+    if not text:
+        return None
+
+    provinces, districts = [], []
+    for pattern, province, lat, lng, is_district in gazetteer:
+        if pattern.search(text):
+            (districts if is_district else provinces).append((province, lat, lng))
+
+    matched_provinces = {province for province, _, _ in provinces}
+    for province, lat, lng in districts:
+        if not matched_provinces or province in matched_provinces:
+            return lat, lng
+    if provinces:
+        return provinces[0][1], provinces[0][2]
+    return None
+
+
+def update_job_post_location(gazetteer, job):
+    coordinates = geocode(gazetteer, job.location)
+    if coordinates:
+        job.latitude, job.longitude = coordinates
+        job.geo_cell = f'{math.floor(job.latitude / GEO_CELL_SIZE)}:{math.floor(job.longitude / GEO_CELL_SIZE)}'
+    else:
+        job.latitude = job.longitude = job.geo_cell = None
+
+
+def populate_geo_location(apps, schema_editor):
+    JobPost = apps.get_model('jobs', 'JobPost')
+    gazetteer = load_gazetteer()
+    batch = []
+    for job in JobPost.objects.only('id', 'location').iterator(chunk_size=500):
+        update_job_post_location(gazetteer, job)
+        batch.append(job)
+        if len(batch) >= 500:
+            JobPost.objects.bulk_update(batch, ['latitude', 'longitude', 'geo_cell'])
+            batch = []
+    JobPost.objects.bulk_update(batch, ['latitude', 'longitude', 'geo_cell'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_jobpost_geo_location'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_geo_location, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:10
+
+from bisect import bisect_right
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# Chép logic của jobs/salary_stats.py tại thời điểm tạo migration (migration không import code đang chạy).
+# 0018 đổi các khoảng histogram và tính lại toàn bộ bảng
+HISTOGRAM_MIN = 100_000
+HISTOGRAM_MAX = 100_000_000
+HISTOGRAM_RATIO = 1.1
+HISTOGRAM_EDGES = []
+_edge = HISTOGRAM_MIN
+while _edge < HISTOGRAM_MAX * HISTOGRAM_RATIO:
+    HISTOGRAM_EDGES.append(round(_edge))
+    _edge *= HISTOGRAM_RATIO
+HISTOGRAM_SIZE = len(HISTOGRAM_EDGES) + 1
+
+
+def populate_salary_stats(apps, schema_editor):
+    JobPost = apps.get_model('jobs', 'JobPost')
+    SalaryStat = apps.get_model('jobs', 'SalaryStat')
+    stats = defaultdict(lambda: {'count': 0, 'total': Decimal(0), 'histogram': [0] * HISTOGRAM_SIZE})
+    rows = JobPost.objects.filter(active=True).values_list('specialized', 'location', 'salary').order_by()
+    for specialized, location, salary in rows.iterator(chunk_size=1000):
+        index = bisect_right(HISTOGRAM_EDGES, float(salary))
+        for key in {(specialized, location), (specialized, ''), ('', location), ('', '')}:
+            stats[key]['count'] += 1
+            stats[key]['total'] += salary
+            stats[key]['histogram'][index] += 1
+
+    SalaryStat.objects.bulk_create([
+        SalaryStat(specialized=specialized, location=location, **values)
+        for (specialized, location), values in stats.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_jobrecommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalaryStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('specialized', models.CharField(blank=True, default='', max_length=100)),
+                ('location', models.CharField(blank=True, default='', max_length=255)),
+                ('count', models.IntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('histogram', models.JSONField(default=list)),
+            ],
+            options={
+                'unique_together': {('specialized', 'location')},
+            },
+        ),
+        migrations.RunPython(populate_salary_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+from collections import defaultdict
+
+from django.db import migrations
+
+# Chép logic đếm của jobs/counters.py tại thời điểm tạo migration (migration không import code đang chạy)
+STATUS_COUNTER_FIELDS = {
+    'pending': 'pending_count',
+    'accepted': 'accepted_count',
+    'rejected': 'rejected_count',
+}
+COUNTER_FIELDS = ('application_count', *STATUS_COUNTER_FIELDS.values())
+
+
+def count_applications(rows):
+    counts = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    for job_id, status in rows:
+        counts[job_id]['application_count'] += 1
+        if status in STATUS_COUNTER_FIELDS:
+            counts[job_id][STATUS_COUNTER_FIELDS[status]] += 1
+    return counts
+
+
+def populate_application_counters(apps, schema_editor):
+    JobPost = apps.get_model('jobs', 'JobPost')
+    Application = apps.get_model('jobs', 'Application')
+    rows = Application.objects.filter(active=True).values_list('job_id', 'status').order_by()
+    counts = count_applications(rows.iterator(chunk_size=2000))
+
+    batch = []
+    for job in JobPost.objects.filter(id__in=list(counts)).only('id').iterator(chunk_size=500):
+        for field, value in counts[job.id].items():
+            setattr(job, field, value)
+        batch.append(job)
+        if len(batch) >= 500:
+            JobPost.objects.bulk_update(batch, COUNTER_FIELDS)
+            batch = []
+    JobPost.objects.bulk_update(batch, COUNTER_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_jobpost_application_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_application_counters, migrations.RunPython.noop),
+    ]
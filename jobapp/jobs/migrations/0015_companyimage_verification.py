@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='companyimage',
+            name='verification_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='companyimage',
+            name='verification_labels',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='companyimage',
+            name='verification_reason',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='companyimage',
+            name='verification_status',
+            field=models.CharField(choices=[('pending', 'Chờ duyệt'), ('approved', 'Đã duyệt'), ('rejected', 'Bị từ chối')], default='pending', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='companyimage',
+            name='verified_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='companyimage',
+            index=models.Index(fields=['verification_status', 'id'], name='companyimage_verification_idx'),
+        ),
+    ]
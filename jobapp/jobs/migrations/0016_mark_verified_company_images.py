@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def mark_verified_company_images(apps, schema_editor):
+    # Ảnh của công ty đã xác minh được duyệt từ trước (kiểm tra đồng bộ khi upload); các ảnh còn lại
+    # giữ pending để pipeline nền kiểm tra lại một lần
+    CompanyImage = apps.get_model('jobs', 'CompanyImage')
+    CompanyImage.objects.filter(company__is_verified=True).update(
+        verification_status='approved', verification_reason='Đã xác minh trước khi có pipeline nền',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_companyimage_verification'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_verified_company_images, migrations.RunPython.noop),
+    ]
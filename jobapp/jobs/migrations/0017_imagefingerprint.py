@@ -0,0 +1,39 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0016_mark_verified_company_images'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('phash', models.CharField(blank=True, default='', max_length=16)),
+                ('phash_band_0', models.PositiveIntegerField(blank=True, null=True)),
+                ('phash_band_1', models.PositiveIntegerField(blank=True, null=True)),
+                ('phash_band_2', models.PositiveIntegerField(blank=True, null=True)),
+                ('phash_band_3', models.PositiveIntegerField(blank=True, null=True)),
+                ('verification_status', models.CharField(choices=[('pending', 'Chờ duyệt'), ('approved', 'Đã duyệt'), ('rejected', 'Bị từ chối')], default='pending', max_length=10)),
+                ('verification_reason', models.TextField(blank=True, default='')),
+                ('verification_labels', models.JSONField(blank=True, default=list)),
+                ('verified_at', models.DateTimeField(blank=True, null=True)),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['phash_band_0'], name='fingerprint_band_0_idx'), models.Index(fields=['phash_band_1'], name='fingerprint_band_1_idx'), models.Index(fields=['phash_band_2'], name='fingerprint_band_2_idx'), models.Index(fields=['phash_band_3'], name='fingerprint_band_3_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='companyimage',
+            name='fingerprint',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='images', to='jobs.imagefingerprint'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:03
+
+import math
+from bisect import bisect_right
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# Chép logic của jobs/salary_stats.py tại thời điểm tạo migration (migration không import code đang chạy).
+# Các khoảng histogram đổi sang miền 1..100 triệu nên mọi dòng SalaryStat cũ phải tính lại
+HISTOGRAM_MIN = 1
+HISTOGRAM_MAX = 100_000_000
+HISTOGRAM_RATIO = 1.1
+HISTOGRAM_EDGES = [HISTOGRAM_MIN * HISTOGRAM_RATIO ** i
+                   for i in range(math.ceil(math.log(HISTOGRAM_MAX / HISTOGRAM_MIN, HISTOGRAM_RATIO)) + 1)]
+HISTOGRAM_SIZE = len(HISTOGRAM_EDGES) + 1
+
+
+def rebuild_salary_stats(apps, schema_editor):
+    JobPost = apps.get_model('jobs', 'JobPost')
+    SalaryStat = apps.get_model('jobs', 'SalaryStat')
+    stats = defaultdict(lambda: {'count': 0, 'total': Decimal(0), 'histogram': [0] * HISTOGRAM_SIZE,
+                                 'min_salary': None, 'max_salary': None})
+    rows = JobPost.objects.filter(active=True).values_list('specialized', 'location', 'salary').order_by()
+    for specialized, location, salary in rows.iterator(chunk_size=1000):
+        index = bisect_right(HISTOGRAM_EDGES, float(salary))
+        for key in {(specialized, location), (specialized, ''), ('', location)}:
+            stat = stats[key]
+            stat['count'] += 1
+            stat['total'] += salary
+            stat['histogram'][index] += 1
+            stat['min_salary'] = salary if stat['min_salary'] is None else min(stat['min_salary'], salary)
+            stat['max_salary'] = salary if stat['max_salary'] is None else max(stat['max_salary'], salary)
+
+    SalaryStat.objects.all().delete()
+    SalaryStat.objects.bulk_create([
+        SalaryStat(specialized=specialized, location=location, **values)
+        for (specialized, location), values in stats.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0017_imagefingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salarystat',
+            name='max_salary',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='salarystat',
+            name='min_salary',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunPython(rebuild_salary_stats, migrations.RunPython.noop),
+    ]
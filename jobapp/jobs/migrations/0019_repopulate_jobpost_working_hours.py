@@ -0,0 +1,18 @@
+from importlib import import_module
+
+from django.db import migrations
+
+# 0005 đọc "8h - 17h" thành 8-17 giờ/tuần; chạy lại phần backfill (đã sửa để hiểu khoảng giờ đồng hồ)
+# cho các DB đã migrate trước đó
+populate_numeric_ranges = import_module('jobs.migrations.0005_populate_jobpost_numeric_ranges').populate_numeric_ranges
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0018_salarystat_salary_range'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_numeric_ranges, migrations.RunPython.noop),
+    ]
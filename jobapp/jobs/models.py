@@ -1,6 +1,7 @@
 from cloudinary.models import CloudinaryField
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 class BaseModel(models.Model):
@@ -13,6 +14,12 @@ class BaseModel(models.Model):
         ordering = ['-id']
 
 
+class VerificationStatus(models.TextChoices):
+    PENDING = "pending", "Chờ duyệt"
+    APPROVED = "approved", "Đã duyệt"
+    REJECTED = "rejected", "Bị từ chối"
+
+
 class User(AbstractUser):
     ROLE_CHOICES = (
         ('admin', 'Quản trị viên'),
@@ -38,9 +45,53 @@ class Company(BaseModel):
     def __str__(self):
         return self.name
 
+class ImageFingerprint(models.Model):
+    # Mã băm nội dung + hash cảm nhận (dHash 64 bit) của ảnh, kèm kết quả xác minh dùng lại cho ảnh trùng/gần trùng.
+    # 4 dải 16 bit của hash có index: hai ảnh lệch <= 3 bit chắc chắn trùng ít nhất một dải (jobs/image_hash.py)
+    content_hash = models.CharField(max_length=64, unique=True)  # sha256 của nội dung ảnh
+    phash = models.CharField(max_length=16, blank=True, default='')  # hex, rỗng nếu Pillow không đọc được ảnh
+    phash_band_0 = models.PositiveIntegerField(null=True, blank=True)
+    phash_band_1 = models.PositiveIntegerField(null=True, blank=True)
+    phash_band_2 = models.PositiveIntegerField(null=True, blank=True)
+    phash_band_3 = models.PositiveIntegerField(null=True, blank=True)
+    verification_status = models.CharField(
+        max_length=10, choices=VerificationStatus.choices, default=VerificationStatus.PENDING
+    )
+    verification_reason = models.TextField(blank=True, default='')
+    verification_labels = models.JSONField(default=list, blank=True)
+    verified_at = models.DateTimeField(null=True, blank=True)
+    created_date = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['phash_band_0'], name='fingerprint_band_0_idx'),
+            models.Index(fields=['phash_band_1'], name='fingerprint_band_1_idx'),
+            models.Index(fields=['phash_band_2'], name='fingerprint_band_2_idx'),
+            models.Index(fields=['phash_band_3'], name='fingerprint_band_3_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} ({self.verification_status})"
+
+
 class CompanyImage(BaseModel):
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='images')
     image = CloudinaryField(null=True)
+    fingerprint = models.ForeignKey(ImageFingerprint, on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='images')
+    # Kết quả xác minh ảnh thật/ảnh mạng, ghi bởi pipeline nền trong jobs/verify_image.py
+    verification_status = models.CharField(
+        max_length=10, choices=VerificationStatus.choices, default=VerificationStatus.PENDING
+    )
+    verification_reason = models.TextField(blank=True, default='')
+    verification_labels = models.JSONField(default=list, blank=True)
+    verification_attempts = models.PositiveSmallIntegerField(default=0)
+    verified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=['verification_status', 'id'], name='companyimage_verification_idx'),
+        ]
 
     def __str__(self):
         return f"Image of {self.company.name}"
@@ -54,11 +105,158 @@ class JobPost(BaseModel):
     salary = models.DecimalField(max_digits=10, decimal_places=2)
     working_hours = models.CharField(max_length=50)
     location = models.CharField(max_length=255)
+    # Các cột số được chuẩn hóa từ working_hours/salary (signals) để lọc theo khoảng
+    hours_min = models.PositiveSmallIntegerField(null=True, blank=True)  # giờ/tuần
+    hours_max = models.PositiveSmallIntegerField(null=True, blank=True)
+    salary_min = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    salary_max = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    # Tọa độ tra từ gazetteer offline (jobs/geo.py) và ô lưới để lọc theo bán kính
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geo_cell = models.CharField(max_length=20, null=True, blank=True)
+    # Bộ đếm đơn ứng tuyển đang hoạt động, cập nhật bằng F() trong signals (jobs/counters.py)
+    application_count = models.IntegerField(default=0)
+    pending_count = models.IntegerField(default=0)
+    accepted_count = models.IntegerField(default=0)
+    rejected_count = models.IntegerField(default=0)
+
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=['active', '-created_date'], name='jobpost_active_created_idx'),
+            models.Index(fields=['recruiter', 'active', '-created_date'], name='jobpost_recruiter_active_idx'),
+            models.Index(fields=['active', 'salary_min', 'salary_max'], name='jobpost_active_salary_idx'),
+            models.Index(fields=['active', 'hours_min', 'hours_max'], name='jobpost_active_hours_idx'),
+            models.Index(fields=['geo_cell', 'active'], name='jobpost_geo_cell_idx'),
+        ]
+
+    # Các trường cần biết giá trị cũ để cập nhật số liệu tăng dần (facet, thống kê lương, gợi ý)
+    TRACKED_FIELDS = ('active', 'title', 'specialized', 'location', 'salary')
+    # Bộ đếm chỉ được ghi bằng F()/bulk_update trong jobs/counters.py
+    COUNTER_FIELDS = ('application_count', 'pending_count', 'accepted_count', 'rejected_count')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Giữ giá trị lúc đọc để signals không phải SELECT lại trước mỗi lần lưu
+        instance._loaded_state = instance.loaded_state()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        # Nạp một phần (kể cả trường deferred) có thể trộn với giá trị đã sửa trong bộ nhớ: bỏ bản chụp
+        self._loaded_state = self.loaded_state() if fields is None else None
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None and not self._state.adding and not kwargs.get('force_insert'):
+            # Lưu cả dòng sẽ ghi đè bộ đếm vừa được tăng bằng F() bằng giá trị cũ trong bộ nhớ
+            skipped = {'id', *self.COUNTER_FIELDS} | self.get_deferred_fields()
+            update_fields = [field.name for field in self._meta.concrete_fields
+                             if field.name not in skipped and field.attname not in skipped]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def loaded_state(self):
+        if self.get_deferred_fields() & set(self.TRACKED_FIELDS):
+            return None
+        return {field: getattr(self, field) for field in self.TRACKED_FIELDS}
 
     def __str__(self):
         return self.title
 
 
+class JobPostSearchToken(models.Model):
+    # Chỉ mục đảo (inverted index) phục vụ tìm kiếm tin tuyển dụng, đồng bộ từ signals
+    job = models.ForeignKey(JobPost, on_delete=models.CASCADE, related_name='search_tokens')
+    token = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        unique_together = ('token', 'job')  # Index (token, job) cho tra cứu theo tiền tố
+
+    def __str__(self):
+        return f"{self.token} -> {self.job_id}"
+
+
+class JobFacetCount(models.Model):
+    # Số tin tuyển dụng đang hoạt động theo từng giá trị bộ lọc, cập nhật tăng dần từ signals
+    FACET_CHOICES = (
+        ('specialized', 'Ngành nghề'),
+        ('location', 'Địa điểm'),
+        ('salary', 'Khoảng lương'),
+    )
+    facet = models.CharField(max_length=20, choices=FACET_CHOICES)
+    value = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('facet', 'value')
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
+
+
+class SalaryStat(models.Model):
+    # Thống kê lương theo (ngành nghề, địa điểm); chuỗi rỗng = tất cả. Cập nhật tăng dần từ signals
+    specialized = models.CharField(max_length=100, blank=True, default='')
+    location = models.CharField(max_length=255, blank=True, default='')
+    count = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    histogram = models.JSONField(default=list)  # số tin theo từng khoảng trong jobs/salary_stats.py
+    # Biên thực tế để phân vị nội suy trong histogram không vượt ra ngoài dữ liệu
+    min_salary = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    max_salary = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        unique_together = ('specialized', 'location')
+
+    def __str__(self):
+        return f"{self.specialized or '*'} / {self.location or '*'}: {self.count}"
+
+
+class JobRecommendation(models.Model):
+    # Top-N tin tuyển dụng gợi ý cho từng ứng viên, tính sẵn bằng lệnh refresh_recommendations
+    candidate = models.ForeignKey(User, on_delete=models.CASCADE, related_name='job_recommendations')
+    job = models.ForeignKey(JobPost, on_delete=models.CASCADE, related_name='recommendations')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+    created_date = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('candidate', 'job')
+        indexes = [
+            models.Index(fields=['candidate', 'rank'], name='recommendation_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.candidate} -> {self.job} ({self.score:.3f})"
+
+
+class NotificationOutbox(models.Model):
+    # Hàng đợi bền vững báo tin mới cho follower; lệnh send_notifications gửi dần (jobs/notifications.py)
+    STATUS_CHOICES = (
+        ('pending', 'Chờ gửi'),
+        ('sending', 'Đang gửi'),
+        ('done', 'Đã gửi'),
+        ('failed', 'Thất bại'),
+    )
+    job = models.ForeignKey(JobPost, on_delete=models.CASCADE, related_name='notifications')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    last_follow_id = models.BigIntegerField(default=0)  # Đã gửi tới các Follow có id <= giá trị này
+    sent_count = models.PositiveIntegerField(default=0)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_date = models.DateTimeField(auto_now_add=True)
+    updated_date = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"Thông báo tin {self.job_id} ({self.status})"
+
+
 class Application(BaseModel):
     applicant = models.ForeignKey(User, on_delete=models.CASCADE, related_name="applications")
     job = models.ForeignKey(JobPost, on_delete=models.CASCADE, related_name="applications")
@@ -71,6 +269,10 @@ class Application(BaseModel):
 
     class Meta:
         unique_together = ("applicant", "job")  # Ngăn ứng viên ứng tuyển nhiều lần vào 1 công việc
+        indexes = [
+            models.Index(fields=['job', 'status', '-created_date'], name='application_job_created_idx'),
+            models.Index(fields=['applicant', 'active', '-created_date'], name='application_applicant_idx'),
+        ]
 
     def __str__(self):
         return f"{self.applicant.username} - {self.job.title} - {self.status}"
@@ -92,16 +294,15 @@ class Review(BaseModel):
     rating = models.IntegerField(choices=[(i, str(i)) for i in range(1, 6)])
     comment = models.TextField()
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=['reviewed_user', 'active'], name='review_reviewed_active_idx'),
+        ]
+
     def __str__(self):
         return f"{self.reviewer.username} đánh giá {self.reviewed_user.username}"
 
 
-class VerificationStatus(models.TextChoices):
-    PENDING = "pending", "Chờ duyệt"
-    APPROVED = "approved", "Đã duyệt"
-    REJECTED = "rejected", "Bị từ chối"
-
-
 class VerificationDocument(BaseModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     document = models.FileField(upload_to="verification_documents/")
@@ -0,0 +1,158 @@
+import smtplib
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Follow, NotificationOutbox
+
+# Giá trị mặc định, ghi đè bằng NOTIFICATION_* trong settings.py
+BATCH_SIZE = 100  # số người nhận đọc mỗi lượt, tiến độ được lưu sau mỗi lượt
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 60  # chờ 1, 2, 4, 8... phút giữa các lần thử lại
+RETRY_MAX_SECONDS = 3600
+LEASE_SECONDS = 600  # bản ghi 'sending' của worker bị dừng giữa chừng được nhận lại sau khoảng này
+
+# Lỗi mạng/SMTP tạm thời -> thử lại sau; lỗi khác là lỗi lập trình và được ném ra ngoài
+TRANSIENT_ERRORS = (smtplib.SMTPException, OSError)
+
+
+class LeaseLost(Exception):
+    # Lease hết hạn và bản ghi đã bị worker khác nhận: dừng gửi để không gửi trùng
+    pass
+
+
+def setting(name, default):
+    return getattr(settings, f'NOTIFICATION_{name}', default)
+
+
+def enqueue_follower_notification(job):
+    # Một INSERT trong cùng transaction với tin mới: worker chỉ thấy bản ghi khi transaction commit,
+    # tin bị rollback thì bản ghi cũng mất theo
+    if Follow.objects.filter(recruiter_id=job.recruiter_id).exists():
+        return NotificationOutbox.objects.create(job=job)
+    return None
+
+
+def retry_delay(attempts):
+    delay = setting('RETRY_BASE_SECONDS', RETRY_BASE_SECONDS) * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, setting('RETRY_MAX_SECONDS', RETRY_MAX_SECONDS)))
+
+
+def job_message(job):
+    recruiter = job.recruiter
+    subject = f"[{recruiter.username}] vừa đăng tin tuyển dụng mới!"
+    body = (
+        f"Tin tuyển dụng mới: {job.title}\n"
+        f"Ngành nghề: {job.specialized}\n"
+        f"Mức lương: {job.salary}\n"
+        f"Địa điểm: {job.location}\n\n"
+        f"Đăng bởi: {recruiter.username}"
+    )
+    return subject, body
+
+
+def claim_notifications(limit):
+    # Nhận các bản ghi đến hạn; skip_locked để nhiều worker chạy song song không lấy trùng
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(NotificationOutbox.objects.select_for_update(skip_locked=True)
+                   .filter(status__in=['pending', 'sending'], next_attempt_at__lte=now)
+                   .order_by('next_attempt_at').values_list('id', flat=True)[:limit])
+        NotificationOutbox.objects.filter(id__in=ids).update(
+            status='sending', next_attempt_at=now + timedelta(seconds=setting('LEASE_SECONDS', LEASE_SECONDS)),
+        )
+    return list(NotificationOutbox.objects.filter(id__in=ids).select_related('job__recruiter').order_by('id'))
+
+
+def update_owned(outbox, **fields):
+    """
+    Ghi fields lên bản ghi nếu worker này vẫn giữ lease (next_attempt_at chưa bị worker khác đổi),
+    đồng thời gia hạn lease. Ném LeaseLost nếu không còn giữ.
+    """
+    now = timezone.now()
+    lease = now + timedelta(seconds=setting('LEASE_SECONDS', LEASE_SECONDS))
+    owned = NotificationOutbox.objects.filter(
+        id=outbox.id, status='sending', next_attempt_at=outbox.next_attempt_at,
+    ).update(next_attempt_at=lease, updated_date=now, **fields)
+    if not owned:
+        raise LeaseLost(outbox.id)
+    outbox.next_attempt_at = lease
+    for name, value in fields.items():
+        setattr(outbox, name, value)
+
+
+def deliver(outbox, connection, batch_size):
+    # Mỗi follower một email riêng, gửi tuần tự trên kết nối SMTP đang mở.
+    # Trước mỗi lượt kiểm tra còn giữ bản ghi và gia hạn lease; lưu vị trí sau mỗi lượt
+    subject, body = job_message(outbox.job)
+    connection.open()
+    update_owned(outbox)
+    while True:
+        follows = list(Follow.objects.filter(recruiter_id=outbox.job.recruiter_id, id__gt=outbox.last_follow_id)
+                       .exclude(follower__email='').order_by('id')
+                       .values_list('id', 'follower__email')[:batch_size])
+        if not follows:
+            break
+        try:
+            for follow_id, email in follows:
+                message = EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [email], connection=connection)
+                try:
+                    outbox.sent_count += connection.send_messages([message]) or 0
+                except smtplib.SMTPRecipientsRefused:
+                    pass  # Địa chỉ bị từ chối vĩnh viễn: bỏ qua người này, không thử lại cả lô
+                outbox.last_follow_id = follow_id
+        finally:
+            update_owned(outbox, last_follow_id=outbox.last_follow_id, sent_count=outbox.sent_count)
+
+    update_owned(outbox, status='done', last_error='')
+
+
+def schedule_retry(outbox, error):
+    outbox.attempts += 1
+    outbox.last_error = f'{type(error).__name__}: {error}'[:1000]
+    if outbox.attempts >= setting('MAX_ATTEMPTS', MAX_ATTEMPTS):
+        outbox.status = 'failed'
+    else:
+        outbox.status = 'pending'
+        outbox.next_attempt_at = timezone.now() + retry_delay(outbox.attempts)
+    outbox.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'updated_date'])
+
+
+def close_connection(connection):
+    try:
+        connection.close()
+    except TRANSIENT_ERRORS:
+        pass
+
+
+def send_pending_notifications(limit=50):
+    """
+    Gửi các bản ghi outbox đến hạn qua một kết nối SMTP dùng chung.
+    Trả về Counter số bản ghi theo trạng thái sau khi xử lý.
+    """
+    stats = Counter()
+    outboxes = claim_notifications(limit)
+    if not outboxes:
+        return stats
+
+    batch_size = setting('BATCH_SIZE', BATCH_SIZE)
+    connection = get_connection(fail_silently=False)
+    try:
+        for outbox in outboxes:
+            try:
+                deliver(outbox, connection, batch_size)
+            except TRANSIENT_ERRORS as error:
+                # Kết nối có thể đã hỏng: đóng lại, bản ghi sau sẽ mở kết nối mới
+                close_connection(connection)
+                schedule_retry(outbox, error)
+            except LeaseLost:
+                stats['lost'] += 1  # Worker khác đang gửi tiếp bản ghi này
+                continue
+            stats[outbox.status] += 1
+    finally:
+        close_connection(connection)
+    return stats
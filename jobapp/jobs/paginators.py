@@ -1,4 +1,120 @@
+import base64
+import json
+import math
+from datetime import datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
 
 class JobPostPaginator(pagination.PageNumberPagination):
     page_size = 10
+
+
+class ApplicationPaginator(pagination.PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class JobPostCursorPaginator(pagination.BasePagination):
+    # Phân trang keyset theo (trường sắp xếp, id): không COUNT(*), không OFFSET
+    page_size = 10
+    cursor_query_param = 'cursor'
+    tie_breaker = 'id'
+    invalid_cursor_message = 'Cursor không hợp lệ.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        order_by = queryset.query.order_by or ('-id',)
+        self.ordering = order_by[0]
+        self.field = self.ordering.lstrip('-')
+        self.descending = self.ordering.startswith('-')
+
+        tie_breaker = f'-{self.tie_breaker}' if self.descending else self.tie_breaker
+        if self.field == self.tie_breaker:
+            queryset = queryset.order_by(self.ordering)
+        else:
+            queryset = queryset.order_by(self.ordering, tie_breaker)
+
+        cursor = self.decode_cursor(request, queryset.model)
+        if cursor is not None:
+            queryset = queryset.filter(self.keyset_filter(*cursor))
+
+        # Lấy dư 1 bản ghi để biết còn trang sau hay không
+        page = list(queryset[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        return self.page
+
+    def keyset_filter(self, value, pk):
+        op = 'lt' if self.descending else 'gt'
+        if self.field == self.tie_breaker:
+            return Q(**{f'{self.tie_breaker}__{op}': pk})
+        return Q(**{f'{self.field}__{op}': value}) | Q(**{self.field: value, f'{self.tie_breaker}__{op}': pk})
+
+    def decode_cursor(self, request, model):
+        # Trả về (giá trị, id) đã kiểm tra kiểu; cursor hỏng hoặc bị sửa tay trả 404 thay vì lỗi 500 ở ORM
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if cursor['o'] != self.ordering:
+                raise ValueError
+            pk = self.parse_value(model, self.tie_breaker, cursor['id'])
+            value = self.parse_value(model, self.field, cursor['v'])
+        except (TypeError, ValueError, KeyError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+    def parse_value(self, model, name, value):
+        if value is None or isinstance(value, (bool, dict, list)):
+            raise ValueError
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Trường annotate (search_rank, distance_km) luôn là số
+            if not isinstance(value, (int, float)) or not math.isfinite(value):
+                raise ValueError
+            return value
+        return field.to_python(value)
+
+    def encode_cursor(self, obj):
+        if isinstance(obj, dict):
+            # Trang được đọc bằng .values() (jobs/fast_read.py)
+            value, pk = obj[self.field], obj[self.tie_breaker]
+        else:
+            value, pk = getattr(obj, self.field), obj.pk
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif value is not None and not isinstance(value, (int, float, str)):
+            value = str(value)
+        payload = json.dumps({'o': self.ordering, 'v': value, 'id': pk}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,154 @@
+from collections import defaultdict
+
+import numpy as np
+from scipy import sparse
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import JobPost, Application, Follow, JobRecommendation
+from .search import tokenize
+
+# Trọng số khi dựng vector TF-IDF cho một tin (lặp token theo số lần)
+FIELD_REPEATS = {'title': 3, 'specialized': 2, 'description': 1}
+
+APPLICATION_WEIGHT = 1.0  # tin đã ứng tuyển
+FOLLOW_WEIGHT = 0.5  # tin của nhà tuyển dụng đang theo dõi (chia đều cho số tin)
+
+TOP_N = 20
+BATCH_SIZE = 200
+
+
+def build_job_vectors(jobs):
+    """
+    Dựng ma trận TF-IDF (CSR, mỗi hàng đã chuẩn hóa L2) cho danh sách tin.
+    jobs: list dict có các khóa trong FIELD_REPEATS.
+    """
+    vocabulary = {}
+    rows, cols, values = [], [], []
+    for row, job in enumerate(jobs):
+        counts = defaultdict(float)
+        for field, repeat in FIELD_REPEATS.items():
+            for token in tokenize(job[field]):
+                counts[token] += repeat
+        for token, count in counts.items():
+            rows.append(row)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+            values.append(1.0 + np.log(count))
+
+    matrix = sparse.csr_matrix(
+        (np.asarray(values, dtype=np.float32), (rows, cols)),
+        shape=(len(jobs), len(vocabulary)),
+        dtype=np.float32,
+    )
+    document_frequency = np.bincount(matrix.indices, minlength=len(vocabulary))
+    idf = np.log((1.0 + len(jobs)) / (1.0 + document_frequency)).astype(np.float32) + 1.0
+    matrix = matrix @ sparse.diags(idf)
+    return normalize_rows(matrix.tocsr())
+
+
+def normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms).astype(np.float32) @ matrix
+
+
+def build_interactions(jobs, job_index):
+    """
+    Ma trận tương tác ứng viên x tin (CSR) từ Application và Follow, chỉ trên các tin đã nạp trong jobs.
+    Trả về (danh sách candidate_id, ma trận, tập (hàng, cột) đã ứng tuyển).
+    """
+    candidates = {}
+    weights = defaultdict(float)
+    applied = set()
+
+    for applicant_id, job_id in Application.objects.filter(active=True).values_list('applicant_id', 'job_id'):
+        if job_id in job_index:
+            row = candidates.setdefault(applicant_id, len(candidates))
+            weights[(row, job_index[job_id])] += APPLICATION_WEIGHT
+            applied.add((row, job_index[job_id]))
+
+    # Dùng đúng danh sách tin đã nạp: tin tạo/mở lại trong lúc chạy không có trong job_index
+    jobs_by_recruiter = defaultdict(list)
+    for job in jobs:
+        if job['active']:
+            jobs_by_recruiter[job['recruiter_id']].append(job_index[job['id']])
+
+    for follower_id, recruiter_id in Follow.objects.filter(active=True).values_list('follower_id', 'recruiter_id'):
+        recruiter_jobs = jobs_by_recruiter.get(recruiter_id)
+        if recruiter_jobs:
+            row = candidates.setdefault(follower_id, len(candidates))
+            for col in recruiter_jobs:
+                weights[(row, col)] += FOLLOW_WEIGHT / len(recruiter_jobs)
+
+    keys = list(weights)
+    matrix = sparse.csr_matrix(
+        (np.fromiter((weights[k] for k in keys), dtype=np.float32, count=len(keys)),
+         ([k[0] for k in keys], [k[1] for k in keys])),
+        shape=(len(candidates), len(job_index)),
+        dtype=np.float32,
+    )
+    candidate_ids = [None] * len(candidates)
+    for candidate_id, row in candidates.items():
+        candidate_ids[row] = candidate_id
+    return candidate_ids, matrix, applied
+
+
+def refresh_recommendations(top_n=TOP_N, batch_size=BATCH_SIZE):
+    # Tin đang hoạt động + tin đã ứng tuyển (có thể đã đóng) đều cần vector để dựng hồ sơ ứng viên
+    started = timezone.now()
+    applied_job_ids = Application.objects.filter(active=True).values('job_id')
+    jobs = list(
+        JobPost.objects.filter(Q(active=True) | Q(id__in=applied_job_ids))
+        .values('id', 'active', 'recruiter_id', *FIELD_REPEATS).order_by()
+    )
+    if not any(job['active'] for job in jobs):
+        JobRecommendation.objects.all().delete()
+        return 0
+
+    job_index = {job['id']: i for i, job in enumerate(jobs)}
+    job_ids = np.array([job['id'] for job in jobs])
+    active_mask = np.array([job['active'] for job in jobs])
+
+    job_vectors = build_job_vectors(jobs)
+    candidate_ids, interactions, applied = build_interactions(jobs, job_index)
+    profiles = normalize_rows((interactions @ job_vectors).tocsr())
+    active_vectors_t = job_vectors[active_mask].T.tocsc()
+    active_ids = job_ids[active_mask]
+    active_columns = np.flatnonzero(active_mask)
+    active_position = {col: i for i, col in enumerate(active_columns)}
+
+    applied_by_row = defaultdict(list)
+    for row, col in applied:
+        if col in active_position:
+            applied_by_row[row].append(active_position[col])
+
+    n = min(top_n, len(active_ids))
+    for start in range(0, len(candidate_ids), batch_size):
+        stop = min(start + batch_size, len(candidate_ids))
+        # Điểm cosine cho cả lô ứng viên: (lô x V) @ (V x số tin)
+        scores = (profiles[start:stop] @ active_vectors_t).toarray()
+        for offset in range(stop - start):
+            scores[offset, applied_by_row.get(start + offset, [])] = -1.0
+
+        top = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+        recommendations = []
+        for offset, columns in enumerate(top):
+            columns = columns[np.argsort(-scores[offset, columns])]
+            rank = 0
+            for col in columns:
+                if scores[offset, col] <= 0:
+                    break
+                rank += 1
+                recommendations.append(JobRecommendation(
+                    candidate_id=candidate_ids[start + offset], job_id=int(active_ids[col]),
+                    score=float(scores[offset, col]), rank=rank,
+                ))
+
+        with transaction.atomic():
+            JobRecommendation.objects.filter(candidate_id__in=candidate_ids[start:stop]).delete()
+            JobRecommendation.objects.bulk_create(recommendations, batch_size=1000)
+
+    # Xóa gợi ý cũ của những ứng viên không còn lịch sử
+    JobRecommendation.objects.filter(created_date__lt=started).delete()
+    return len(candidate_ids)
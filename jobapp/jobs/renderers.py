@@ -0,0 +1,32 @@
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:  # orjson là tùy chọn: thiếu thì dùng JSONRenderer mặc định
+    orjson = None
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    # Cho ra đúng byte như JSONRenderer của DRF (compact, UTF-8, escape \u2028/\u2029).
+    # Kiểu orjson không tự xử lý (Decimal, datetime, lazy str...) đi qua encoder của DRF
+    # nên salary/ngày tháng giữ nguyên định dạng cũ.
+    options = 0
+
+    def __init__(self):
+        if orjson is not None:
+            self.options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        self.encoder = self.encoder_class()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        # Yêu cầu thụt lề (application/json; indent=4, Browsable API) vẫn dùng json chuẩn
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.encoder.default, option=self.options)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
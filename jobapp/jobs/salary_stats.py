@@ -0,0 +1,167 @@
+import math
+from bisect import bisect_right
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max, Min
+
+from .models import JobPost, SalaryStat
+
+# Biên các khoảng của histogram: cấp số nhân (mỗi khoảng ~ +10%) phủ toàn bộ miền của JobPost.salary
+# (DecimalField 10 chữ số, 2 số lẻ): dữ liệu thực có lương kiểu 20000.00 chứ không theo đơn vị VNĐ đầy đủ
+HISTOGRAM_MIN = 1
+HISTOGRAM_MAX = 100_000_000
+HISTOGRAM_RATIO = 1.1
+HISTOGRAM_EDGES = [HISTOGRAM_MIN * HISTOGRAM_RATIO ** i
+                   for i in range(math.ceil(math.log(HISTOGRAM_MAX / HISTOGRAM_MIN, HISTOGRAM_RATIO)) + 1)]
+HISTOGRAM_SIZE = len(HISTOGRAM_EDGES) + 1  # thêm khoảng dưới mức nhỏ nhất
+
+
+def bucket_index(salary):
+    return bisect_right(HISTOGRAM_EDGES, float(salary))
+
+
+def bucket_bounds(index):
+    low = HISTOGRAM_EDGES[index - 1] if index > 0 else 0
+    high = HISTOGRAM_EDGES[index] if index < len(HISTOGRAM_EDGES) else HISTOGRAM_EDGES[-1] * HISTOGRAM_RATIO
+    return low, high
+
+
+def stat_keys(specialized, location):
+    # Không ghi dòng toàn cục ('', ''): mọi lần lưu tin đều phải khóa dòng này nên các lần ghi bị
+    # tuần tự hóa; get_salary_stats cộng dồn các dòng ('', địa điểm) khi cần. Sắp xếp để khóa theo thứ tự cố định
+    return sorted({(specialized, location), (specialized, ''), ('', location)})
+
+
+def contribution(state):
+    if not state or not state['active'] or state['salary'] is None:
+        return None
+    return state['specialized'], state['location'], Decimal(state['salary'])
+
+
+def salary_range(specialized, location):
+    # Min/max hiện tại trong DB (gọi trong post_save/post_delete nên đã phản ánh thay đổi vừa ghi)
+    jobs = JobPost.objects.filter(active=True)
+    if specialized:
+        jobs = jobs.filter(specialized=specialized)
+    if location:
+        jobs = jobs.filter(location=location)
+    result = jobs.aggregate(low=Min('salary'), high=Max('salary'))
+    return result['low'], result['high']
+
+
+def apply_contribution(specialized, location, salary, sign):
+    index = bucket_index(salary)
+    for key_specialized, key_location in stat_keys(specialized, location):
+        with transaction.atomic():
+            stat, _ = SalaryStat.objects.select_for_update().get_or_create(
+                specialized=key_specialized, location=key_location,
+            )
+            histogram = stat.histogram or [0] * HISTOGRAM_SIZE
+            histogram[index] = max(histogram[index] + sign, 0)
+            stat.histogram = histogram
+            stat.count = max(stat.count + sign, 0)
+            stat.total = stat.total + sign * salary if stat.count else 0
+            if not stat.count:
+                stat.min_salary = stat.max_salary = None
+            elif sign > 0:
+                stat.min_salary = salary if stat.min_salary is None else min(stat.min_salary, salary)
+                stat.max_salary = salary if stat.max_salary is None else max(stat.max_salary, salary)
+            elif salary <= stat.min_salary or salary >= stat.max_salary:
+                # Vừa bỏ giá trị biên: không suy ra được biên mới từ histogram, tính lại từ DB
+                stat.min_salary, stat.max_salary = salary_range(key_specialized, key_location)
+            stat.save()
+
+
+def update_salary_stats(previous, current):
+    # Bỏ phần đóng góp cũ, cộng phần mới; bỏ qua nếu không đổi (ví dụ chỉ sửa tiêu đề)
+    old, new = contribution(previous), contribution(current)
+    if old == new:
+        return
+    if old:
+        apply_contribution(*old, sign=-1)
+    if new:
+        apply_contribution(*new, sign=1)
+
+
+def rebuild_salary_stats():
+    stats = defaultdict(lambda: {'count': 0, 'total': Decimal(0), 'histogram': [0] * HISTOGRAM_SIZE,
+                                 'min_salary': None, 'max_salary': None})
+    rows = JobPost.objects.filter(active=True).values_list('specialized', 'location', 'salary')
+    for specialized, location, salary in rows.iterator(chunk_size=1000):
+        index = bucket_index(salary)
+        for key in stat_keys(specialized, location):
+            stat = stats[key]
+            stat['count'] += 1
+            stat['total'] += salary
+            stat['histogram'][index] += 1
+            stat['min_salary'] = salary if stat['min_salary'] is None else min(stat['min_salary'], salary)
+            stat['max_salary'] = salary if stat['max_salary'] is None else max(stat['max_salary'], salary)
+
+    with transaction.atomic():
+        SalaryStat.objects.all().delete()
+        SalaryStat.objects.bulk_create([
+            SalaryStat(specialized=specialized, location=location, **values)
+            for (specialized, location), values in stats.items()
+        ], batch_size=500)
+    return len(stats)
+
+
+def percentile(histogram, count, fraction, minimum=None, maximum=None):
+    # Nội suy theo thang log bên trong khoảng chứa phân vị, giới hạn trong [minimum, maximum] thực tế
+    target = fraction * count
+    seen = 0
+    for index, bucket_count in enumerate(histogram):
+        if bucket_count and seen + bucket_count >= target:
+            low, high = bucket_bounds(index)
+            if minimum is not None:
+                low, high = max(low, float(minimum)), max(high, float(minimum))
+            if maximum is not None:
+                low, high = min(low, float(maximum)), min(high, float(maximum))
+            position = (target - seen) / bucket_count
+            if low <= 0:
+                return round(high * position)
+            return round(low * math.exp(math.log(high / low) * position))
+        seen += bucket_count
+    return None
+
+
+def global_salary_stat():
+    # Cộng dồn các dòng theo địa điểm (location bắt buộc nên mỗi tin nằm đúng một dòng)
+    rows = (SalaryStat.objects.filter(specialized='').exclude(location='')
+            .values_list('count', 'total', 'histogram', 'min_salary', 'max_salary'))
+    count, total, histogram, lows, highs = 0, Decimal(0), [0] * HISTOGRAM_SIZE, [], []
+    for row_count, row_total, row_histogram, row_min, row_max in rows:
+        count += row_count
+        total += row_total
+        for index, bucket_count in enumerate(row_histogram or []):
+            histogram[index] += bucket_count
+        if row_count and row_min is not None:
+            lows.append(row_min)
+            highs.append(row_max)
+    return SalaryStat(count=count, total=total, histogram=histogram,
+                      min_salary=min(lows, default=None), max_salary=max(highs, default=None))
+
+
+def get_salary_stats(specialized='', location=''):
+    if specialized or location:
+        stat = SalaryStat.objects.filter(specialized=specialized, location=location).first()
+    else:
+        stat = global_salary_stat()
+    result = {'specialized': specialized, 'location': location, 'count': 0,
+              'mean': None, 'median': None, 'p10': None, 'p90': None, 'min': None, 'max': None}
+    if not stat or not stat.count:
+        return result
+
+    bounds = (stat.min_salary, stat.max_salary)
+    result.update({
+        'count': stat.count,
+        'mean': round(stat.total / stat.count),
+        'median': percentile(stat.histogram, stat.count, 0.5, *bounds),
+        'p10': percentile(stat.histogram, stat.count, 0.1, *bounds),
+        'p90': percentile(stat.histogram, stat.count, 0.9, *bounds),
+        'min': round(stat.min_salary) if stat.min_salary is not None else None,
+        'max': round(stat.max_salary) if stat.max_salary is not None else None,
+    })
+    return result
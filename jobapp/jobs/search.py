@@ -0,0 +1,99 @@
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery, Sum, Value
+
+from .models import JobPost, JobPostSearchToken
+
+# Trọng số của từng trường khi xếp hạng kết quả tìm kiếm
+SEARCH_FIELD_WEIGHTS = {
+    'title': 5,
+    'specialized': 3,
+    'location': 2,
+    'description': 1,
+}
+
+MAX_TOKEN_LENGTH = 64
+MAX_QUERY_TERMS = 8
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize_text(text):
+    # Bỏ dấu tiếng Việt, chuyển về chữ thường để "Lập trình" khớp với "lap trinh"
+    text = (text or '').replace('đ', 'd').replace('Đ', 'D')
+    text = unicodedata.normalize('NFD', text)
+    text = ''.join(ch for ch in text if unicodedata.category(ch) != 'Mn')
+    return text.lower()
+
+
+def tokenize(text):
+    return [token[:MAX_TOKEN_LENGTH] for token in _TOKEN_RE.findall(normalize_text(text))]
+
+
+def build_tokens(job):
+    # Tính trọng số cho từng token của một tin tuyển dụng
+    weights = Counter()
+    for field, weight in SEARCH_FIELD_WEIGHTS.items():
+        for token in set(tokenize(getattr(job, field))):
+            weights[token] += weight
+    return weights
+
+
+def index_job_post(job):
+    with transaction.atomic():
+        # Tin đã bị xóa trước khi callback on_commit chạy -> token đã bị xóa theo (CASCADE)
+        if not JobPost.objects.filter(pk=job.pk).exists():
+            return
+        JobPostSearchToken.objects.filter(job=job).delete()
+        JobPostSearchToken.objects.bulk_create([
+            JobPostSearchToken(job=job, token=token, weight=weight)
+            for token, weight in build_tokens(job).items()
+        ])
+
+
+def rebuild_index(batch_size=500):
+    # Một transaction: người dùng không bao giờ thấy chỉ mục đã xóa mà chưa ghi lại xong
+    with transaction.atomic():
+        JobPostSearchToken.objects.all().delete()
+        count = 0
+        tokens = []
+        for job in JobPost.objects.only(*SEARCH_FIELD_WEIGHTS).iterator(chunk_size=batch_size):
+            tokens.extend(
+                JobPostSearchToken(job=job, token=token, weight=weight)
+                for token, weight in build_tokens(job).items()
+            )
+            count += 1
+            if len(tokens) >= batch_size:
+                JobPostSearchToken.objects.bulk_create(tokens)
+                tokens = []
+        JobPostSearchToken.objects.bulk_create(tokens)
+    return count
+
+
+def search_job_posts(queryset, query):
+    # Mỗi từ khóa được so khớp theo tiền tố trên cột token (có index), tin phải khớp đủ các từ khóa.
+    # Token lưu và từ khóa đều đã qua normalize_text (chữ thường, không dấu) nên dùng startswith phân biệt hoa
+    # thường: istartswith khiến một số DB bọc cột trong UPPER/LOWER và không dùng được index (token, job)
+    terms = [term.lower() for term in dict.fromkeys(tokenize(query))][:MAX_QUERY_TERMS]
+    if not terms:
+        return queryset.none().annotate(search_rank=Value(0))
+
+    for term in terms:
+        queryset = queryset.filter(
+            id__in=JobPostSearchToken.objects.filter(token__startswith=term).values('job')
+        )
+
+    matched = Q()
+    for term in terms:
+        matched |= Q(token__startswith=term)
+
+    rank = (
+        JobPostSearchToken.objects.filter(matched, job=OuterRef('pk'))
+        .values('job')
+        .annotate(rank=Sum('weight'))
+        .values('rank')
+    )
+    return queryset.annotate(search_rank=Subquery(rank))
@@ -1,15 +1,85 @@
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import serializers
 from rest_framework.exceptions import PermissionDenied
+from .gallery import sync_company_images
+from .images import image_url, preprocess_image
 from .models import User, Company, CompanyImage, JobPost, Application, Follow, Review
 
 
+def split_param(value):
+    # "a, b,c" -> ['a', 'b', 'c']
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def image_size(serializer):
+    # Cỡ ảnh do view đặt trong context (xem DynamicFieldsViewMixin); mặc định ảnh gốc
+    return serializer.context.get('image_size', 'full')
+
+
+def company_summary(recruiter, size='full'):
+    # Thông tin công ty rút gọn cho danh sách: id, tên và logo (ảnh đầu tiên, dùng ảnh đã prefetch)
+    company = getattr(recruiter, 'company', None)
+    if company is None:
+        return None
+    images = company.images.all()
+    logo = images[0].image if images else None
+    return {'id': company.id, 'name': company.name, 'logo': image_url(logo, size)}
+
+
+class DynamicFieldsMixin:
+    """
+    Chọn trường trả về theo ?fields=a,b và ?expand=x,y (view truyền vào qua kwargs).
+    compact=True: dùng compact_fields; các serializer lồng bên trong cũng rút gọn trừ khi được expand.
+    """
+    compact_fields = None
+    expandable_fields = ()
+
+    def __init__(self, *args, fields=None, expand=None, compact=False, **kwargs):
+        self.requested_fields = fields or []
+        self.expand = [name for name in expand or [] if name in self.expandable_fields]
+        self.compact = compact
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.requested_fields:
+            names = set(self.requested_fields)
+        elif self.compact and self.compact_fields is not None:
+            names = set(self.compact_fields)
+        else:
+            names = set(fields)
+        names.update(self.expand)
+
+        for name in list(fields):
+            if name not in names:
+                del fields[name]
+            elif self.compact and name not in self.expand:
+                nested = getattr(fields[name], 'child', fields[name])
+                if isinstance(nested, DynamicFieldsMixin):
+                    nested.compact = True
+        return fields
+
+
+class ProcessedImageField(serializers.ImageField):
+    # Ảnh đã kiểm tra hợp lệ được thu nhỏ, bỏ EXIF và nén lại trước khi lưu (images.preprocess_image)
+
+    def to_internal_value(self, data):
+        return preprocess_image(super().to_internal_value(data))
+
+    def to_representation(self, value):
+        # URL dựng qua cache LRU của images.build_url thay vì value.url + build_absolute_uri cho mỗi dòng
+        return image_url(value, image_size(self)) or None
+
+
 class CandidateSerializer(serializers.ModelSerializer):
+    avatar = ProcessedImageField(required=True)
+
     class Meta:
         model = User
         fields = ['id', 'first_name', 'last_name', 'username', 'password', 'email', 'avatar']
         extra_kwargs = {
             'password': {'write_only': True},
-            'avatar': {'required': True}
         }
 
     def create(self, validated_data):
@@ -21,7 +91,7 @@ class CandidateSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         d = super().to_representation(instance)
-        d['avatar'] = instance.avatar.url if instance.avatar else ''
+        d['avatar'] = image_url(instance.avatar, image_size(self))
         return d
 
 class RecruiterSerializer(serializers.ModelSerializer):
@@ -29,7 +99,8 @@ class RecruiterSerializer(serializers.ModelSerializer):
     tax_code = serializers.CharField(write_only=True, required=True)
     description = serializers.CharField(write_only=True, required=True)
     location = serializers.CharField(write_only=True, required=True)
-    images = serializers.ListField(child=serializers.ImageField(), write_only=True, required=True)
+    avatar = ProcessedImageField(required=True)
+    images = serializers.ListField(child=ProcessedImageField(), write_only=True, required=True)
 
     company = serializers.SerializerMethodField()
 
@@ -42,9 +113,9 @@ class RecruiterSerializer(serializers.ModelSerializer):
         ]
         extra_kwargs = {
             'password': {'write_only': True},
-            'avatar': {'required': True}
         }
 
+    @transaction.atomic
     def create(self, validated_data):
         # Lấy và tách các trường liên quan tới Company
         images_data = validated_data.pop('images')
@@ -64,13 +135,9 @@ class RecruiterSerializer(serializers.ModelSerializer):
         # Tạo company
         company = Company.objects.create(user=user, **company_info)
 
-        # Validate ảnh
-        if len(images_data) < 3:
-            raise serializers.ValidationError({"images": "Công ty phải có ít nhất 3 ảnh môi trường làm việc."})
-
-        # Lưu từng ảnh
-        for image in images_data:
-            CompanyImage.objects.create(company=company, image=image)
+        # Lưu ảnh: tải lên Cloudinary song song, file trùng nội dung chỉ lưu một lần.
+        # Thiếu ảnh (sau khi gộp ảnh trùng) -> ValidationError, user/company vừa tạo bị rollback
+        sync_company_images(company, images_data)
 
         return user
 
@@ -84,18 +151,18 @@ class RecruiterSerializer(serializers.ModelSerializer):
                 'description': obj.company.description,
                 'location': obj.company.location,
                 'is_verified': obj.company.is_verified,
-                'images': [img.image.url for img in obj.company.images.all()]
+                'images': [image_url(img.image, image_size(self)) for img in obj.company.images.all()]
             }
         return None
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
         # Thêm avatar vào GET
-        data['avatar'] = instance.avatar.url if instance.avatar else ''
+        data['avatar'] = image_url(instance.avatar, image_size(self))
         return data
 
 class UpdateAvatarSerializer(serializers.ModelSerializer):
-    avatar = serializers.ImageField(required=True)
+    avatar = ProcessedImageField(required=True)
 
     class Meta:
         model = User
@@ -119,44 +186,79 @@ class CompanySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'tax_code', 'description', 'location', 'is_verified', 'images']  # Thêm images vào fields
 
 class CompanyImageUploadSerializer(serializers.Serializer):
-    images = serializers.ListField(child=serializers.ImageField(), allow_empty=False, write_only=True)
+    # Bộ ảnh mới = ảnh cũ có id trong keep + các file gửi lên; file trùng nội dung với ảnh cũ giữ nguyên ảnh cũ
+    images = serializers.ListField(child=ProcessedImageField(), required=False, write_only=True)
+    keep = serializers.ListField(child=serializers.IntegerField(), required=False, write_only=True)
 
     def update(self, instance, validated_data):
-        # Xóa ảnh cũ (nếu muốn)
-        instance.images.all().delete()
-
-        images = validated_data.get('images', [])
-        for img in images:
-            CompanyImage.objects.create(company=instance, image=img)
-
+        # Chỉ thêm/xóa phần thay đổi, ảnh không đổi không phải tải lên và xác minh lại;
+        # id trong keep phải thuộc công ty và bộ ảnh cuối cùng phải đủ số ảnh tối thiểu
+        sync_company_images(instance, validated_data.get('images', []), validated_data.get('keep', []))
         return instance
 
-class JobPostSerializer(serializers.ModelSerializer):
+class JobPostSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     recruiter = RecruiterSerializer(read_only=True)
-    application_count = serializers.SerializerMethodField()
+    company = serializers.SerializerMethodField()
+
+    # Dạng rút gọn cho danh sách; recruiter đầy đủ chỉ có ở trang chi tiết hoặc ?expand=recruiter
+    compact_fields = ['id', 'title', 'specialized', 'salary', 'working_hours', 'location', 'company',
+                      'application_count', 'pending_count', 'accepted_count', 'rejected_count']
+    expandable_fields = ('recruiter',)
+    # Các cột cần đọc cho dạng rút gọn (kèm cột dùng để sắp xếp/phân trang)
+    compact_columns = ['id', 'title', 'specialized', 'salary', 'working_hours', 'location', 'created_date',
+                       'application_count', 'pending_count', 'accepted_count', 'rejected_count',
+                       'recruiter__id', 'recruiter__company__id', 'recruiter__company__name',
+                       'recruiter__company__user']
 
     class Meta:
         model = JobPost
-        fields = ['id', 'title', 'specialized', 'description', 'salary', 'working_hours', 'location', 'recruiter', 'application_count']
-        read_only_fields = ['recruiter']
+        fields = ['id', 'title', 'specialized', 'description', 'salary', 'working_hours', 'location', 'recruiter',
+                  'company', 'application_count', 'pending_count', 'accepted_count', 'rejected_count']
+        read_only_fields = ['recruiter', 'application_count', 'pending_count', 'accepted_count', 'rejected_count']
+
+    @staticmethod
+    def setup_eager_loading(queryset, compact=False):
+        # Nạp sẵn recruiter -> company -> images để tránh N+1 khi render danh sách
+        queryset = (queryset.select_related('recruiter__company')
+                    .prefetch_related(Prefetch('recruiter__company__images', queryset=CompanyImage.objects.all())))
+        if compact:
+            queryset = queryset.only(*JobPostSerializer.compact_columns)
+        return queryset
+
+    def get_company(self, obj):
+        return company_summary(obj.recruiter, image_size(self))
 
     def create(self, validated_data):
         validated_data['recruiter'] = self.context['request'].user  # Gán recruiter là user hiện tại
         return super().create(validated_data)
 
-    def get_application_count(self, obj):
-        return obj.applications.count()  # Đếm số lượng Application cho JobPost
-
-class ApplicationSerializer(serializers.ModelSerializer):
-    job = serializers.PrimaryKeyRelatedField(queryset=JobPost.objects.all(), write_only=True)  # Chỉ nhận job_id khi tạo
+class ApplicationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    job = serializers.PrimaryKeyRelatedField(queryset=JobPost.objects.all())  # Nhận job_id khi tạo, trả về id
+    job_title = serializers.CharField(source='job.title', read_only=True)
     job_detail = JobPostSerializer(source="job", read_only=True)  # Xuất thông tin job đầy đủ khi trả về
     applicant_detail = CandidateSerializer(source='applicant', read_only=True)  # Thêm đây
 
+    # Danh sách: dạng hàng gọn (chỉ id + tiêu đề job), ?expand=job_detail để lấy job đầy đủ (kèm recruiter)
+    compact_fields = ['id', 'job', 'job_title', 'applicant_detail', 'cv', 'status', 'created_date', 'updated_date']
+    expandable_fields = ('job_detail',)
+    compact_columns = ['id', 'job_id', 'job__title', 'cv', 'status', 'created_date', 'updated_date',
+                       'applicant__id', 'applicant__first_name', 'applicant__last_name', 'applicant__username',
+                       'applicant__email', 'applicant__avatar']
+
     class Meta:
         model = Application
 
-        fields = ['id', 'applicant_detail', 'job', 'job_detail', 'cv', 'status']
-        read_only_fields = ['applicant', 'status', 'created_date', 'job_detail', 'applicant_detail']  # Không cần nhập applicant, status, created_date khi gửi request
+        fields = ['id', 'applicant_detail', 'job', 'job_title', 'job_detail', 'cv', 'status', 'created_date',
+                  'updated_date']
+        read_only_fields = ['applicant', 'status', 'created_date', 'updated_date', 'job_detail',
+                            'applicant_detail']  # Không cần nhập applicant, status, created_date khi gửi request
+
+    @staticmethod
+    def setup_eager_loading(queryset, compact=False):
+        if compact:
+            return queryset.select_related('applicant', 'job').only(*ApplicationSerializer.compact_columns)
+        return (queryset.select_related('applicant', 'job__recruiter__company')
+                .prefetch_related(Prefetch('job__recruiter__company__images', queryset=CompanyImage.objects.all())))
 
     def create(self, validated_data):
         request = self.context["request"]
@@ -186,20 +288,45 @@ class ApplicationSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         data = super().to_representation(instance)
         if instance.cv:
-            data['cv'] = instance.cv.url  # chỉ lấy đúng URL, bỏ prefix thừa
+            data['cv'] = image_url(instance.cv)  # chỉ lấy đúng URL, bỏ prefix thừa
         return data
 
-class FollowSerializer(serializers.ModelSerializer):
+class BulkApplicationStatusSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500)
+    status = serializers.ChoiceField(choices=Application._meta.get_field('status').choices)
+
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))  # Bỏ id trùng, giữ thứ tự gửi lên
+
+class FollowSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     recruiter = RecruiterSerializer(read_only=True)
+    company = serializers.SerializerMethodField()
     company_id = serializers.PrimaryKeyRelatedField(
         queryset=Company.objects.all(), write_only=True
     )
 
+    # Danh sách chỉ gồm công ty rút gọn; ?expand=recruiter để lấy đầy đủ
+    compact_fields = ["id", "company_id", "follower", "company", "created_date"]
+    expandable_fields = ("recruiter",)
+    compact_columns = ["id", "follower", "created_date", "recruiter__id", "recruiter__company__id",
+                       "recruiter__company__name", "recruiter__company__user"]
+
     class Meta:
         model = Follow
-        fields = ["id", "company_id", "follower", "recruiter", "created_date"]
+        fields = ["id", "company_id", "follower", "recruiter", "company", "created_date"]
         read_only_fields = ["follower", "recruiter", "created_date"]
 
+    @staticmethod
+    def setup_eager_loading(queryset, compact=False):
+        queryset = (queryset.select_related("recruiter__company")
+                    .prefetch_related(Prefetch("recruiter__company__images", queryset=CompanyImage.objects.all())))
+        if compact:
+            queryset = queryset.only(*FollowSerializer.compact_columns)
+        return queryset
+
+    def get_company(self, obj):
+        return company_summary(obj.recruiter, image_size(self))
+
     def validate(self, attrs):
         request = self.context["request"]
         company = attrs["company_id"]
@@ -231,7 +358,7 @@ class UserSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         d = super().to_representation(instance)
-        d['avatar'] = instance.avatar.url if instance.avatar else ''
+        d['avatar'] = image_url(instance.avatar, image_size(self))
         return d
 
 class CandidateReviewRecruiterSerializer(serializers.ModelSerializer):
@@ -1,48 +1,151 @@
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from .models import JobPost, Follow, CompanyImage
-import os
+from .models import User, JobPost, Company, CompanyImage, Application
 
-from .verify_image import verify_image_with_google_vision
+from .cache import invalidate_listing_cache, invalidate_recruiter_summary
+from .counters import APPLICATION_TRACKED_FIELDS, application_state, update_application_counters
+from .facets import update_facet_counts
+from .geo import update_job_post_location
+from .notifications import enqueue_follower_notification
+from .salary_stats import update_salary_stats
+from .search import SEARCH_FIELD_WEIGHTS, index_job_post
+from .suggest import suggestion_index
+from .utils import normalize_job_post
+from .verify_image import verify_in_background
 
+def job_post_state(job):
+    return {field: getattr(job, field) for field in JobPost.TRACKED_FIELDS}
+
+
+@receiver(pre_save, sender=JobPost)
+def normalize_job_post_ranges(sender, instance, **kwargs):
+    normalize_job_post(instance)
+    update_job_post_location(instance)
+
+@receiver(pre_save, sender=JobPost)
+def remember_job_post_state(sender, instance, update_fields=None, **kwargs):
+    # _previous_state: giá trị trong DB trước khi lưu; _saved_state: giá trị thực sự được ghi
+    instance._previous_state = instance._saved_state = None
+    if update_fields is not None and not set(update_fields) & set(JobPost.TRACKED_FIELDS):
+        return  # Không ghi trường nào được theo dõi, số liệu không đổi
+    if instance.pk:
+        previous = getattr(instance, '_loaded_state', None)
+        if previous is None:
+            # Chỉ SELECT khi instance không được nạp từ DB (hoặc thiếu trường do .only()/.defer())
+            previous = JobPost.objects.filter(pk=instance.pk).values(*JobPost.TRACKED_FIELDS).first()
+        instance._previous_state = previous
+    state = job_post_state(instance)
+    if update_fields is not None and instance._previous_state is not None:
+        # Trường không nằm trong update_fields vẫn giữ giá trị trong DB
+        state.update({field: value for field, value in instance._previous_state.items()
+                      if field not in update_fields})
+    instance._saved_state = state
+
+@receiver(post_save, sender=JobPost)
+def remember_saved_job_post_state(sender, instance, **kwargs):
+    if instance._saved_state is not None:
+        instance._loaded_state = instance._saved_state
+
+@receiver(post_save, sender=JobPost)
+def update_job_post_facets(sender, instance, **kwargs):
+    update_facet_counts(instance._previous_state, instance._saved_state)
+
+@receiver(post_delete, sender=JobPost)
+def remove_job_post_facets(sender, instance, **kwargs):
+    update_facet_counts(job_post_state(instance), None)
+
+@receiver(post_save, sender=JobPost)
+def update_job_post_salary_stats(sender, instance, **kwargs):
+    update_salary_stats(instance._previous_state, instance._saved_state)
+
+@receiver(post_delete, sender=JobPost)
+def remove_job_post_salary_stats(sender, instance, **kwargs):
+    update_salary_stats(job_post_state(instance), None)
+
+@receiver(post_save, sender=JobPost)
+def update_job_post_suggestions(sender, instance, **kwargs):
+    # Chỉ mục gợi ý nằm trong bộ nhớ, không rollback theo DB: chỉ cập nhật khi transaction đã commit
+    previous, current = instance._previous_state, instance._saved_state
+    transaction.on_commit(lambda: suggestion_index.update(previous, current))
+
+@receiver(post_delete, sender=JobPost)
+def remove_job_post_suggestions(sender, instance, **kwargs):
+    state = job_post_state(instance)
+    transaction.on_commit(lambda: suggestion_index.update(state, None))
+
+@receiver(pre_save, sender=Application)
+def remember_application_state(sender, instance, **kwargs):
+    instance._previous_state = None
+    if instance.pk:
+        instance._previous_state = (
+            Application.objects.filter(pk=instance.pk).values(*APPLICATION_TRACKED_FIELDS).first()
+        )
+
+@receiver(post_save, sender=Application)
+def update_job_post_application_counters(sender, instance, **kwargs):
+    update_application_counters(getattr(instance, '_previous_state', None), application_state(instance))
+
+@receiver(post_delete, sender=Application)
+def remove_job_post_application_counters(sender, instance, **kwargs):
+    update_application_counters(application_state(instance), None)
 
 @receiver(post_save, sender=JobPost)
 def notify_followers_on_job_create(sender, instance, created, **kwargs):
     if created:
-        recruiter = instance.recruiter
-        followers = Follow.objects.filter(recruiter=recruiter).select_related("follower")
-
-        subject = f"[{recruiter.username}] vừa đăng tin tuyển dụng mới!"
-        message = (
-            f"Tin tuyển dụng mới: {instance.title}\n"
-            f"Ngành nghề: {instance.specialized}\n"           
-            f"Mức lương: {instance.salary}\n"
-            f"Địa điểm: {instance.location}\n\n"
-            f"Đăng bởi: {recruiter.username}"
-        )
+        # Chỉ ghi một bản ghi outbox; email cho từng follower do lệnh send_notifications gửi sau
+        enqueue_follower_notification(instance)
 
-        recipient_list = [f.follower.email for f in followers if f.follower.email]
+@receiver(post_save, sender=JobPost)
+def update_job_post_search_index(sender, instance, update_fields=None, **kwargs):
+    # Chỉ đánh lại chỉ mục khi các trường được tìm kiếm thay đổi
+    if update_fields and not set(update_fields) & set(SEARCH_FIELD_WEIGHTS):
+        return
+    # Xóa + ghi lại token sau khi commit, không kéo dài transaction của request ghi tin
+    transaction.on_commit(lambda: index_job_post(instance))
 
-        if recipient_list:
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=os.getenv("EMAIL_SEND"),
-                recipient_list=recipient_list,
-                fail_silently=True
-            )
+@receiver(post_save, sender=CompanyImage)
+def schedule_company_image_verification(sender, instance, created, **kwargs):
+    # Ảnh mới ở trạng thái pending; xác minh chạy ngoài request (lệnh verify_company_images hoặc luồng nền)
+    if created and getattr(settings, 'IMAGE_VERIFICATION_IN_PROCESS', False):
+        transaction.on_commit(verify_in_background)
 
+@receiver(post_save, sender=JobPost)
+@receiver(post_delete, sender=JobPost)
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
 @receiver(post_save, sender=CompanyImage)
-def auto_verify_company_image(sender, instance, created, **kwargs):
-    if created:
-        # Gọi Vision API kiểm tra ảnh
-        result = verify_image_with_google_vision(instance.image.url)
+@receiver(post_delete, sender=CompanyImage)
+def invalidate_job_post_listing(sender, **kwargs):
+    # Dữ liệu hiển thị trong danh sách tin thay đổi -> bỏ cache danh sách sau khi commit;
+    # tăng phiên bản sớm hơn thì request khác có thể đọc dữ liệu chưa commit và lưu vào khóa mới
+    transaction.on_commit(invalidate_listing_cache)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_job_post_listing_on_user(sender, instance, update_fields=None, **kwargs):
+    # Thông tin nhà tuyển dụng nằm trong danh sách khi ?expand=recruiter; ứng viên và lần ghi last_login
+    # (mỗi lần đăng nhập) không ảnh hưởng tới danh sách
+    if instance.role != 'recruiter' or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    transaction.on_commit(invalidate_listing_cache)
 
-        print(f"🧠 Ảnh upload từ {instance.image.url}")
-        print(f"✅ Kết quả xác minh: {result['is_real']} - {result['reason']}")
+@receiver(post_save, sender=JobPost)
+@receiver(post_delete, sender=JobPost)
+def invalidate_recruiter_summary_on_job_post(sender, instance, **kwargs):
+    recruiter_id = instance.recruiter_id
+    transaction.on_commit(lambda: invalidate_recruiter_summary(recruiter_id))
 
-        # Nếu ảnh được xác minh là thật → cập nhật công ty
-        if result['is_real'] and not instance.company.is_verified:
-            instance.company.is_verified = True
-            instance.company.save()
\ No newline at end of file
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+def invalidate_recruiter_summary_on_application(sender, instance, **kwargs):
+    # Bỏ cache tổng hợp của nhà tuyển dụng sở hữu tin được ứng tuyển
+    if Application.job.is_cached(instance):
+        recruiter_id = instance.job.recruiter_id
+    else:
+        recruiter_id = JobPost.objects.filter(pk=instance.job_id).values_list('recruiter_id', flat=True).first()
+    if recruiter_id is not None:
+        transaction.on_commit(lambda: invalidate_recruiter_summary(recruiter_id))
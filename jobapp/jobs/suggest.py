@@ -0,0 +1,124 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import Count
+
+from .models import JobPost
+from .search import normalize_text
+
+SUGGEST_KINDS = ('title', 'specialized', 'location')
+SUGGEST_LIMIT = 10
+REFRESH_INTERVAL = 15 * 60  # giây; nạp lại định kỳ để đồng bộ giữa các tiến trình
+
+
+class SuggestionIndex:
+    """
+    Chỉ mục tiền tố trong bộ nhớ cho gợi ý tìm kiếm: mảng đã sắp xếp các khóa chuẩn hóa,
+    tra cứu bằng bisect, trọng số = số tin đang hoạt động có giá trị đó.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys = []  # [(khóa chuẩn hóa, loại, giá trị gốc)] đã sắp xếp
+        self._weights = Counter()  # (loại, giá trị gốc) -> số tin
+        self.loaded_at = None
+
+    def _entries(self, kind, value):
+        # Mỗi vị trí đầu từ là một khóa, để "ban hang" khớp "Nhân viên bán hàng"
+        words = normalize_text(value).split()
+        return [(' '.join(words[i:]), kind, value) for i in range(len(words))]
+
+    def rebuild(self):
+        weights = Counter()
+        for kind in SUGGEST_KINDS:
+            rows = JobPost.objects.filter(active=True).values(kind).annotate(n=Count('id')).order_by()
+            for row in rows:
+                if row[kind]:
+                    weights[(kind, row[kind])] = row['n']
+
+        keys = sorted(entry for kind, value in weights for entry in self._entries(kind, value))
+        with self._lock:
+            self._keys, self._weights = keys, weights
+            self.loaded_at = time.monotonic()
+
+    def warm(self):
+        try:
+            self.rebuild()
+        except DatabaseError:
+            # Bảng chưa được tạo (trước migrate) -> sẽ nạp lại ở lần gọi sau
+            pass
+
+    def is_stale(self):
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > REFRESH_INTERVAL
+
+    def add(self, kind, value, delta=1):
+        if not value:
+            return
+        with self._lock:
+            key = (kind, value)
+            previous = self._weights[key]
+            self._weights[key] = previous + delta
+            if previous <= 0 < self._weights[key]:
+                for entry in self._entries(kind, value):
+                    insort(self._keys, entry)
+            elif self._weights[key] <= 0:
+                del self._weights[key]
+                for entry in self._entries(kind, value):
+                    i = bisect_left(self._keys, entry)
+                    if i < len(self._keys) and self._keys[i] == entry:
+                        del self._keys[i]
+
+    def update(self, previous, current):
+        # previous/current: dict trạng thái JobPost (hoặc None); chỉ tin đang hoạt động được tính
+        for state, delta in ((previous, -1), (current, 1)):
+            if state and state['active']:
+                for kind in SUGGEST_KINDS:
+                    self.add(kind, state[kind], delta)
+
+    def suggest(self, prefix, limit=SUGGEST_LIMIT):
+        prefix = ' '.join(normalize_text(prefix).split())
+        if not prefix:
+            return []
+
+        with self._lock:
+            start = bisect_left(self._keys, (prefix,))
+            matches = {}
+            for i in range(start, len(self._keys)):
+                key, kind, value = self._keys[i]
+                if not key.startswith(prefix):
+                    break
+                matches[(kind, value)] = self._weights[(kind, value)]
+
+        ranked = sorted(matches.items(), key=lambda item: (-item[1], item[0][1]))
+        return [{'value': value, 'type': kind, 'count': weight} for (kind, value), weight in ranked[:limit]]
+
+
+suggestion_index = SuggestionIndex()
+
+
+_refresh_lock = threading.Lock()
+
+
+def _refresh():
+    try:
+        suggestion_index.warm()
+    finally:
+        connection.close()  # Kết nối DB riêng của luồng này
+        _refresh_lock.release()
+
+
+def refresh_in_background():
+    # Chỉ chạy một luồng nạp lại tại một thời điểm
+    if _refresh_lock.acquire(blocking=False):
+        threading.Thread(target=_refresh, daemon=True).start()
+
+
+def warm_on_startup():
+    # Gọi từ wsgi.py/asgi.py sau khi app đã nạp xong, không gọi trong AppConfig.ready():
+    # ready() chạy cả với migrate/makemigrations/test và không được truy cập DB
+    if getattr(settings, 'SUGGEST_WARM_ON_STARTUP', False):
+        refresh_in_background()
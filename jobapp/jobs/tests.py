@@ -1,3 +1,1234 @@
-from django.test import TestCase
+import base64
+import gzip
+import smtplib
+from decimal import Decimal
+from importlib import import_module
+from io import BytesIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from cloudinary import CloudinaryResource
+from django.apps import apps
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from PIL import Image, ImageDraw
+from rest_framework.test import APIClient
+
+from . import counters
+from .cache import get_cache, get_listing_version, listing_cache_stats
+from .counters import reconcile_application_counters
+from .facets import filtered_facets, stored_facets
+from .fast_read import application_rows, application_values, candidate_review_rows, company_review_rows, \
+    job_post_rows, job_post_values, review_values
+from .geo import geo_cell
+from .image_hash import MAX_DISTANCE, fingerprint_for, hamming_distance, similar_fingerprints
+from .images import build_url
+from .middleware import brotli
+from .models import User, Company, CompanyImage, JobPost, Application, Review, Follow, NotificationOutbox, \
+    ImageFingerprint, JobFacetCount, JobPostSearchToken, JobRecommendation, SalaryStat
+from .notifications import send_pending_notifications
+from .salary_stats import HISTOGRAM_MIN, HISTOGRAM_RATIO, HISTOGRAM_SIZE, bucket_bounds, bucket_index, \
+    percentile, rebuild_salary_stats
+from .search import rebuild_index, tokenize
+from .suggest import SuggestionIndex
+from .utils import parse_working_hours
+from . import verify_image
+from .verify_image import LocalStubBackend, pending_images, verify_pending_images
+from .recommend import FOLLOW_WEIGHT, build_interactions, refresh_recommendations
+from .renderers import ORJSONRenderer
+from .serializers import ApplicationSerializer, CandidateReviewRecruiterSerializer, JobPostSerializer, \
+    RecruiterReviewCandidateSerializer, UpdateAvatarSerializer
+
+
+class QueryPlanTests(TestCase):
+    # Kiểm tra các endpoint danh sách chính dùng đúng index đã khai báo trong Meta.indexes
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create(username='recruiter', role='recruiter')
+        cls.company = Company.objects.create(
+            user=cls.recruiter, name='Công ty A', tax_code='0101', description='Mô tả', location='Hà Nội'
+        )
+        candidates = [User.objects.create(username=f'candidate{i}', role='candidate') for i in range(10)]
+        cls.candidate = candidates[0]
+        for i in range(30):
+            job = JobPost.objects.create(
+                recruiter=cls.recruiter, title=f'Job {i}', description='Mô tả', salary=1000 + i,
+                working_hours='40', location='Hà Nội', active=i % 5 != 0,
+            )
+            Application.objects.bulk_create(
+                Application(applicant=candidate, job=job, active=i % 4 != 0, status=status)
+                for candidate, status in zip(candidates, ['pending', 'accepted', 'rejected'] * 4)
+            )
+        Review.objects.bulk_create(
+            Review(reviewer=reviewer, reviewed_user=reviewed, rating=5, comment='Tốt', active=i % 3 != 0)
+            for i in range(3) for reviewer in candidates for reviewed in candidates + [cls.recruiter]
+            if reviewer != reviewed
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+
+    def explain_query(self, url, table, user=None):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        sql = next(q['sql'] for q in ctx.captured_queries
+                   if q['sql'].startswith('SELECT') and f'FROM `{table}`' in q['sql'].replace('"', '`'))
+        with connection.cursor() as cursor:
+            # Cập nhật thống kê để optimizer chọn index như trên dữ liệu thật
+            cursor.execute(f'ANALYZE TABLE {table}' if connection.vendor == 'mysql' else f'ANALYZE {table}')
+            cursor.fetchall()
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+            return str(cursor.fetchall())
+
+    def test_job_post_list_uses_active_created_index(self):
+        plan = self.explain_query('/jobposts/', 'jobs_jobpost')
+        self.assertIn('jobpost_active_created_idx', plan)
+
+    def test_recruiter_job_post_uses_recruiter_index(self):
+        plan = self.explain_query('/jobposts/recruiter_job_post/', 'jobs_jobpost', user=self.recruiter)
+        self.assertIn('jobpost_recruiter_active_idx', plan)
+
+    def test_candidate_applications_use_applicant_index(self):
+        plan = self.explain_query('/applications/', 'jobs_application', user=self.candidate)
+        self.assertIn('application_applicant_idx', plan)
+
+    def test_recruiter_applications_by_job_use_job_status_index(self):
+        job = JobPost.objects.filter(recruiter=self.recruiter).first()
+        plan = self.explain_query(f'/applications/recruiter/?job={job.id}&status=pending', 'jobs_application',
+                                  user=self.recruiter)
+        self.assertIn('application_job_created_idx', plan)
+
+    @skipUnless(connection.vendor == 'mysql', 'SQLite so sánh cột boolean không qua index')
+    def test_company_reviews_use_reviewed_user_index(self):
+        plan = self.explain_query(
+            f'/review_recruiters/company/{self.company.id}/candidate-reviews/', 'jobs_review', user=self.candidate
+        )
+        self.assertIn('review_reviewed_active_idx', plan)
+
+
+class JobPostQueryCountTests(TestCase):
+    # Số truy vấn khi render danh sách tin phải cố định, không tăng theo số tin trên trang
+
+    @classmethod
+    def setUpTestData(cls):
+        candidates = [User.objects.create(username=f'candidate{i}', role='candidate') for i in range(3)]
+        cls.recruiters = []
+        for r in range(3):
+            recruiter = User.objects.create(username=f'recruiter{r}', role='recruiter')
+            company = Company.objects.create(
+                user=recruiter, name=f'Công ty {r}', tax_code=f'01{r}', description='Mô tả', location='Hà Nội'
+            )
+            CompanyImage.objects.bulk_create(CompanyImage(company=company, image=f'company_{r}_{i}') for i in range(2))
+            for i in range(4):
+                job = JobPost.objects.create(
+                    recruiter=recruiter, title=f'Job {r}-{i}', description='Mô tả', salary=1000 + i,
+                    working_hours='40', location='Hà Nội',
+                )
+                Application.objects.bulk_create(Application(applicant=c, job=job) for c in candidates)
+            cls.recruiters.append(recruiter)
+        reconcile_application_counters()  # bulk_create bỏ qua signals cập nhật bộ đếm
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+
+    def assert_page_queries(self, url, count, user=None):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['results'])
+        # COUNT(*) + trang tin (kèm recruiter, company, số đơn) + prefetch ảnh công ty
+        self.assertEqual(len(queries), count, [q['sql'] for q in queries])
+        return response
+
+    def test_job_post_list_query_count(self):
+        response = self.assert_page_queries('/jobposts/', 3)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(response.data['results'][0]['application_count'], 3)
+        self.assertNotIn('recruiter', response.data['results'][0])
+        self.assertEqual(response.data['results'][0]['company']['name'], 'Công ty 2')
+        self.assert_page_queries('/jobposts/?page=2', 3)
+
+    def test_expanded_job_post_list_query_count(self):
+        response = self.assert_page_queries('/jobposts/?expand=recruiter', 3)
+        self.assertEqual(len(response.data['results'][0]['recruiter']['company']['images']), 2)
+        self.assertNotIn('description', response.data['results'][0])
+
+    def test_fields_param_limits_job_post_fields(self):
+        response = self.assert_page_queries('/jobposts/?fields=id,title', 3)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title'})
+
+    def test_recruiter_job_post_query_count(self):
+        response = self.assert_page_queries('/jobposts/recruiter_job_post/', 3, self.recruiters[0])
+        self.assertEqual(len(response.data['results']), 4)
+
+
+class JobPostRangeFilterTests(TestCase):
+    # Lọc lương/giờ làm trên các cột salary_min/max, hours_min/max chuẩn hóa từ dữ liệu nhập tự do
+
+    @classmethod
+    def setUpTestData(cls):
+        recruiter = User.objects.create(username='recruiter', role='recruiter')
+        cls.jobs = {
+            hours: JobPost.objects.create(recruiter=recruiter, title=f'Job {hours}', description='Mô tả',
+                                          salary=salary, working_hours=hours, location='Hà Nội')
+            for hours, salary in [('40', 1000), ('20-30', 2000), ('4 giờ/ngày', 3000), ('8h/day', 4000),
+                                  ('thỏa thuận', 5000), ('8h - 17h', 6000)]
+        }
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+
+    def titles(self, query):
+        response = self.client.get(f'/jobposts/?{query}')
+        self.assertEqual(response.status_code, 200, response.data)
+        return sorted(job['title'] for job in response.data['results'])
+
+    def test_parse_working_hours(self):
+        self.assertEqual(parse_working_hours('40'), (40, 40))
+        self.assertEqual(parse_working_hours('20 - 30 giờ'), (20, 30))
+        self.assertEqual(parse_working_hours('4,5 giờ/ngày'), (22, 22))
+        self.assertEqual(parse_working_hours('8h/day'), (40, 40))
+        self.assertEqual(parse_working_hours('thỏa thuận'), (None, None))
+        # Khoảng giờ trong ngày (dữ liệu thực: "8h - 17h") -> số giờ/ngày x 5 ngày
+        self.assertEqual(parse_working_hours('8h - 17h'), (45, 45))
+        self.assertEqual(parse_working_hours('8:00-17:00'), (45, 45))
+        self.assertEqual(parse_working_hours('8h30 đến 12h'), (18, 18))
+        self.assertEqual(parse_working_hours('20h - 30h'), (20, 30))
+        self.assertEqual(parse_working_hours('8h - 12h/tuần'), (8, 12))
+        self.assertEqual(parse_working_hours('22h - 6h'), (None, None))
+        self.assertEqual(parse_working_hours('9:00 - 25:00'), (None, None))
+
+    def test_range_filters(self):
+        self.assertEqual(self.titles('salary__gte=2000&salary__lte=3000'), ['Job 20-30', 'Job 4 giờ/ngày'])
+        self.assertEqual(self.titles('working_hours__gte=35'), ['Job 40', 'Job 8h - 17h', 'Job 8h/day'])
+        self.assertEqual(self.titles('working_hours__lte=25'), ['Job 20-30', 'Job 4 giờ/ngày'])
+        self.assertEqual(self.titles('working_hours__gte=25&working_hours__lte=30'), ['Job 20-30'])
+
+    def test_invalid_numbers_are_rejected(self):
+        for query in ['salary__gte=NaN', 'salary__lte=Infinity', 'salary__gte=abc', 'working_hours__lte=1.5']:
+            response = self.client.get(f'/jobposts/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+
+    def test_backfill_migration(self):
+        JobPost.objects.update(salary_min=None, salary_max=None, hours_min=None, hours_max=None)
+        import_module('jobs.migrations.0005_populate_jobpost_numeric_ranges').populate_numeric_ranges(apps, None)
+        job = JobPost.objects.get(pk=self.jobs['4 giờ/ngày'].pk)
+        self.assertEqual((job.hours_min, job.hours_max, job.salary_min, job.salary_max), (20, 20, 3000, 3000))
+        job = JobPost.objects.get(pk=self.jobs['thỏa thuận'].pk)
+        self.assertEqual((job.hours_min, job.hours_max, job.salary_max), (None, None, 5000))
+        job = JobPost.objects.get(pk=self.jobs['8h - 17h'].pk)
+        self.assertEqual((job.hours_min, job.hours_max), (45, 45))
+
+
+class JobPostCursorPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        recruiter = User.objects.create(username='recruiter', role='recruiter')
+        # 3 mức lương, mỗi mức 5 tin, cùng created_date để id phải phân xử thứ tự
+        cls.jobs = [JobPost.objects.create(recruiter=recruiter, title=f'Job {i}', specialized='CNTT',
+                                           description='Mô tả', salary=1000 * (i % 3 + 1), working_hours='40',
+                                           location='Hà Nội') for i in range(15)]
+        JobPost.objects.update(created_date=timezone.now())
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+
+    def walk(self, **params):
+        ids, pages = [], 0
+        response = self.client.get('/jobposts/', {'pagination': 'cursor', **params})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids += [job['id'] for job in response.data['results']]
+            pages += 1
+            if not response.data['next']:
+                return ids, pages
+            response = self.client.get(response.data['next'])
+
+    def test_keyset_breaks_ties_by_id(self):
+        for ordering, key in [('salary', lambda job: (job.salary, job.id)),
+                              ('-salary', lambda job: (-job.salary, -job.id)),
+                              ('created_date', lambda job: job.id),
+                              ('-created_date', lambda job: -job.id)]:
+            with self.subTest(ordering=ordering):
+                ids, pages = self.walk(ordering=ordering)
+                self.assertEqual(ids, [job.id for job in sorted(self.jobs, key=key)])
+                self.assertEqual(pages, 2)
+
+    def test_malformed_cursor(self):
+        cursors = ['not-base64!', base64.urlsafe_b64encode(b'[1, 2]').decode(),
+                   base64.urlsafe_b64encode(b'{"o":"-created_date","v":"abc","id":1}').decode(),
+                   base64.urlsafe_b64encode(b'{"o":"salary","v":"1000","id":1}').decode(),
+                   base64.urlsafe_b64encode(b'{"o":"-salary","v":"NaN","id":1}').decode(),
+                   base64.urlsafe_b64encode(b'{"o":"-salary","v":null,"id":"x"}').decode()]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/jobposts/', {'cursor': cursor, 'ordering': '-salary'})
+                self.assertEqual(response.status_code, 404)
+
+
+class FacetCountTests(TestCase):
+
+    def setUp(self):
+        self.recruiter = User.objects.create(username='recruiter', role='recruiter')
+
+    def create_job(self, **fields):
+        values = {'title': 'Job', 'specialized': 'CNTT', 'description': 'Mô tả', 'salary': 4000000,
+                  'working_hours': '40', 'location': 'Hà Nội', **fields}
+        return JobPost.objects.create(recruiter=self.recruiter, **values)
+
+    def assert_matches_group_by(self):
+        self.assertEqual(stored_facets(), filtered_facets(JobPost.objects.filter(active=True)))
+
+    def test_incremental_counts_match_group_by(self):
+        jobs = [self.create_job(specialized=specialized, location=location, salary=salary)
+                for specialized, location, salary in [('CNTT', 'Hà Nội', 2500000), ('CNTT', 'Đà Nẵng', 8000000),
+                                                      ('Kế toán', 'Hà Nội', 15000000), ('Kế toán', 'Huế', 30000000)]]
+        self.assert_matches_group_by()
+
+        jobs[0].salary, jobs[0].location = 12000000, 'Huế'
+        jobs[0].save()
+        # Nạp lại từ DB: lưu dùng giá trị đã đọc, không SELECT lại trước khi lưu
+        job = JobPost.objects.get(pk=jobs[1].pk)
+        job.specialized = 'Marketing'
+        with CaptureQueriesContext(connection) as queries:
+            job.save()
+        self.assertFalse([q['sql'] for q in queries.captured_queries
+                          if q['sql'].startswith('SELECT') and 'FROM "jobs_jobpost"' in q['sql']
+                          and f'"jobs_jobpost"."id" = {job.pk}' in q['sql']])
+        jobs[2].active = False
+        jobs[2].save(update_fields=['active'])
+        jobs[3].delete()
+        self.assert_matches_group_by()
+
+        # update_fields chỉ ghi các trường được liệt kê; thay đổi khác trong bộ nhớ không được tính
+        job.location, job.title = 'Cần Thơ', 'Job mới'
+        job.save(update_fields=['title'])
+        job.save(update_fields=['application_count'])
+        self.assert_matches_group_by()
+        job.save()
+        self.assert_matches_group_by()
+        self.assertEqual(stored_facets()['location'][0], {'value': 'Cần Thơ', 'count': 1})
+
+    def test_job_created_before_facet_table(self):
+        jobs = [self.create_job(), self.create_job(location='Huế', salary=25000000)]
+        JobFacetCount.objects.all().delete()  # Như thể các tin có trước migration 0006
+        jobs[0].active = False
+        jobs[0].save()
+        jobs[1].location = 'Cần Thơ'
+        jobs[1].save()
+        self.assertFalse(JobFacetCount.objects.filter(count__lt=0).exists())
+        self.assertTrue(all(bucket['count'] >= 0 for bucket in stored_facets()['salary']))
+
+        JobFacetCount.objects.all().delete()
+        import_module('jobs.migrations.0006_jobfacetcount').populate_facet_counts(apps, None)
+        self.assert_matches_group_by()
+
+
+class SalaryStatsTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        recruiter = User.objects.create(username='recruiter', role='recruiter')
+        # CNTT/Hà Nội: 1..10 triệu, Kế toán/Huế: 20 và 40 triệu
+        salaries = [('CNTT', 'Hà Nội', 1000000 * i) for i in range(1, 11)] + \
+                   [('Kế toán', 'Huế', 20000000), ('Kế toán', 'Huế', 40000000)]
+        self.jobs = [JobPost.objects.create(recruiter=recruiter, title='Job', specialized=specialized,
+                                            description='Mô tả', salary=salary, working_hours='40',
+                                            location=location) for specialized, location, salary in salaries]
+
+    def stats(self, **params):
+        response = self.client.get('/jobposts/salary-stats/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_histogram_buckets(self):
+        self.assertEqual(bucket_index(HISTOGRAM_MIN - 1), 0)
+        self.assertEqual(bucket_index(HISTOGRAM_MIN), 1)
+        for salary in (150000, 5000000, 99000000):
+            low, high = bucket_bounds(bucket_index(salary))
+            self.assertTrue(low <= salary < high)
+            self.assertLess(high / low, HISTOGRAM_RATIO + 0.01)
+        self.assertEqual(bucket_index(10 ** 12), HISTOGRAM_SIZE - 1)
+
+    def test_percentiles(self):
+        histogram = [0] * HISTOGRAM_SIZE
+        for salary in range(1000000, 11000000, 1000000):
+            histogram[bucket_index(salary)] += 1
+        # Sai số không vượt quá độ rộng một khoảng (~10%)
+        for fraction, expected in ((0.1, 1000000), (0.5, 5000000), (0.9, 9000000)):
+            self.assertAlmostEqual(percentile(histogram, 10, fraction), expected, delta=expected * 0.1)
+        self.assertIsNone(percentile([0] * HISTOGRAM_SIZE, 0, 0.5))
+
+    def create_job(self, salary):
+        return JobPost.objects.create(recruiter=self.jobs[0].recruiter, title='Job', specialized='Thiết kế',
+                                      description='Mô tả', salary=salary, working_hours='40', location='Vinh')
+
+    def test_percentiles_stay_within_stored_salaries(self):
+        # Lương trong dữ liệu thực (Database.sql) có dạng 20000.00; một tin duy nhất không được nội suy ra giá trị khác
+        self.create_job(1000)
+        single = self.stats(specialized='Thiết kế')
+        self.assertEqual([single[key] for key in ('median', 'p10', 'p90', 'min', 'max')], [1000] * 5)
+
+        for salary in (20000, 20000, 20000, 25000):
+            self.create_job(salary)
+        stats = self.stats(location='Vinh')
+        self.assertEqual((stats['count'], stats['min'], stats['max']), (5, 1000, 25000))
+        self.assertTrue(1000 <= stats['p10'] <= stats['median'] <= stats['p90'] <= 25000)
+        self.assertAlmostEqual(stats['median'], 20000, delta=2000)
+
+    def test_backfill_matches_rebuild(self):
+        rebuild_salary_stats()
+        expected = list(SalaryStat.objects.order_by('specialized', 'location')
+                        .values_list('specialized', 'location', 'count', 'total', 'histogram', 'min_salary', 'max_salary'))
+        SalaryStat.objects.all().delete()
+        import_module('jobs.migrations.0018_salarystat_salary_range').rebuild_salary_stats(apps, None)
+        self.assertEqual(list(SalaryStat.objects.order_by('specialized', 'location')
+                              .values_list('specialized', 'location', 'count', 'total', 'histogram', 'min_salary',
+                                           'max_salary')), expected)
+
+    def test_incremental_stats_match_rebuild(self):
+        self.jobs[0].salary = 50000000
+        self.jobs[0].save()
+        self.jobs[-1].active = False
+        self.jobs[-1].save()
+        incremental = [self.stats(), self.stats(specialized='CNTT'), self.stats(location='Huế'),
+                       self.stats(specialized='CNTT', location='Hà Nội')]
+        self.assertFalse(SalaryStat.objects.filter(specialized='', location='').exists())
+
+        self.assertEqual(incremental[0]['count'], 11)
+        self.assertEqual(incremental[0]['mean'], round((sum(range(2, 11)) + 50 + 20) * 1000000 / 11))
+        self.assertAlmostEqual(incremental[1]['median'], 6500000, delta=650000)
+        self.assertEqual(incremental[2]['count'], 1)
+        self.assertEqual(self.stats(location='Đà Nẵng')['count'], 0)
+
+        rebuild_salary_stats()
+        self.assertEqual(incremental, [self.stats(), self.stats(specialized='CNTT'), self.stats(location='Huế'),
+                                       self.stats(specialized='CNTT', location='Hà Nội')])
+
+
+class GeoFilterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        recruiter = User.objects.create(username='recruiter', role='recruiter')
+        cls.jobs = {location: JobPost.objects.create(recruiter=recruiter, title='Job', specialized='CNTT',
+                                                     description='Mô tả', salary=1000, working_hours='40',
+                                                     location=location)
+                    for location in ('Quận 1, TP HCM', 'Quận 2, Hồ Chí Minh', 'Cầu Giấy, Hà Nội', 'Làm từ xa')}
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+
+    def near(self, lat, lng, radius_km):
+        return self.client.get('/jobposts/', {'near': f'{lat},{lng}', 'radius_km': radius_km})
+
+    def test_geo_cell(self):
+        self.assertEqual(geo_cell(21.0285, 105.8542), '84:423')
+        self.assertEqual(geo_cell(-0.1, -0.1), '-1:-1')
+        job = self.jobs['Quận 1, TP HCM']
+        self.assertEqual((job.latitude, job.longitude), (10.7756, 106.7019))
+        self.assertEqual(job.geo_cell, geo_cell(job.latitude, job.longitude))
+        self.assertIsNone(self.jobs['Làm từ xa'].geo_cell)
+
+    def test_radius_filter(self):
+        district_1, district_2 = self.jobs['Quận 1, TP HCM'], self.jobs['Quận 2, Hồ Chí Minh']
+        response = self.near(10.7756, 106.7019, 3)
+        self.assertEqual([job['id'] for job in response.data['results']], [district_1.id])
+        # Tâm ở ô lưới bên cạnh: vẫn tìm thấy tin ở ô khác trong bán kính, gần nhất trước
+        self.assertNotEqual(geo_cell(10.7756, 106.76), district_1.geo_cell)
+        response = self.near(10.7756, 106.76, 10)
+        self.assertEqual([job['id'] for job in response.data['results']], [district_2.id, district_1.id])
+        # Bán kính lớn (quá nhiều ô lưới) chỉ lọc theo khung lat/lng
+        self.assertEqual(len(self.near(10.7769, 106.7009, 500).data['results']), 2)
+        self.assertEqual(self.near(10.7756, 106.7019, 1000).status_code, 400)
+
+    def test_backfill_matches_geocoder(self):
+        expected = list(JobPost.objects.order_by('id').values_list('latitude', 'longitude', 'geo_cell'))
+        JobPost.objects.update(latitude=None, longitude=None, geo_cell=None)
+        import_module('jobs.migrations.0008_populate_jobpost_geo_location').populate_geo_location(apps, None)
+        self.assertEqual(list(JobPost.objects.order_by('id').values_list('latitude', 'longitude', 'geo_cell')),
+                         expected)
+
+
+class ApplicationCounterTests(TestCase):
+    # Bộ đếm đơn ứng tuyển trên JobPost được cập nhật theo vòng đời Application
+
+    def setUp(self):
+        recruiter = User.objects.create(username='recruiter', role='recruiter')
+        self.candidates = [User.objects.create(username=f'candidate{i}', role='candidate') for i in range(3)]
+        self.job = JobPost.objects.create(
+            recruiter=recruiter, title='Job', description='Mô tả', salary=1000, working_hours='40', location='Hà Nội'
+        )
+
+    def assert_counts(self, total, pending, accepted, rejected):
+        self.job.refresh_from_db()
+        self.assertEqual(
+            (self.job.application_count, self.job.pending_count, self.job.accepted_count, self.job.rejected_count),
+            (total, pending, accepted, rejected),
+        )
+
+    def test_job_save_keeps_concurrent_counter_updates(self):
+        stale = JobPost.objects.get(pk=self.job.pk)
+        Application.objects.create(applicant=self.candidates[0], job=self.job)
+        # Lưu cả dòng từ bản đã nạp trước đó không được ghi đè bộ đếm
+        stale.title = 'Job mới'
+        stale.save()
+        self.assert_counts(1, 1, 0, 0)
+        self.assertEqual(self.job.title, 'Job mới')
+
+    def test_counters_follow_application_lifecycle(self):
+        applications = [Application.objects.create(applicant=c, job=self.job) for c in self.candidates]
+        self.assert_counts(3, 3, 0, 0)
+
+        applications[0].status = 'accepted'
+        applications[0].save()
+        applications[1].status = 'rejected'
+        applications[1].save()
+        self.assert_counts(3, 1, 1, 1)
+
+        applications[1].active = False
+        applications[1].save()
+        self.assert_counts(2, 1, 1, 0)
+
+        applications[2].delete()
+        self.assert_counts(1, 0, 1, 0)
+
+    def test_reconcile_repairs_drift(self):
+        Application.objects.bulk_create(Application(applicant=c, job=self.job) for c in self.candidates)
+        self.assert_counts(0, 0, 0, 0)
+        self.assertEqual(reconcile_application_counters(), 1)
+        self.assert_counts(3, 3, 0, 0)
+        self.assertEqual(reconcile_application_counters(), 0)
+
+    def test_reconcile_keeps_concurrent_increments(self):
+        Application.objects.bulk_create(Application(applicant=c, job=self.job) for c in self.candidates[:2])
+        late = User.objects.create(username='late', role='candidate')
+        scan = counters.drifted_jobs
+
+        def scan_then_apply(counts, job_ids, batch_size):
+            drifted = scan(counts, job_ids, batch_size)
+            if job_ids is None:
+                # Đơn mới được ghi (cộng F() vào bộ đếm) giữa lượt quét và lượt sửa
+                Application.objects.create(applicant=late, job=self.job)
+            return drifted
+
+        with mock.patch('jobs.counters.drifted_jobs', side_effect=scan_then_apply):
+            self.assertEqual(reconcile_application_counters(), 1)
+        self.assert_counts(3, 3, 0, 0)
+
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        recruiter = User.objects.create(username='recruiter', role='recruiter')
+        cls.jobs = {}
+        for key, title, description in [('title', 'Lập trình viên Python', 'Phát triển web'),
+                                         ('description', 'Nhân viên kỹ thuật', 'Lập trình Python cho robot'),
+                                         ('other', 'Lập trình viên Java', 'Phát triển ứng dụng')]:
+            cls.jobs[key] = JobPost.objects.create(recruiter=recruiter, title=title, description=description,
+                                                   specialized='CNTT', salary=1000, working_hours='40',
+                                                   location='Đà Nẵng')
+        rebuild_index()  # Chỉ mục được ghi on_commit, không chạy trong setUpTestData
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+
+    def search(self, query):
+        response = self.client.get('/jobposts/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [job['id'] for job in response.data['results']]
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('Lập trình viên ĐÀ NẴNG, C++/Python3'),
+                         ['lap', 'trinh', 'vien', 'da', 'nang', 'c', 'python3'])
+
+    def test_prefix_match_and_ranking(self):
+        # Mọi từ khóa phải khớp (theo tiền tố); khớp ở tiêu đề xếp trên khớp ở mô tả
+        self.assertEqual(self.search('LẬP TRÌ pyth'), [self.jobs['title'].id, self.jobs['description'].id])
+        self.assertEqual(self.search('da nang java'), [self.jobs['other'].id])
+        self.assertEqual(self.search('rust'), [])
+
+    def test_backfill_migration(self):
+        expected = sorted(JobPostSearchToken.objects.values_list('job_id', 'token', 'weight'))
+        JobPostSearchToken.objects.all().delete()
+        import_module('jobs.migrations.0002_jobpostsearchtoken').populate_search_tokens(apps, None)
+        self.assertEqual(sorted(JobPostSearchToken.objects.values_list('job_id', 'token', 'weight')), expected)
+        self.assertCountEqual(self.search('lap trinh'), [job.id for job in self.jobs.values()])
+
+    def test_index_updated_after_commit(self):
+        job = self.jobs['other']
+        job.title = 'Lập trình viên Rust'
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+        self.assertEqual(self.search('rust'), [job.id])
+        self.assertEqual(self.search('java'), [])
+
+
+class SuggestionIndexTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        recruiter = User.objects.create(username='recruiter', role='recruiter')
+        for title, location in [('Nhân viên bán hàng', 'Hà Nội'), ('Nhân viên bán hàng', 'Hà Nội'),
+                                ('Bán hàng online', 'Hải Phòng'), ('Kế toán', 'Hà Nội')]:
+            JobPost.objects.create(recruiter=recruiter, title=title, specialized='Kinh doanh', description='Mô tả',
+                                   salary=1000, working_hours='40', location=location)
+
+    def setUp(self):
+        self.index = SuggestionIndex()
+        self.index.rebuild()
+
+    def test_prefix_match_and_ranking(self):
+        # Không dấu, khớp từ đầu mỗi từ; nhiều tin hơn xếp trước
+        self.assertEqual(self.index.suggest('ban hang'), [
+            {'value': 'Nhân viên bán hàng', 'type': 'title', 'count': 2},
+            {'value': 'Bán hàng online', 'type': 'title', 'count': 1},
+        ])
+        self.assertEqual([s['value'] for s in self.index.suggest('hai')], ['Hải Phòng'])
+        self.assertEqual(self.index.suggest('   '), [])
+
+    def test_incremental_update(self):
+        job = JobPost.objects.get(title='Kế toán')
+        self.index.update(None, {'active': True, 'title': 'Kế toán trưởng', 'specialized': '', 'location': ''})
+        self.index.update({'active': True, 'title': job.title, 'specialized': job.specialized,
+                           'location': job.location}, None)
+        self.assertEqual([s['value'] for s in self.index.suggest('ke toan')], ['Kế toán trưởng'])
+        self.assertEqual(self.index.suggest('kinh')[0]['count'], 3)
+
+    def test_signals_update_index_only_after_commit(self):
+        recruiter = User.objects.get(username='recruiter')
+        with mock.patch('jobs.signals.suggestion_index', self.index), self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                JobPost.objects.create(recruiter=recruiter, title='Thợ điện', description='Mô tả', salary=1000,
+                                       working_hours='40', location='Huế')
+                raise RuntimeError
+            JobPost.objects.create(recruiter=recruiter, title='Thợ hàn', description='Mô tả', salary=1000,
+                                   working_hours='40', location='Huế')
+            self.assertEqual(self.index.suggest('tho'), [])
+        self.assertEqual([s['value'] for s in self.index.suggest('tho')], ['Thợ hàn'])
+
+    def test_cold_index_does_not_block_request(self):
+        with mock.patch('jobs.views.suggestion_index', SuggestionIndex()), \
+                mock.patch('jobs.views.refresh_in_background') as refresh:
+            response = APIClient().get('/jobposts/suggest/?q=ban')
+        self.assertEqual((response.status_code, response.data), (200, []))
+        refresh.assert_called_once_with()
+
+
+class RecommendationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create(username='recruiter', role='recruiter')
+        cls.jobs = [
+            JobPost.objects.create(recruiter=cls.recruiter, title=title, specialized=specialized,
+                                   description='Mô tả công việc', salary=1000, working_hours='40', location='Hà Nội')
+            for title, specialized in [('Lập trình viên Python', 'CNTT'), ('Lập trình viên Python Django', 'CNTT'),
+                                       ('Kế toán tổng hợp', 'Kế toán')]
+        ]
+        cls.applicant = User.objects.create(username='applicant', role='candidate')
+        cls.follower = User.objects.create(username='follower', role='candidate')
+        cls.newcomer = User.objects.create(username='newcomer', role='candidate')
+        Application.objects.create(applicant=cls.applicant, job=cls.jobs[0])
+        Follow.objects.create(follower=cls.follower, recruiter=cls.recruiter)
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+
+    def recommended_ids(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get('/jobposts/recommended/')
+        self.assertEqual(response.status_code, 200)
+        return [job['id'] for job in response.data['results']]
+
+    def test_refresh_ranks_similar_jobs(self):
+        self.assertEqual(refresh_recommendations(), 2)
+        ids = self.recommended_ids(self.applicant)
+        self.assertEqual(ids[0], self.jobs[1].id)
+        self.assertNotIn(self.jobs[0].id, ids)  # Tin đã ứng tuyển không được gợi ý lại
+        self.assertEqual(JobRecommendation.objects.filter(candidate=self.follower).count(), 3)
+        # Chưa có lịch sử -> tin mới nhất
+        self.assertEqual(self.recommended_ids(self.newcomer), [job.id for job in reversed(self.jobs)])
+
+    def test_only_candidates_get_recommendations(self):
+        self.assertIn(self.client.get('/jobposts/recommended/').status_code, (401, 403))
+        self.client.force_authenticate(self.recruiter)
+        self.assertEqual(self.client.get('/jobposts/recommended/').status_code, 403)
+
+    def test_interactions_ignore_jobs_created_during_refresh(self):
+        jobs = list(JobPost.objects.values('id', 'active', 'recruiter_id').order_by('id'))
+        job_index = {job['id']: i for i, job in enumerate(jobs)}
+        JobPost.objects.create(recruiter=self.recruiter, title='Tin mới', description='Mô tả', salary=1000,
+                               working_hours='40', location='Hà Nội')
+        candidate_ids, matrix, applied = build_interactions(jobs, job_index)
+        self.assertEqual(matrix.shape, (2, 3))
+        self.assertAlmostEqual(matrix[candidate_ids.index(self.follower.id)].sum(), FOLLOW_WEIGHT)
+
+
+class FastReadTests(TestCase):
+    # Đường đọc bằng .values() phải cho JSON giống hệt serializer
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create(username='recruiter', role='recruiter', avatar='avatar_r')
+        company = Company.objects.create(
+            user=cls.recruiter, name='Công ty A', tax_code='0101', description='Mô tả', location='Hà Nội'
+        )
+        CompanyImage.objects.bulk_create(CompanyImage(company=company, image=f'company_{i}') for i in range(3))
+        # Nhà tuyển dụng chưa có công ty -> company = null
+        other = User.objects.create(username='recruiter2', role='recruiter')
+        cls.candidate = User.objects.create(username='candidate', role='candidate', email='c@example.com')
+        for i, recruiter in enumerate([cls.recruiter, other] * 3):
+            job = JobPost.objects.create(
+                recruiter=recruiter, title=f'Việc {i}', description='Mô tả', salary='1234567.5',
+                working_hours='8h/ngày', location='Đà Nẵng',
+            )
+            Application.objects.create(applicant=cls.candidate, job=job, cv='cv_1' if i % 2 else None)
+        Review.objects.create(reviewer=cls.candidate, reviewed_user=cls.recruiter, rating=4, comment='Tốt')
+        Review.objects.create(reviewer=cls.recruiter, reviewed_user=cls.candidate, rating=5, comment='Giỏi')
+
+    context = {'image_size': 'thumb'}
+
+    def setUp(self):
+        get_cache().clear()
+
+    def assert_same_json(self, fast, serializer):
+        render = JSONRenderer().render
+        self.assertEqual(render(fast), render(serializer.data))
+
+    def test_job_posts(self):
+        queryset = JobPostSerializer.setup_eager_loading(JobPost.objects.filter(active=True), compact=True)
+        self.assert_same_json(job_post_rows(job_post_values(queryset), 'thumb'),
+                              JobPostSerializer(queryset, many=True, compact=True, context=self.context))
+
+    def test_recruiter_applications(self):
+        queryset = Application.objects.filter(active=True)
+        self.assert_same_json(application_rows(application_values(queryset), 'thumb'),
+                              ApplicationSerializer(queryset, many=True, compact=True, context=self.context))
+
+    def test_reviews(self):
+        queryset = Review.objects.filter(reviewed_user=self.recruiter)
+        recruiter = User.objects.get(pk=self.recruiter.pk)
+        self.assert_same_json(company_review_rows(review_values(queryset), recruiter, 'thumb'),
+                              CandidateReviewRecruiterSerializer(queryset, many=True, context=self.context))
+        queryset = Review.objects.filter(reviewed_user=self.candidate)
+        self.assert_same_json(candidate_review_rows(review_values(queryset, 'reviewed_user__'), 'thumb'),
+                              RecruiterReviewCandidateSerializer(queryset, many=True, context=self.context))
+
+    def test_list_images_use_thumbnails(self):
+        response = APIClient().get('/jobposts/')
+        logo = next(job['company']['logo'] for job in response.data['results'] if job['company'])
+        self.assertIn('/c_fill,f_auto,h_150,q_auto,w_150/', logo)
+        response = APIClient().get('/jobposts/?image_size=full')
+        logo = next(job['company']['logo'] for job in response.data['results'] if job['company'])
+        self.assertTrue(logo.endswith('/image/upload/company_2'))
+
+
+class ListingCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create(username='recruiter', role='recruiter')
+        cls.job = JobPost.objects.create(recruiter=cls.recruiter, title='Job', description='Mô tả', salary=1000,
+                                         working_hours='40', location='Hà Nội')
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+
+    def test_hit_miss_and_key_per_query(self):
+        self.assertEqual(self.client.get('/jobposts/')['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/jobposts/')['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get('/jobposts/?location=Hà Nội')['X-Cache'], 'MISS')
+        # Tham số rỗng và thứ tự tham số không tạo khóa mới
+        self.assertEqual(self.client.get('/jobposts/?specialized=&location=Hà Nội')['X-Cache'], 'HIT')
+        self.assertEqual(listing_cache_stats()['hits'], 2)
+
+    def test_invalidated_after_commit(self):
+        self.client.get('/jobposts/')
+        version = get_listing_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.job.title = 'Job mới'
+            self.job.save()
+            # Chưa commit: phiên bản chưa đổi, request khác không thể lưu dữ liệu chưa commit vào khóa mới
+            self.assertEqual(get_listing_version(), version)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(get_listing_version(), version)
+        response = self.client.get('/jobposts/')
+        self.assertEqual((response['X-Cache'], response.data['results'][0]['title']), ('MISS', 'Job mới'))
+
+        self.client.get('/jobposts/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.delete()
+        response = self.client.get('/jobposts/')
+        self.assertEqual((response['X-Cache'], response.data['results']), ('MISS', []))
+
+    def test_recruiter_changes_invalidate_expanded_listing(self):
+        url = '/jobposts/?expand=recruiter'
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recruiter.last_login = timezone.now()
+            self.recruiter.save(update_fields=['last_login'])
+            User.objects.create(username='candidate', role='candidate')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recruiter.first_name = 'Lan'
+            self.recruiter.save()
+        response = self.client.get(url)
+        self.assertEqual((response['X-Cache'], response.data['results'][0]['recruiter']['first_name']), ('MISS', 'Lan'))
+
+
+@override_settings(JOBPOST_LIST_ETAGS=True)
+class ConditionalGetTests(TestCase):
+    # ETag/Last-Modified: trả 304 trước khi đọc dữ liệu hay serialize
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create(username='recruiter', role='recruiter')
+        Company.objects.create(user=cls.recruiter, name='Công ty A', tax_code='0101', description='Mô tả',
+                               location='Hà Nội')
+        cls.job = JobPost.objects.create(
+            recruiter=cls.recruiter, title='Job', description='Mô tả', salary=1000, working_hours='40',
+            location='Hà Nội',
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+
+    def assert_not_modified(self, url, etag):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        return queries
+
+    def test_job_post_list(self):
+        response = self.client.get('/jobposts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(len(self.assert_not_modified('/jobposts/', response['ETag'])), 0)
+        # Tham số khác -> nội dung khác -> ETag khác
+        self.assertEqual(self.client.get('/jobposts/?page=1', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+        self.job.title = 'Job mới'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.save()
+        self.assertEqual(self.client.get('/jobposts/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_job_post_detail(self):
+        url = f'/jobposts/{self.job.id}/'
+        response = self.client.get(url)
+        self.assertEqual(len(self.assert_not_modified(url, response['ETag'])), 1)
+
+        # Thông tin nhà tuyển dụng nằm trong trang chi tiết
+        self.recruiter.first_name = 'An'
+        self.recruiter.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+        self.assertEqual(self.client.get('/jobposts/0/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 404)
+
+    @override_settings(JOBPOST_LIST_ETAGS=None)
+    def test_disabled_with_process_local_cache(self):
+        # LocMemCache: mỗi worker một phiên bản riêng -> không phát ETag để tránh 304 với dữ liệu cũ
+        for url in ['/jobposts/', f'/jobposts/{self.job.id}/']:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('ETag', response)
+
+
+class RecruiterApplicationListTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create(username='recruiter', role='recruiter')
+        cls.jobs = [
+            JobPost.objects.create(recruiter=cls.recruiter, title=f'Job {i}', description='Mô tả', salary=1000,
+                                   working_hours='40', location='Hà Nội')
+            for i in range(2)
+        ]
+        for i in range(6):
+            candidate = User.objects.create(username=f'candidate{i}', role='candidate')
+            Application.objects.create(applicant=candidate, job=cls.jobs[i % 2],
+                                       status='accepted' if i < 2 else 'pending')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.recruiter)
+
+    def get(self, query=''):
+        response = self.client.get(f'/applications/recruiter/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_pagination_and_compact_rows(self):
+        data = self.get('?page_size=4')
+        self.assertEqual(data['count'], 6)
+        self.assertEqual(len(data['results']), 4)
+        self.assertEqual(set(data['results'][0]), {'id', 'job', 'job_title', 'applicant_detail', 'cv', 'status',
+                                                   'created_date', 'updated_date'})
+        self.assertIn('job_detail', self.get('?expand=job_detail')['results'][0])
+
+    def test_filters_and_ordering(self):
+        ids = lambda data: [row['id'] for row in data['results']]
+        self.assertEqual(self.get(f'?job={self.jobs[0].id}')['count'], 3)
+        self.assertEqual(self.get(f'?job={self.jobs[0].id}&status=accepted')['count'], 1)
+        self.assertEqual(self.get('?status=accepted,rejected')['count'], 2)
+        self.assertEqual(self.get('?created_after=2000-01-01&created_before=2000-01-02')['count'], 0)
+        self.assertEqual(ids(self.get('?ordering=id')), sorted(ids(self.get())))
+        self.assertEqual(self.client.get('/applications/recruiter/?status=unknown').status_code, 400)
+        self.assertEqual(self.client.get('/applications/recruiter/?created_after=hôm qua').status_code, 400)
+
+    def test_bulk_update_status(self):
+        other = User.objects.create(username='other', role='recruiter')
+        foreign = Application.objects.create(
+            applicant=User.objects.get(username='candidate0'),
+            job=JobPost.objects.create(recruiter=other, title='Khác', description='Mô tả', salary=1000,
+                                       working_hours='40', location='Hà Nội'),
+        )
+        accepted, pending = (Application.objects.filter(job__recruiter=self.recruiter, status=value).first()
+                             for value in ('accepted', 'pending'))
+
+        response = self.client.post('/applications/recruiter/bulk-status/', {
+            'ids': [pending.id, accepted.id, foreign.id, pending.id], 'status': 'accepted',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual([row['result'] for row in response.data['results']], ['updated', 'unchanged', 'not_found'])
+        self.assertEqual(Application.objects.get(pk=foreign.pk).status, 'pending')
+
+        job = JobPost.objects.get(pk=pending.job_id)
+        self.assertEqual((job.pending_count, job.accepted_count, job.application_count), (1, 2, 3))
+        self.assertEqual(reconcile_application_counters(), 0)
+
+    def test_recruiter_summary(self):
+        get_cache().clear()
+        url = '/jobposts/recruiter_job_post/summary/'
+        with self.assertNumQueries(1):
+            data = self.client.get(url).data
+        self.assertEqual(data['totals']['application_count'], 6)
+        job = next(row for row in data['jobs'] if row['id'] == self.jobs[0].id)
+        self.assertEqual((job['pending_count'], job['accepted_count'], job['rejected_count']), (2, 1, 0))
+        self.assertIsNotNone(job['latest_application_date'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        # Đơn mới hoặc duyệt hàng loạt -> cache của nhà tuyển dụng bị xóa
+        with self.captureOnCommitCallbacks(execute=True):
+            Application.objects.create(applicant=User.objects.create(username='new', role='candidate'),
+                                       job=self.jobs[0])
+        self.assertEqual(self.client.get(url).data['totals']['pending_count'], 5)
+        pending = Application.objects.filter(job__recruiter=self.recruiter, status='pending').values_list('id', flat=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/applications/recruiter/bulk-status/', {'ids': list(pending), 'status': 'rejected'},
+                             format='json')
+        self.assertEqual(self.client.get(url).data['totals']['rejected_count'], 5)
+
+
+class FollowerNotificationTests(TestCase):
+
+    def setUp(self):
+        self.recruiter = User.objects.create(username='recruiter', role='recruiter')
+        for i in range(5):
+            follower = User.objects.create(username=f'candidate{i}', role='candidate', email=f'c{i}@example.com')
+            Follow.objects.create(follower=follower, recruiter=self.recruiter)
+
+    def create_job(self):
+        return JobPost.objects.create(recruiter=self.recruiter, title='Job', description='Mô tả', salary=1000,
+                                      working_hours='40', location='Hà Nội')
+
+    def test_job_create_only_enqueues(self):
+        self.create_job()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(NotificationOutbox.objects.get().status, 'pending')
+
+        with self.settings(NOTIFICATION_BATCH_SIZE=2):
+            self.assertEqual(send_pending_notifications(), {'done': 1})
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [f'c{i}@example.com' for i in range(5)])
+        self.assertTrue(all(len(message.to) == 1 for message in mail.outbox))
+        self.assertEqual(NotificationOutbox.objects.get().sent_count, 5)
+        self.assertEqual(send_pending_notifications(), {})
+
+    def test_transient_error_retries_with_backoff(self):
+        self.create_job()
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=smtplib.SMTPServerDisconnected('mất kết nối')):
+            self.assertEqual(send_pending_notifications(), {'pending': 1})
+        outbox = NotificationOutbox.objects.get()
+        self.assertEqual((outbox.attempts, outbox.sent_count), (1, 0))
+        self.assertGreater(outbox.next_attempt_at, timezone.now())
+
+        # Chưa đến hạn thử lại -> không gửi; đến hạn -> gửi tiếp
+        self.assertEqual(send_pending_notifications(), {})
+        NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_pending_notifications(), {'done': 1})
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(NOTIFICATION_BATCH_SIZE=2)
+    def test_worker_stops_when_lease_is_taken(self):
+        self.create_job()
+
+        def send_messages(messages):
+            # Giả lập lease hết hạn và worker khác đã nhận lại bản ghi giữa lượt gửi
+            NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+            return len(messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=send_messages) as send:
+            self.assertEqual(send_pending_notifications(), {'lost': 1})
+        self.assertEqual(send.call_count, 2)  # Dừng sau lượt đầu, không gửi tiếp lượt sau
+        outbox = NotificationOutbox.objects.get()
+        self.assertEqual((outbox.status, outbox.last_follow_id), ('sending', 0))
+
+
+@override_settings(IMAGE_VERIFICATION_BACKEND='jobs.verify_image.LocalStubBackend')
+class CompanyImageVerificationTests(TestCase):
+
+    def setUp(self):
+        self.recruiter = User.objects.create(username='recruiter', role='recruiter')
+        self.company = Company.objects.create(user=self.recruiter, name='Công ty A', tax_code='0101',
+                                              description='Mô tả', location='Hà Nội')
+
+    def test_batches_and_records_verdicts(self):
+        images = [CompanyImage.objects.create(company=self.company, image=f'company/office_{i}') for i in range(3)]
+        self.assertEqual({image.verification_status for image in images}, {'pending'})
+        self.assertFalse(Company.objects.get(pk=self.company.pk).is_verified)
+
+        with mock.patch.object(LocalStubBackend, 'annotate', autospec=True,
+                               side_effect=LocalStubBackend.annotate) as annotate:
+            self.assertEqual(verify_pending_images(batch_size=2), {'approved': 3})
+        self.assertEqual([len(call.args[1]) for call in annotate.call_args_list], [2, 1])
+        image = CompanyImage.objects.get(pk=images[0].pk)
+        self.assertEqual((image.verification_labels, image.verification_attempts), (['office'], 1))
+        self.assertIsNotNone(image.verified_at)
+        self.assertTrue(Company.objects.get(pk=self.company.pk).is_verified)
+        self.assertEqual(verify_pending_images(), {})
+
+    def test_background_pass_picks_up_late_images(self):
+        CompanyImage.objects.create(company=self.company, image='company/office_1')
+        verify_all = verify_image.verify_pending_images
+
+        def verify_then_upload():
+            stats = verify_all()
+            if not CompanyImage.objects.filter(image='company/office_2').exists():
+                # Ảnh commit khi lượt đang chạy giữ khóa: verify_in_background không mở được luồng mới
+                CompanyImage.objects.create(company=self.company, image='company/office_2')
+                verify_image.verify_in_background()
+            return stats
+
+        self.assertTrue(verify_image._verify_lock.acquire(blocking=False))
+        with mock.patch('jobs.verify_image.verify_pending_images', side_effect=verify_then_upload) as verify, \
+                mock.patch('jobs.verify_image.connection'), mock.patch('jobs.verify_image.threading.Thread') as thread:
+            verify_image._verify()
+        thread.assert_not_called()
+        self.assertEqual(verify.call_count, 2)
+        self.assertFalse(pending_images().exists())
+        self.assertFalse(verify_image._verify_lock.locked())
+
+    @override_settings(IMAGE_VERIFICATION_STUB_LABELS=['beach'])
+    def test_untrusted_image_is_rejected(self):
+        CompanyImage.objects.create(company=self.company, image='company/beach')
+        self.assertEqual(verify_pending_images(), {'rejected': 1})
+        self.assertFalse(Company.objects.get(pk=self.company.pk).is_verified)
+
+    def office_photo(self, size, image_format):
+        image = Image.linear_gradient('L').resize((256, 192)).convert('RGB')
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((40, 30, 120, 150), fill=(200, 40, 40))
+        draw.ellipse((150, 60, 230, 140), fill=(20, 20, 160))
+        buffer = BytesIO()
+        image.resize(size).save(buffer, format=image_format)
+        return buffer.getvalue()
+
+    def test_duplicate_images_reuse_cached_verdict(self):
+        original = fingerprint_for(self.office_photo((256, 192), 'PNG'))
+        resized = fingerprint_for(self.office_photo((640, 480), 'JPEG'))
+        self.assertEqual(fingerprint_for(self.office_photo((256, 192), 'PNG')), original)
+        self.assertNotEqual(original.content_hash, resized.content_hash)
+        self.assertLessEqual(hamming_distance(int(original.phash, 16), int(resized.phash, 16)), MAX_DISTANCE)
+        self.assertEqual(similar_fingerprints(resized), [original])
+
+        other_recruiter = User.objects.create(username='recruiter2', role='recruiter')
+        other = Company.objects.create(user=other_recruiter, name='Công ty B', tax_code='0202',
+                                       description='Mô tả', location='Hà Nội')
+        for name in ('office_a', 'office_b'):
+            CompanyImage.objects.create(company=self.company, image=f'company/{name}', fingerprint=original)
+        with mock.patch.object(LocalStubBackend, 'annotate', autospec=True,
+                               side_effect=LocalStubBackend.annotate) as annotate:
+            self.assertEqual(verify_pending_images(), {'approved': 2})
+            self.assertEqual([len(call.args[1]) for call in annotate.call_args_list], [1])
+
+            # Ảnh gần trùng ở công ty khác lấy kết quả đã lưu, không gọi backend
+            CompanyImage.objects.create(company=other, image='company/stock', fingerprint=resized)
+            self.assertEqual(verify_pending_images(), {'approved': 1})
+            self.assertEqual(annotate.call_count, 1)
+        self.assertEqual(ImageFingerprint.objects.get(pk=original.pk).verification_status, 'approved')
+        self.assertTrue(Company.objects.get(pk=other.pk).is_verified)
+
+    def test_gallery_update_only_uploads_changes(self):
+        def upload(name, size):
+            return SimpleUploadedFile(f'{name}.png', self.office_photo(size, 'PNG'), content_type='image/png')
+
+        client = APIClient()
+        client.force_authenticate(self.recruiter)
+        url = '/recruiters/update-company-images/'
+        def upload_resource(file, **options):
+            name, image_format = file.name.rsplit('.', 1)
+            return CloudinaryResource(f'company/{name}', format=image_format, version='1', **options)
+
+        with mock.patch('jobs.images.uploader.upload_resource', autospec=True,
+                        side_effect=upload_resource) as upload_resource:
+            response = client.patch(url, {'images': [upload('a', (256, 192)), upload('b', (200, 150)),
+                                                     upload('c', (300, 200))]}, format='multipart')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(upload_resource.call_count, 3)
+            kept = CompanyImage.objects.get(company=self.company, image__endswith='/b.webp')
+            kept.verification_status = 'approved'
+            kept.save()
+
+            # Gửi lại a (cùng nội dung), giữ b theo id, thêm d, bỏ c: chỉ d được tải lên
+            response = client.patch(url, {'images': [upload('a2', (256, 192)), upload('d', (320, 180))],
+                                          'keep': [kept.pk]}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(upload_resource.call_count, 4)
+        images = CompanyImage.objects.filter(company=self.company).order_by('id')
+        self.assertEqual([image.image.public_id for image in images], ['company/a', 'company/b', 'company/d'])
+        self.assertEqual(CompanyImage.objects.get(pk=kept.pk).verification_status, 'approved')
+
+        # Id không thuộc công ty, hoặc bộ ảnh cuối (sau khi gộp ảnh trùng) dưới 3 ảnh -> 400, không xóa gì
+        other = CompanyImage.objects.create(company=Company.objects.create(
+            user=User.objects.create(username='other', role='recruiter'), name='B', tax_code='02',
+            description='Mô tả', location='Hà Nội'), image='company/other')
+        fingerprint_count = ImageFingerprint.objects.count()
+        for data in [{'keep': [other.pk, 0]}, {'keep': [kept.pk], 'images': [upload('e', (256, 192))] * 3},
+                     {'images': [upload('f', (330, 210)) for _ in range(3)]}]:
+            response = client.patch(url, data, format='multipart')
+            self.assertEqual(response.status_code, 400, data)
+        self.assertEqual(CompanyImage.objects.filter(company=self.company).count(), 3)
+        self.assertEqual(ImageFingerprint.objects.count(), fingerprint_count)
+
+        # Tải lên lỗi: không để lại fingerprint của ảnh mới
+        with mock.patch('jobs.images.uploader.upload_resource', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                client.patch(url, {'images': [upload('g', (340, 220))], 'keep': [kept.pk, images[0].pk]},
+                             format='multipart')
+        self.assertEqual(ImageFingerprint.objects.count(), fingerprint_count)
+
+    @override_settings(IMAGE_UPLOAD_MAX_DIMENSION=800)
+    def test_avatar_endpoint_stores_processed_image(self):
+        photo = Image.new('RGB', (4000, 3000), (30, 120, 200))
+        exif = photo.getexif()
+        exif[0x0112] = 6
+        exif[0x010f] = 'Camera'
+        buffer = BytesIO()
+        photo.save(buffer, format='JPEG', exif=exif)
+        uploaded = []
+
+        def upload_resource(file, **options):
+            file.seek(0)
+            uploaded.append(file.read())
+            return CloudinaryResource('avatars/new', format='webp', version='2', **options)
+
+        client = APIClient()
+        client.force_authenticate(self.recruiter)
+        build_url.cache_clear()
+        with mock.patch('cloudinary.uploader.upload_resource', autospec=True, side_effect=upload_resource):
+            response = client.patch(f'/avatars/{self.recruiter.pk}/',
+                                    {'avatar': SimpleUploadedFile('photo.jpg', buffer.getvalue())}, format='multipart')
+        self.assertEqual(response.status_code, 200, response.data)
+        with Image.open(BytesIO(uploaded[0])) as stored:
+            self.assertEqual((stored.format, stored.size, dict(stored.getexif())), ('WEBP', (600, 800), {}))
+        # URL trả về dựng qua build_url (có cache), không phải value.url
+        self.assertEqual(build_url.cache_info().misses, 1)
+        self.assertIn('avatars/new.webp', response.data['avatar'])
+
+    def test_signup_counts_distinct_images(self):
+        def upload(name):
+            return SimpleUploadedFile(f'{name}.png', self.office_photo((256, 192), 'PNG'), content_type='image/png')
+
+        data = {'username': 'new_recruiter', 'password': '123456', 'email': 'r@example.com', 'first_name': 'A',
+                'last_name': 'B', 'avatar': upload('avatar'), 'company_name': 'Công ty C', 'tax_code': '0303',
+                'description': 'Mô tả', 'location': 'Hà Nội', 'images': [upload(f'copy{i}') for i in range(3)]}
+        with mock.patch('cloudinary.uploader.upload_resource', autospec=True,
+                        side_effect=lambda file, **options: CloudinaryResource('avatar', format='png', version='1',
+                                                                               **options)):
+            response = APIClient().post('/recruiters/', data, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('images', response.data)
+        self.assertFalse(User.objects.filter(username='new_recruiter').exists())
+
+    @override_settings(IMAGE_UPLOAD_MAX_DIMENSION=800, IMAGE_UPLOAD_FORMAT='WEBP')
+    def test_uploads_are_downscaled_and_stripped(self):
+        photo = Image.new('RGB', (3200, 2400), (120, 90, 60))
+        exif = photo.getexif()
+        exif[0x0112] = 6  # Orientation: xoay 90 độ
+        exif[0x010f] = 'Camera'
+        buffer = BytesIO()
+        photo.save(buffer, format='JPEG', exif=exif)
+
+        serializer = UpdateAvatarSerializer(data={'avatar': SimpleUploadedFile('IMG_0001.JPG', buffer.getvalue())})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        avatar = serializer.validated_data['avatar']
+        self.assertEqual((avatar.name, avatar.content_type), ('IMG_0001.webp', 'image/webp'))
+        self.assertLess(avatar.size, len(buffer.getvalue()))
+        with Image.open(avatar) as stored:
+            self.assertEqual((stored.format, stored.size), ('WEBP', (600, 800)))
+            self.assertEqual(dict(stored.getexif()), {})
+
+
+class RendererCompressionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        recruiter = User.objects.create(username='recruiter', role='recruiter', first_name='Nguyễn')
+        for i in range(5):
+            JobPost.objects.create(
+                recruiter=recruiter, title=f'Tin {i}', description='Mô tả', salary=Decimal('1500000.50'),
+                working_hours='40', location='Hà Nội',
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+
+    def test_orjson_matches_json_renderer(self):
+        data = JobPostSerializer(JobPost.objects.all(), many=True, expand=['recruiter']).data
+        data = {'results': data, 'salary': Decimal('1.50'), 'text': 'a\u2028b', 1: None}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    @override_settings(RESPONSE_COMPRESSION_MIN_SIZE=200, JOBPOST_LIST_ETAGS=True)
+    def test_compression_negotiation(self):
+        plain = self.client.get('/jobposts/')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        response = self.client.get('/jobposts/', HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertTrue(response['ETag'].startswith('W/'))
+        if brotli is not None:
+            response = self.client.get('/jobposts/', HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(brotli.decompress(response.content), plain.content)
+
+        with self.settings(RESPONSE_COMPRESSION_MIN_SIZE=len(plain.content) + 1):
+            response = self.client.get('/jobposts/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
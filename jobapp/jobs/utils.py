@@ -0,0 +1,50 @@
+import re
+
+_NUMBER_RE = re.compile(r'\d+(?:[.,]\d+)?')
+_PER_DAY_RE = re.compile(r'ngày|ngay|/\s*d\b|day', re.IGNORECASE)
+_PER_WEEK_RE = re.compile(r'tuần|tuan|week|/\s*w\b', re.IGNORECASE)
+# Khoảng giờ trong ngày: "8h - 17h", "8:00-17:00", "8h30 đến 17h30"
+_CLOCK_TIME = r'(?<!\d)(\d{1,2})\s*(h|giờ|gio|:)\s*(\d{2})?'
+_CLOCK_RANGE_RE = re.compile(rf'{_CLOCK_TIME}\s*(?:-|–|~|đến|den|to)\s*{_CLOCK_TIME}', re.IGNORECASE)
+
+DAYS_PER_WEEK = 5
+MAX_HOURS_PER_WEEK = 168
+
+
+def clock_times(match):
+    # (giờ bắt đầu, giờ kết thúc, có phút hoặc dấu ":" hay không) của khoảng giờ kiểu đồng hồ
+    start_hour, start_sep, start_minute, end_hour, end_sep, end_minute = match.groups()
+    explicit = ':' in (start_sep, end_sep) or bool(start_minute or end_minute)
+    return int(start_hour) + int(start_minute or 0) / 60, int(end_hour) + int(end_minute or 0) / 60, explicit
+
+
+def parse_working_hours(value):
+    """
+    Chuẩn hóa chuỗi working_hours ("40", "20-30", "4 giờ/ngày", "8h - 17h", ...) thành (min, max) giờ/tuần.
+    Trả về (None, None) nếu không đọc được số nào hoặc không rõ nghĩa.
+    """
+    clock = _CLOCK_RANGE_RE.search(value or '')
+    if clock and not _PER_WEEK_RE.search(value):
+        start, end, explicit = clock_times(clock)
+        # "20h - 30h" không phải giờ đồng hồ (h là đơn vị giờ): đọc như khoảng giờ/tuần bên dưới
+        if explicit or end <= 24:
+            if not start < end <= 24:
+                return None, None  # Qua đêm hoặc giờ không hợp lệ: không đoán
+            hours = min(round((end - start) * DAYS_PER_WEEK), MAX_HOURS_PER_WEEK)
+            return hours, hours
+
+    numbers = [float(n.replace(',', '.')) for n in _NUMBER_RE.findall(value or '')][:2]
+    if not numbers:
+        return None, None
+
+    if _PER_DAY_RE.search(value):
+        numbers = [n * DAYS_PER_WEEK for n in numbers]
+
+    low, high = min(numbers), max(numbers)
+    return min(round(low), MAX_HOURS_PER_WEEK), min(round(high), MAX_HOURS_PER_WEEK)
+
+
+def normalize_job_post(job):
+    # Đồng bộ các cột số của JobPost từ working_hours và salary
+    job.hours_min, job.hours_max = parse_working_hours(job.working_hours)
+    job.salary_min = job.salary_max = job.salary
@@ -1,65 +1,256 @@
-from google.cloud import vision
-import requests
-
-def verify_image_with_google_vision(image_url):
-    """
-    Xác minh ảnh công ty có phải ảnh thật (môi trường làm việc) hay ảnh mạng (stock).
-    """
-    client = vision.ImageAnnotatorClient()
+"""
+Xác minh ảnh công ty (ảnh thật nơi làm việc hay ảnh mạng) ngoài request.
+Ảnh mới được lưu với verification_status='pending'; lệnh verify_company_images (hoặc luồng nền khi
+IMAGE_VERIFICATION_IN_PROCESS=True) gom nhiều ảnh vào một lần gọi backend rồi ghi kết quả lên ảnh.
+Kết quả được lưu theo ImageFingerprint: ảnh trùng/gần trùng ảnh đã xác minh lấy lại kết quả, không gọi backend.
+"""
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter
+from functools import lru_cache
 
-    # Tải ảnh từ URL (Cloudinary hoặc ảnh trên mạng)
-    response = requests.get(image_url)
-    content = response.content
+import requests
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.module_loading import import_string
 
-    # Gửi ảnh vào Google Vision API
-    image = vision.Image(content=content)
+from .cache import invalidate_listing_cache
+from .image_hash import cached_verdict, fingerprint_for
+from .images import image_url
+from .models import Company, CompanyImage, ImageFingerprint, VerificationStatus
 
-    # Phân tích Web Detection (ảnh từng xuất hiện trên internet chưa)
-    web_detection = client.web_detection(image=image).web_detection
+# Giá trị mặc định, ghi đè bằng IMAGE_VERIFICATION_* trong settings.py
+BACKEND = 'jobs.verify_image.GoogleVisionBackend'
+BATCH_SIZE = 16  # batch_annotate_images nhận tối đa 16 ảnh mỗi lần
+MAX_ATTEMPTS = 3
+DOWNLOAD_TIMEOUT = 10  # giây
+STUB_LABELS = ['office']
 
-    # Nếu là ảnh mạng, ta vẫn tiếp tục kiểm tra nội dung label
-    is_stock_photo = web_detection.full_matching_images or web_detection.pages_with_matching_images
+TRUSTED_KEYWORDS = {"office", "workspace", "building", "desk", "employee"}
+VERDICT_FIELDS = ['verification_status', 'verification_reason', 'verification_labels', 'verified_at']
+RESULT_FIELDS = VERDICT_FIELDS + ['verification_attempts', 'fingerprint']
 
-    # Phân tích Label Detection (ảnh chứa nội dung gì)
-    label_response = client.label_detection(image=image)
-    labels = label_response.label_annotations
-    keywords = [label.description.lower() for label in labels]
 
-    # Debug log
-    print("🧠 Labels from Vision API:", keywords)
+def setting(name, default):
+    return getattr(settings, f'IMAGE_VERIFICATION_{name}', default)
 
-    trusted_keywords = {"office", "workspace", "building", "desk", "employee"}
-    matched_keywords = trusted_keywords.intersection(set(keywords))
 
-    print("✅ Matched trusted keywords:", matched_keywords)
+def judge(labels, on_web):
+    """
+    Quyết định ảnh thật hay không từ nhãn (label_detection) và việc ảnh đã xuất hiện trên mạng (web_detection).
+    Trả về (is_real, reason).
+    """
+    matched_keywords = TRUSTED_KEYWORDS.intersection(labels)
 
     # Trường hợp 1: ảnh mạng + không có nhãn văn phòng → loại
-    if is_stock_photo and not matched_keywords:
-        print("❌ Ảnh mạng và không có nội dung đáng tin.")
-        return {
-            "is_real": False,
-            "reason": "Image appears on the internet and has no trusted office-related content"
-        }
+    if on_web and not matched_keywords:
+        return False, "Image appears on the internet and has no trusted office-related content"
 
     # Trường hợp 2: ảnh mạng nhưng có nội dung đáng tin → chấp nhận
-    if is_stock_photo and matched_keywords:
-        print("⚠️ Ảnh mạng nhưng có nội dung văn phòng. Cho qua.")
-        return {
-            "is_real": True,
-            "reason": f"Image is on the internet, but contains trusted content: {matched_keywords}"
-        }
+    if on_web:
+        return True, f"Image is on the internet, but contains trusted content: {sorted(matched_keywords)}"
 
     # Trường hợp 3: ảnh mới, có nội dung văn phòng → chấp nhận
     if matched_keywords:
-        print("✅ Ảnh mới, có nội dung văn phòng.")
-        return {
-            "is_real": True,
-            "reason": f"Detected trusted keywords: {matched_keywords}"
-        }
+        return True, f"Detected trusted keywords: {sorted(matched_keywords)}"
 
     # Trường hợp 4: ảnh mới, nhưng không có nội dung đáng tin → loại
-    print("❌ Ảnh không đáng tin (không có nhãn văn phòng).")
-    return {
-        "is_real": False,
-        "reason": "No trusted office-related keywords found"
-    }
+    return False, "No trusted office-related keywords found"
+
+
+class VisionBackend(ABC):
+    """
+    Backend phân tích ảnh. annotate(contents) nhận danh sách nội dung ảnh (bytes) và trả về, theo đúng thứ tự,
+    {'labels': [...], 'on_web': bool} hoặc {'error': '...'} cho từng ảnh.
+    """
+
+    def __init__(self):
+        self.session = requests.Session()  # Dùng lại kết nối HTTP khi tải nhiều ảnh Cloudinary
+
+    def fetch(self, url):
+        response = self.session.get(url, timeout=setting('DOWNLOAD_TIMEOUT', DOWNLOAD_TIMEOUT))
+        response.raise_for_status()
+        return response.content
+
+    @abstractmethod
+    def annotate(self, contents):
+        ...
+
+
+class GoogleVisionBackend(VisionBackend):
+    # Một client cho cả tiến trình; web_detection + label_detection trong cùng một request cho mỗi ảnh
+
+    def __init__(self):
+        super().__init__()
+        from google.cloud import vision
+        self.vision = vision
+        self.client = vision.ImageAnnotatorClient()
+        self.features = [
+            vision.Feature(type_=vision.Feature.Type.WEB_DETECTION),
+            vision.Feature(type_=vision.Feature.Type.LABEL_DETECTION),
+        ]
+
+    def annotate(self, contents):
+        response = self.client.batch_annotate_images(requests=[
+            self.vision.AnnotateImageRequest(image=self.vision.Image(content=content), features=self.features)
+            for content in contents
+        ])
+        results = []
+        for item in response.responses:
+            if item.error.message:
+                results.append({'error': item.error.message})
+                continue
+            web = item.web_detection
+            results.append({
+                'labels': [label.description.lower() for label in item.label_annotations],
+                'on_web': bool(web.full_matching_images or web.pages_with_matching_images),
+            })
+        return results
+
+
+class LocalStubBackend(VisionBackend):
+    # Không gọi mạng: dùng cho test/dev, nhãn lấy từ IMAGE_VERIFICATION_STUB_LABELS
+
+    def fetch(self, url):
+        return url.encode()
+
+    def annotate(self, contents):
+        labels = list(setting('STUB_LABELS', STUB_LABELS))
+        return [{'labels': labels, 'on_web': False} for _ in contents]
+
+
+@lru_cache(maxsize=None)
+def load_backend(path):
+    return import_string(path)()
+
+
+def get_backend():
+    return load_backend(setting('BACKEND', BACKEND))
+
+
+def describe_error(error):
+    return f'{type(error).__name__}: {error}'[:1000]
+
+
+def record_error(image, reason):
+    image.verification_attempts += 1
+    image.verification_reason = reason
+
+
+def record_verdict(fingerprint, labels, on_web):
+    is_real, reason = judge(labels, on_web)
+    fingerprint.verification_status = VerificationStatus.APPROVED if is_real else VerificationStatus.REJECTED
+    fingerprint.verification_reason = reason
+    fingerprint.verification_labels = labels
+    fingerprint.verified_at = timezone.now()
+
+
+def apply_verdict(image, fingerprint):
+    image.verification_attempts += 1
+    for field in VERDICT_FIELDS:
+        setattr(image, field, getattr(fingerprint, field))
+
+
+def verify_batch(backend, images):
+    # Mỗi fingerprint chỉ gửi backend một lần trong lô, kể cả khi nhiều ảnh cùng nội dung
+    verdicts, groups = {}, {}
+    for image in images:
+        if not image.image:
+            record_error(image, 'Không có ảnh')
+            image.verification_status = VerificationStatus.REJECTED
+            continue
+        try:
+            content = None
+            if image.fingerprint is None:  # Ảnh tải lên trước khi có fingerprint
+                content = backend.fetch(image_url(image.image))
+                image.fingerprint = fingerprint_for(content)
+            fingerprint = image.fingerprint
+            if fingerprint.pk not in verdicts:
+                verdicts[fingerprint.pk] = cached_verdict(fingerprint)
+            if verdicts[fingerprint.pk] is not None:
+                apply_verdict(image, verdicts[fingerprint.pk])
+            elif fingerprint.pk in groups:
+                groups[fingerprint.pk][2].append(image)
+            else:
+                groups[fingerprint.pk] = (fingerprint, content or backend.fetch(image_url(image.image)), [image])
+        except requests.RequestException as error:
+            record_error(image, describe_error(error))
+
+    if groups:
+        fingerprints, contents, grouped = zip(*groups.values())
+        try:
+            results = backend.annotate(list(contents))
+        except Exception as error:  # API lỗi cả lô: ghi lỗi, ảnh vẫn pending để lần sau thử lại
+            results = [{'error': describe_error(error)}] * len(fingerprints)
+        verified = []
+        for fingerprint, group, result in zip(fingerprints, grouped, results):
+            if 'error' in result:
+                for image in group:
+                    record_error(image, result['error'])
+                continue
+            record_verdict(fingerprint, result['labels'], result['on_web'])
+            verified.append(fingerprint)
+            for image in group:
+                apply_verdict(image, fingerprint)
+        ImageFingerprint.objects.bulk_update(verified, VERDICT_FIELDS)
+
+    CompanyImage.objects.bulk_update(images, RESULT_FIELDS)
+
+    # Có ảnh thật -> công ty được xác minh; update() không chạy signals nên tự bỏ cache danh sách
+    company_ids = {image.company_id for image in images if image.verification_status == VerificationStatus.APPROVED}
+    if company_ids and Company.objects.filter(id__in=company_ids, is_verified=False).update(
+            is_verified=True, updated_date=timezone.now()):
+        invalidate_listing_cache()
+
+
+def pending_images():
+    return CompanyImage.objects.filter(verification_status=VerificationStatus.PENDING,
+                                       verification_attempts__lt=setting('MAX_ATTEMPTS', MAX_ATTEMPTS))
+
+
+def verify_pending_images(batch_size=None, limit=None):
+    """
+    Xác minh các ảnh đang chờ theo lô, mỗi ảnh tối đa một lần trong một lượt chạy.
+    Trả về Counter số ảnh theo trạng thái sau khi xử lý.
+    """
+    backend = get_backend()
+    batch_size = batch_size or setting('BATCH_SIZE', BATCH_SIZE)
+    pending = pending_images().select_related('fingerprint').order_by('id')
+
+    stats, last_id = Counter(), 0
+    while limit is None or sum(stats.values()) < limit:
+        size = batch_size if limit is None else min(batch_size, limit - sum(stats.values()))
+        images = list(pending.filter(id__gt=last_id)[:size])
+        if not images:
+            break
+        verify_batch(backend, images)
+        stats.update(image.verification_status for image in images)
+        last_id = images[-1].id
+    return stats
+
+
+_verify_lock = threading.Lock()
+
+
+def _verify():
+    try:
+        while True:
+            try:
+                verify_pending_images()
+            finally:
+                _verify_lock.release()
+            # Ảnh commit lúc lượt cuối đang chạy thấy khóa đang bị giữ nên không mở luồng mới:
+            # còn ảnh chưa thử lần nào thì tự chạy thêm một lượt (ảnh lỗi chờ lần gọi sau, không lặp liên tục)
+            if not pending_images().filter(verification_attempts=0).exists():
+                break
+            if not _verify_lock.acquire(blocking=False):
+                break  # Luồng khác đã nhận việc
+    finally:
+        connection.close()  # Kết nối DB riêng của luồng này
+
+
+def verify_in_background():
+    # Chỉ chạy một luồng xác minh tại một thời điểm; ảnh đến sau sẽ được lượt kế tiếp xử lý
+    if _verify_lock.acquire(blocking=False):
+        threading.Thread(target=_verify, daemon=True).start()
@@ -1,15 +1,73 @@
-from django.db.models import Q
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import viewsets, status, generics, parsers, permissions
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from . import perms, paginators
-from .serializers import CandidateSerializer, RecruiterSerializer, JobPostSerializer, ApplicationSerializer, \
+from .cache import get_cached_listing, get_recruiter_summary, invalidate_listing_cache, invalidate_recruiter_summary, \
+    listing_cache_key, set_cached_listing, set_recruiter_summary
+from .counters import bulk_update_application_counters, recruiter_job_summary
+from .conditional import job_post_detail_validators, listing_validators, not_modified, set_validators
+from .facets import filtered_facets, stored_facets
+from .fast_read import application_rows, application_values, candidate_review_rows, company_review_rows, \
+    job_post_rows, job_post_values, review_values
+from .geo import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, filter_near
+from .images import IMAGE_VARIANTS, LIST_IMAGE_SIZE
+from .salary_stats import get_salary_stats
+from .search import search_job_posts
+from .suggest import refresh_in_background, suggestion_index
+from .serializers import split_param, CandidateSerializer, RecruiterSerializer, JobPostSerializer, ApplicationSerializer, \
     FollowSerializer, CompanySerializer, UpdateAvatarSerializer, RecruiterReviewCandidateSerializer, \
-    CandidateReviewRecruiterSerializer, CompanyImageUploadSerializer
+    CandidateReviewRecruiterSerializer, CompanyImageUploadSerializer, BulkApplicationStatusSerializer
 from .models import User, JobPost, Application, Follow, Company, Review
 
 
+def get_image_size(request, default='full'):
+    # ?image_size=thumb|medium|full chọn cỡ ảnh (avatar, logo, ảnh công ty) trong response
+    size = request.query_params.get('image_size') or default
+    if size not in IMAGE_VARIANTS:
+        raise ValidationError({'image_size': f"Chỉ nhận: {', '.join(IMAGE_VARIANTS)}."})
+    return size
+
+class DynamicFieldsViewMixin:
+    # Truyền ?fields= / ?expand= cho serializer; các action trong compact_actions trả về dạng rút gọn
+    compact_actions = ('list',)
+
+    def get_field_params(self):
+        params = self.request.query_params
+        return split_param(params.get('fields')), split_param(params.get('expand'))
+
+    def use_compact_queryset(self):
+        # Chỉ cắt cột bằng .only() khi trả về đúng dạng rút gọn mặc định
+        fields, expand = self.get_field_params()
+        return self.action in self.compact_actions and not fields and not expand
+
+    def get_image_size(self):
+        # Danh sách mặc định dùng ảnh nhỏ, trang chi tiết dùng ảnh gốc
+        return get_image_size(self.request, LIST_IMAGE_SIZE if self.action in self.compact_actions else 'full')
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if getattr(self, 'request', None) is not None and self.request.method == 'GET':
+            context['image_size'] = self.get_image_size()
+        return context
+
+    def get_serializer(self, *args, **kwargs):
+        request = getattr(self, 'request', None)
+        if request is not None and request.method == 'GET':
+            fields, expand = self.get_field_params()
+            kwargs.setdefault('fields', fields)
+            kwargs.setdefault('expand', expand)
+            kwargs.setdefault('compact', self.action in self.compact_actions)
+        return super().get_serializer(*args, **kwargs)
+
 class CandidateViewSet(viewsets.ViewSet, generics.CreateAPIView, generics.UpdateAPIView):
     queryset = User.objects.filter(is_active=True, role='candidate')  # Chỉ lấy ứng viên
     serializer_class = CandidateSerializer
@@ -74,15 +132,102 @@ class CompanyViewSet(viewsets.ViewSet, generics.ListAPIView, generics.UpdateAPIV
             return [perms.IsRecruiterCompany()]
         return [permissions.AllowAny()]
 
-class JobPostViewSet(viewsets.ModelViewSet):
+    def list(self, request, *args, **kwargs):
+        # Dữ liệu công ty/ảnh thay đổi đều làm tăng phiên bản danh sách -> dùng làm ETag
+        etag, last_modified = listing_validators(request)
+        if (response := not_modified(request, etag, last_modified)) is not None:
+            return response
+        return set_validators(super().list(request, *args, **kwargs), etag, last_modified)
+
+class JobPostViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     serializer_class = JobPostSerializer
+    compact_actions = ('list', 'recruiter_job_post', 'recommended')
     pagination_class = paginators.JobPostPaginator
+    ordering_fields = ['created_date', 'salary', 'id', 'application_count']
+    filter_params = ['specialized', 'location', 'salary__gte', 'salary__lte',
+                     'working_hours__gte', 'working_hours__lte', 'search', 'near']
+
+    @property
+    def paginator(self):
+        # ?pagination=cursor (hoặc có ?cursor=) để dùng phân trang keyset cho cuộn vô hạn
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('cursor') or params.get('pagination') == 'cursor':
+                self._paginator = paginators.JobPostCursorPaginator()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def get_permissions(self):
-        if self.action in ['create', 'update', 'partial_update', 'destroy', 'recruiter_job_post']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'recruiter_job_post', 'recruiter_summary']:
             return [perms.IsRecruiterJobPost()]
+        if self.action == 'recommended':
+            return [perms.IsCandidate()]
         return [permissions.AllowAny()]
 
+    def get_number_param(self, name, cast):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            number = cast(value)
+        except (ValueError, InvalidOperation):
+            raise ValidationError({name: 'Giá trị phải là số.'})
+        # Decimal nhận cả "NaN"/"Infinity"; để lọt xuống ORM sẽ thành lỗi 500
+        if isinstance(number, Decimal) and not number.is_finite():
+            raise ValidationError({name: 'Giá trị phải là số.'})
+        return number
+
+    def list(self, request, *args, **kwargs):
+        # If-None-Match/If-Modified-Since khớp -> 304 ngay, không đọc cache hay serialize
+        etag, last_modified = listing_validators(request)
+        if (response := not_modified(request, etag, last_modified)) is not None:
+            return response
+
+        # Cache theo query params đã chuẩn hóa; bị vô hiệu khi JobPost/Application/CompanyImage thay đổi
+        key = listing_cache_key(request)
+        data = get_cached_listing(key)
+        if data is not None:
+            return set_validators(Response(data, headers={'X-Cache': 'HIT'}), etag, last_modified)
+
+        response = self.list_job_posts(self.filter_queryset(self.get_queryset()))
+        if response.status_code == status.HTTP_200_OK:
+            set_cached_listing(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = job_post_detail_validators(request, kwargs.get('pk'))
+        if (response := not_modified(request, etag, last_modified)) is not None:
+            return response
+        return set_validators(super().retrieve(request, *args, **kwargs), etag, last_modified)
+
+    def list_job_posts(self, queryset):
+        # Dạng rút gọn mặc định được dựng trực tiếp từ .values() (jobs/fast_read.py)
+        if self.use_compact_queryset():
+            size = self.get_image_size()
+            queryset, to_json = job_post_values(queryset), lambda rows: job_post_rows(rows, size)
+        else:
+            to_json = lambda rows: self.get_serializer(rows, many=True).data
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(to_json(page))
+        return Response(to_json(queryset))
+
+    def get_near_param(self):
+        near = self.request.query_params.get('near')
+        if not near:
+            return None
+        try:
+            lat, lng = (float(value) for value in near.split(','))
+            radius_km = float(self.request.query_params.get('radius_km', DEFAULT_RADIUS_KM))
+        except ValueError:
+            raise ValidationError({'near': 'Định dạng phải là near=lat,lng và radius_km là số.'})
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180 and 0 < radius_km <= MAX_RADIUS_KM):
+            raise ValidationError({'near': f'Tọa độ không hợp lệ hoặc radius_km vượt quá {MAX_RADIUS_KM}.'})
+        return lat, lng, radius_km
+
     def filter_job_posts(self, queryset):
         params = self.request.query_params
 
@@ -93,75 +238,184 @@ class JobPostViewSet(viewsets.ModelViewSet):
         if (location := params.get('location')):
             queryset = queryset.filter(location__icontains=location)
 
-        if (salary_gte := params.get('salary__gte')):
-            queryset = queryset.filter(salary__gte=salary_gte)
+        # Lọc theo khoảng trên các cột số đã chuẩn hóa (có index)
+        if (salary_gte := self.get_number_param('salary__gte', Decimal)) is not None:
+            queryset = queryset.filter(salary_max__gte=salary_gte)
 
-        if (salary_lte := params.get('salary__lte')):
-            queryset = queryset.filter(salary__lte=salary_lte)
+        if (salary_lte := self.get_number_param('salary__lte', Decimal)) is not None:
+            queryset = queryset.filter(salary_min__lte=salary_lte)
 
-        if (hours_gte := params.get('working_hours__gte')):
-            queryset = queryset.filter(working_hours__gte=hours_gte)
+        if (hours_gte := self.get_number_param('working_hours__gte', int)) is not None:
+            queryset = queryset.filter(hours_max__gte=hours_gte)
 
-        if (hours_lte := params.get('working_hours__lte')):
-            queryset = queryset.filter(working_hours__lte=hours_lte)
+        if (hours_lte := self.get_number_param('working_hours__lte', int)) is not None:
+            queryset = queryset.filter(hours_min__lte=hours_lte)
 
-        # Tìm kiếm gần đúng
-        if (search := params.get('search')):
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(specialized__icontains=search) |
-                Q(location__icontains=search)
-            )
+        # Lọc theo bán kính quanh một tọa độ: ?near=lat,lng&radius_km=
+        near = self.get_near_param()
+        if near:
+            queryset = filter_near(queryset, *near)
 
-        # Sắp xếp
-        ordering = params.get('ordering', '-created_date')
-        queryset = queryset.order_by(ordering)
+        # Tìm kiếm qua chỉ mục token, xếp theo độ liên quan nếu không chỉ định sắp xếp
+        search = params.get('search', '').strip()
+        if search:
+            queryset = search_job_posts(queryset, search)
+
+        # Sắp xếp (chỉ chấp nhận các trường trong ordering_fields)
+        ordering = params.get('ordering')
+        if ordering and ordering.lstrip('-') in self.ordering_fields:
+            queryset = queryset.order_by(ordering)
+        elif search:
+            queryset = queryset.order_by('-search_rank', '-created_date')
+        elif near:
+            queryset = queryset.order_by('distance_km', '-created_date')
+        else:
+            queryset = queryset.order_by('-created_date')
 
         return queryset
 
     def get_queryset(self):
         queryset = JobPost.objects.filter(active=True)
-        return self.filter_job_posts(queryset)
+        return JobPostSerializer.setup_eager_loading(self.filter_job_posts(queryset), self.use_compact_queryset())
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        # Số tin theo ngành nghề, địa điểm và khoảng lương cho bộ lọc hiện tại
+        if any(request.query_params.get(param) for param in self.filter_params):
+            return Response(filtered_facets(self.filter_job_posts(JobPost.objects.filter(active=True))))
+        return Response(stored_facets())
+
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        # Gợi ý tiêu đề/ngành nghề/địa điểm theo tiền tố, đọc từ chỉ mục trong bộ nhớ.
+        # Chỉ mục chưa nạp/đã cũ được nạp lại ở luồng nền, request không chờ (chưa nạp thì trả rỗng)
+        if suggestion_index.is_stale():
+            refresh_in_background()
+        return Response(suggestion_index.suggest(request.query_params.get('q', '')))
+
+    @action(detail=False, methods=['get'], url_path='salary-stats')
+    def salary_stats(self, request):
+        # Thống kê lương thị trường theo ngành nghề/địa điểm, đọc từ bảng tổng hợp
+        params = request.query_params
+        return Response(get_salary_stats(
+            specialized=params.get('specialized', '').strip(),
+            location=params.get('location', '').strip(),
+        ))
+
+    @action(detail=False, methods=['get'], permission_classes=[perms.IsCandidate])
+    def recommended(self, request):
+        # Tin gợi ý tính sẵn cho ứng viên; chưa có lịch sử thì trả về tin mới nhất
+        queryset = (JobPost.objects.filter(active=True, recommendations__candidate=request.user)
+                    .annotate(recommendation_rank=F('recommendations__rank'))
+                    .order_by('recommendation_rank'))
+        if not queryset.exists():
+            queryset = JobPost.objects.filter(active=True).order_by('-created_date')
+        queryset = JobPostSerializer.setup_eager_loading(queryset, self.use_compact_queryset())
+        return self.list_job_posts(queryset)
 
     @action(detail=False, methods=['get'], permission_classes=[perms.IsRecruiterJobPost])
     def recruiter_job_post(self, request):
         queryset = JobPost.objects.filter(recruiter=request.user, active=True)
-        queryset = self.filter_job_posts(queryset)
-
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
-
-class ApplicationViewSet(viewsets.ViewSet, generics.ListAPIView, generics.CreateAPIView, generics.UpdateAPIView):
+        queryset = JobPostSerializer.setup_eager_loading(self.filter_job_posts(queryset), self.use_compact_queryset())
+        return self.list_job_posts(queryset)
+
+    @action(detail=False, methods=['get'], url_path='recruiter_job_post/summary')
+    def recruiter_summary(self, request):
+        # Số đơn pending/accepted/rejected và lần nộp gần nhất theo từng tin, cache theo nhà tuyển dụng
+        data = get_recruiter_summary(request.user.id)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        data = recruiter_job_summary(request.user)
+        set_recruiter_summary(request.user.id, data)
+        return Response(data, headers={'X-Cache': 'MISS'})
+
+class ApplicationViewSet(DynamicFieldsViewMixin, viewsets.ViewSet, generics.ListAPIView, generics.CreateAPIView,
+                         generics.UpdateAPIView):
     serializer_class = ApplicationSerializer
     parser_classes = [parsers.MultiPartParser, parsers.FormParser]
+    compact_actions = ('list', 'list_for_recruiter')
+    recruiter_ordering_fields = ['created_date', 'updated_date', 'status', 'id']
+
+    @property
+    def paginator(self):
+        # Chỉ danh sách của nhà tuyển dụng được phân trang; danh sách của ứng viên giữ nguyên
+        if not hasattr(self, '_paginator'):
+            self._paginator = paginators.ApplicationPaginator() if self.action == 'list_for_recruiter' else None
+        return self._paginator
 
     def get_queryset(self):
         # Lọc danh sách đơn ứng tuyển dựa trên role của user
         user = self.request.user  # lấy thông tin user hiện tại
         if user.role == "candidate":
-            return Application.objects.filter(applicant=user, active=True)
+            queryset = Application.objects.filter(applicant=user, active=True)
+            return ApplicationSerializer.setup_eager_loading(queryset, self.use_compact_queryset())
         elif self.action in ["accept_application", "reject_application"]:
             return Application.objects.filter(job__recruiter=user, active=True)
         return Application.objects.none()  # Trả về rỗng nếu role không phải là "candidate"
 
     def get_permissions(self):
-        if self.action in ["list_for_recruiter", "accept_application", "reject_application"]:
+        if self.action in ["list_for_recruiter", "accept_application", "reject_application", "bulk_update_status"]:
             return [perms.IsRecruiterApplication()]
         if self.request.method in ['GET', 'POST', 'PUT', 'PATCH']:
             return [perms.IsCandidate()]
         return [perms.ApplicationPerms()]
 
+    def get_date_param(self, name, end_of_day=False):
+        # Nhận ngày (YYYY-MM-DD) hoặc thời điểm ISO 8601; ngày ở cận trên tính hết ngày đó
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            moment = parse_datetime(value)
+            if moment is None and (day := parse_date(value)) is not None:
+                moment = datetime.combine(day + timedelta(days=1) if end_of_day else day, time.min)
+        except ValueError:
+            moment = None
+        if moment is None:
+            raise ValidationError({name: 'Định dạng phải là YYYY-MM-DD hoặc ISO 8601.'})
+        return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+    def filter_recruiter_applications(self, queryset):
+        params = self.request.query_params
+
+        # Lọc theo tin tuyển dụng và trạng thái (index job, status, created_date)
+        if (job := params.get('job')):
+            if not job.isdigit():
+                raise ValidationError({'job': 'Giá trị phải là số.'})
+            queryset = queryset.filter(job_id=job)
+
+        if (statuses := split_param(params.get('status'))):
+            choices = [value for value, _ in Application._meta.get_field('status').choices]
+            if any(value not in choices for value in statuses):
+                raise ValidationError({'status': f"Chỉ nhận: {', '.join(choices)}."})
+            queryset = queryset.filter(status__in=statuses)
+
+        if (created_after := self.get_date_param('created_after')) is not None:
+            queryset = queryset.filter(created_date__gte=created_after)
+
+        if (created_before := self.get_date_param('created_before', end_of_day=True)) is not None:
+            queryset = queryset.filter(created_date__lt=created_before)
+
+        # Sắp xếp (chỉ các trường trong recruiter_ordering_fields), thêm -id để các trang ổn định
+        ordering = params.get('ordering')
+        if not ordering or ordering.lstrip('-') not in self.recruiter_ordering_fields:
+            ordering = '-created_date'
+        return queryset.order_by(ordering) if ordering.lstrip('-') == 'id' else queryset.order_by(ordering, '-id')
+
     @action(detail=False, methods=["get"], url_path="recruiter")
     def list_for_recruiter(self, request):
-        # Nhà tuyển dụng xem danh sách đơn ứng tuyển vào job của họ
-        queryset = Application.objects.filter(job__recruiter=request.user, active=True)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        # Nhà tuyển dụng xem danh sách đơn ứng tuyển vào job của họ (phân trang, ?page_size= tối đa 100)
+        queryset = self.filter_recruiter_applications(
+            Application.objects.filter(job__recruiter=request.user, active=True))
+        if self.use_compact_queryset():
+            size = self.get_image_size()
+            queryset, to_json = application_values(queryset), lambda rows: application_rows(rows, size)
+        else:
+            queryset = ApplicationSerializer.setup_eager_loading(queryset)
+            to_json = lambda rows: self.get_serializer(rows, many=True).data
+
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(to_json(page))
 
     @action(detail=True, methods=["patch"], url_path="accept")
     def accept_application(self, request, pk=None):
@@ -179,12 +433,51 @@ class ApplicationViewSet(viewsets.ViewSet, generics.ListAPIView, generics.Create
         application.save()
         return Response({"message": "Đơn ứng tuyển đã bị từ chối."}, status=status.HTTP_200_OK)
 
-class FollowViewSet(viewsets.ViewSet, generics.ListAPIView, generics.CreateAPIView, generics.DestroyAPIView):
+    @action(detail=False, methods=["post"], url_path="recruiter/bulk-status",
+            parser_classes=[parsers.JSONParser, parsers.FormParser])
+    def bulk_update_status(self, request):
+        # Duyệt hàng loạt: {"ids": [...], "status": "accepted"} -> một câu UPDATE ... WHERE id IN
+        serializer = BulkApplicationStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids, new_status = serializer.validated_data['ids'], serializer.validated_data['status']
+
+        with transaction.atomic():
+            # Kiểm tra quyền sở hữu trong cùng một truy vấn; khóa các dòng để không lệch bộ đếm
+            rows = {
+                pk: (job_id, old_status) for pk, job_id, old_status in
+                Application.objects.select_for_update()
+                .filter(id__in=ids, job__recruiter=request.user, active=True)
+                .values_list('id', 'job_id', 'status')
+            }
+            changed = [pk for pk in ids if pk in rows and rows[pk][1] != new_status]
+            if changed:
+                # queryset.update không chạy signals: tự cập nhật bộ đếm và cache danh sách
+                Application.objects.filter(id__in=changed).update(status=new_status, updated_date=timezone.now())
+                bulk_update_application_counters(
+                    ({'job_id': rows[pk][0], 'status': rows[pk][1], 'active': True},
+                     {'job_id': rows[pk][0], 'status': new_status, 'active': True}) for pk in changed
+                )
+                transaction.on_commit(invalidate_listing_cache)
+                transaction.on_commit(lambda: invalidate_recruiter_summary(request.user.id))
+
+        results = [
+            {"id": pk, "result": "not_found" if pk not in rows else
+             "unchanged" if rows[pk][1] == new_status else "updated"}
+            for pk in ids
+        ]
+        return Response({"status": new_status, "updated": len(changed), "results": results},
+                        status=status.HTTP_200_OK)
+
+class FollowViewSet(DynamicFieldsViewMixin, viewsets.ViewSet, generics.ListAPIView, generics.CreateAPIView,
+                    generics.DestroyAPIView):
     serializer_class = FollowSerializer
 
     def get_queryset(self):
         # Ứng viên chỉ xem danh sách những nhà tuyển dụng mình đang theo dõi
-        return Follow.objects.filter(follower=self.request.user)
+        queryset = Follow.objects.filter(follower=self.request.user)
+        if self.action == 'list':
+            queryset = FollowSerializer.setup_eager_loading(queryset, self.use_compact_queryset())
+        return queryset
 
     def get_permissions(self):
         if self.action in ["my_followers"]:
@@ -226,8 +519,8 @@ class CandidateReviewRecruiterViewSet(viewsets.ViewSet, generics.CreateAPIView,
 
         # Lọc các review mà ứng viên đã viết về nhà tuyển dụng này
         queryset = Review.objects.filter(reviewed_user=recruiter, reviewer__role='candidate', active=True)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        size = get_image_size(request, LIST_IMAGE_SIZE)
+        return Response(company_review_rows(review_values(queryset), recruiter, size))
 
 class RecruiterReviewCandidateViewSet(viewsets.ViewSet, generics.CreateAPIView, generics.DestroyAPIView):
     queryset = Review.objects.filter(active=True)
@@ -246,5 +539,5 @@ class RecruiterReviewCandidateViewSet(viewsets.ViewSet, generics.CreateAPIView,
         # Lấy danh sách đánh giá mà nhà tuyển dụng đã viết về một ứng viên cụ thể.
         candidate = get_object_or_404(User, id=candidate_id, role='candidate')
         queryset = Review.objects.filter(reviewed_user=candidate, reviewer__role='recruiter')
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        size = get_image_size(request, LIST_IMAGE_SIZE)
+        return Response(candidate_review_rows(review_values(queryset, 'reviewed_user__'), size))